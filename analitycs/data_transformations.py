@@ -1,10 +1,63 @@
 import pandas as pd
-from typing import Dict, List, Any
+from typing import Callable, Dict, Iterable, Iterator, List, Any, Optional, Sequence, Union
 
 def tuple_to_dataframe(columns: List[str], rows: List[tuple]) -> pd.DataFrame:
     """Convert query result tuples to a pandas DataFrame."""
     return pd.DataFrame(rows, columns=columns)
 
+def collect_columns(
+    data: Union[pd.DataFrame, Iterable[pd.DataFrame]],
+    columns: Sequence[str],
+    numeric: Sequence[str] = (),
+) -> pd.DataFrame:
+    """Keep only the columns a summary reads, consuming DataFrame chunks one at a time.
+
+    Columns missing from the data are skipped; numeric columns are converted
+    with pd.to_numeric(errors="coerce") per chunk, so wide chunks and Decimal
+    objects are released as soon as each chunk is reduced. A DataFrame is
+    returned as is.
+    """
+    if isinstance(data, pd.DataFrame):
+        return data
+    reduced: List[pd.DataFrame] = []
+    for chunk in data:
+        chunk = chunk[[c for c in columns if c in chunk.columns]].copy()
+        for col in numeric:
+            if col in chunk.columns:
+                chunk[col] = pd.to_numeric(chunk[col], errors="coerce")
+        reduced.append(chunk)
+    if not reduced:
+        return pd.DataFrame(columns=list(columns))
+    if len(reduced) == 1:
+        return reduced[0]
+    return pd.concat(reduced, ignore_index=True)
+
+def iter_frames(
+    frames: Iterable[pd.DataFrame],
+    on_frame: Optional[Callable[[pd.DataFrame], None]] = None,
+) -> Iterator[pd.DataFrame]:
+    """Yield DataFrame batches, calling on_frame with each one as it arrives."""
+    for frame in frames:
+        if on_frame is not None:
+            on_frame(frame)
+        yield frame
+
+def concat_frames(
+    frames: Iterable[pd.DataFrame],
+    on_frame: Optional[Callable[[pd.DataFrame], None]] = None,
+) -> pd.DataFrame:
+    """Concatenate DataFrame batches, calling on_frame with each one as it arrives."""
+    collected: List[pd.DataFrame] = []
+    for frame in frames:
+        if on_frame is not None:
+            on_frame(frame)
+        collected.append(frame)
+    if not collected:
+        return pd.DataFrame()
+    if len(collected) == 1:
+        return collected[0]
+    return pd.concat(collected, ignore_index=True)
+
 def map_rows_to_dicts(columns: List[str], rows: List[tuple]) -> List[Dict[str, Any]]:
     """Map rows (tuples) to dicts using column names."""
     results: List[Dict[str, Any]] = []
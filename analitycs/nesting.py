@@ -0,0 +1,93 @@
+import numpy as np
+import pandas as pd
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+# output field -> (column, cast); cast is None (value as is), "int", "float",
+# "float_or_none" (NaN -> None), "str", "str_or_none" (NaN -> None) or "list".
+# A None column yields None for every row.
+Fields = Dict[str, Tuple[Optional[str], Optional[str]]]
+
+
+def _column(frame: pd.DataFrame, column: Optional[str], cast: Optional[str]) -> List[Any]:
+    """Convert one column to a list of JSON-ready Python values in bulk."""
+    if column is None:
+        return [None] * len(frame)
+    values = frame[column]
+    if cast is None:
+        return values.tolist()
+    if cast == "int":
+        return values.astype("int64").tolist()
+    if cast == "float":
+        return values.astype(float).tolist()
+    if cast == "float_or_none":
+        values = values.astype(float)
+        return values.astype(object).where(values.notna(), None).tolist()
+    if cast == "str":
+        return values.astype(str).tolist()
+    if cast == "str_or_none":
+        return [None if pd.isna(value) else str(value) for value in values.tolist()]
+    if cast == "list":
+        return [list(value) for value in values]
+    raise ValueError(f"Unknown cast: {cast}")
+
+
+def to_records(frame: pd.DataFrame, fields: Fields) -> List[Dict[str, Any]]:
+    """Build one dict per row from column arrays (no iterrows, no per-cell casts)."""
+    names = list(fields)
+    columns = [_column(frame, column, cast) for column, cast in fields.values()]
+    return [dict(zip(names, values)) for values in zip(*columns)]
+
+
+def nest(
+    frame: pd.DataFrame,
+    by: str,
+    fields: Fields,
+    key: Optional[str] = None,
+) -> List[Tuple[Any, Union[List[Dict[str, Any]], Dict[Any, Dict[str, Any]]]]]:
+    """Group the records of an aggregated frame by one column.
+
+    Returns (value, records) per distinct value of by, in sorted order and
+    without missing values, like iterating DataFrame.groupby(by); records
+    keep the frame order within each group. With key, each group is a dict
+    {row[key]: record} instead of a list. The frame is split once on
+    factorized codes instead of filtering it per group.
+    """
+    codes, uniques = pd.factorize(frame[by], sort=True)
+    order = np.argsort(codes, kind="stable")
+    order = order[codes[order] >= 0]
+    ordered = frame.iloc[order]
+    records = to_records(ordered, fields)
+    ends = np.cumsum(np.bincount(codes[order], minlength=len(uniques))).tolist()
+    starts = [0] + ends[:-1]
+    if key is None:
+        groups = [records[start:end] for start, end in zip(starts, ends)]
+    else:
+        keys = ordered[key].tolist()
+        groups = [dict(zip(keys[start:end], records[start:end])) for start, end in zip(starts, ends)]
+    return list(zip(uniques.tolist(), groups))
+
+
+def group_codes(keys: pd.Series, dropna: bool = True) -> Tuple[np.ndarray, pd.Index]:
+    """Factorize group keys in DataFrame.groupby(sort=True) order.
+
+    Returns (codes, uniques). Missing keys get code -1, or form the last
+    group with dropna=False, as in DataFrame.groupby(dropna=False).
+    """
+    return pd.factorize(keys, sort=True, use_na_sentinel=dropna)
+
+
+def unique_lists(codes: np.ndarray, ngroups: int, values: pd.Series) -> List[List[Any]]:
+    """Sorted distinct non-missing values of values for each group code 0..ngroups-1.
+
+    Sorts (group, value) code pairs once and splits them at the group
+    boundaries, so there is no per-group unique() or sorted() call.
+    """
+    value_codes, uniques = pd.factorize(values, sort=True)
+    if len(uniques) == 0 or ngroups == 0:
+        return [[] for _ in range(ngroups)]
+    keep = (codes >= 0) & (value_codes >= 0)
+    pairs = np.unique(codes[keep].astype(np.int64) * len(uniques) + value_codes[keep])
+    items = np.empty(len(uniques), dtype=object)
+    items[:] = uniques.tolist()
+    ends = np.cumsum(np.bincount(pairs // len(uniques), minlength=ngroups))
+    return [chunk.tolist() for chunk in np.split(items[pairs % len(uniques)], ends[:-1])]
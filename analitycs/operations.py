@@ -1,9 +1,17 @@
 import pandas as pd
 import numpy as np
 import json
-from typing import Dict, Any
+from typing import Dict, Any, Iterable, Union
+from analitycs.data_transformations import collect_columns
+from analitycs.nesting import nest, to_records
+from analitycs.rollup import Dimension, rollup
 
-def on_time_delivery_summary(df: pd.DataFrame) -> Dict[str, Any]:
+# Columnas que leen los resúmenes: las tools proyectan solo estas en la consulta y,
+# con lotes (iter_pg_frames), solo se conservan estas
+OTD_COLUMNS = ["item_name_so", "if_create_date", "delivery_status", "so_doc_number", "po_doc_number", "po_status"]
+IMPORTS_COLUMNS = ["ano", "marca", "proveedor", "descripcion_arancelaria", "incoterm", "amount_us_fob", "amount_us_cif"]
+
+def on_time_delivery_summary(df: Union[pd.DataFrame, Iterable[pd.DataFrame]]) -> Dict[str, Any]:
     """
     Calcula el % de entrega a tiempo por mes (según if_create_date),
     usando:
@@ -29,9 +37,12 @@ def on_time_delivery_summary(df: pd.DataFrame) -> Dict[str, Any]:
         }
       }
     }
+
+    df también puede ser un iterable de DataFrames (lotes de un cursor del
+    servidor); cada lote se reduce a OTD_COLUMNS al llegar.
     """
 
-    df = df.copy()
+    df = collect_columns(df, OTD_COLUMNS).copy()
 
     # Tratar "" como NaN para item_name_so
     df["item_name_so"] = df["item_name_so"].replace("", np.nan)
@@ -128,9 +139,10 @@ def on_time_delivery_summary(df: pd.DataFrame) -> Dict[str, Any]:
             .reset_index(name="count")
         )
 
-        for _, row in status_grp.iterrows():
-            status_key = str(row["po_status_clean"])
-            po_status_distribution[status_key] = int(row["count"])
+        po_status_distribution = dict(zip(
+            status_grp["po_status_clean"].astype(str).tolist(),
+            status_grp["count"].astype("int64").tolist(),
+        ))
 
     # -------------------------
     # 4) OUTPUT FINAL
@@ -147,7 +159,7 @@ def on_time_delivery_summary(df: pd.DataFrame) -> Dict[str, Any]:
 
     return output
   
-def build_imports_summary(df: pd.DataFrame) -> Dict[str, Any]:
+def build_imports_summary(df: Union[pd.DataFrame, Iterable[pd.DataFrame]]) -> Dict[str, Any]:
     """
     df: DataFrame con columnas:
     ['dia', 'mes', 'ano', 'importador', 'partida_arancelaria',
@@ -155,9 +167,11 @@ def build_imports_summary(df: pd.DataFrame) -> Dict[str, Any]:
      'pais_de_adquisicion', 'via_de_transporte', 'transportador',
      'proveedor', 'unidad_de_medida', 'amount_us_cif', 'peso_neto',
      'cantidad', 'amount_us_fob', 'pais', 'marca', 'incoterm']
+    o un iterable de DataFrames con esas columnas (lotes de un cursor del
+    servidor); cada lote se reduce a IMPORTS_COLUMNS con montos numéricos.
     """
 
-    df = df.copy()
+    df = collect_columns(df, IMPORTS_COLUMNS, numeric=["amount_us_fob", "amount_us_cif"]).copy()
 
     # Asegurar numéricos
     for col in ["amount_us_fob", "amount_us_cif"]:
@@ -179,13 +193,13 @@ def build_imports_summary(df: pd.DataFrame) -> Dict[str, Any]:
         .reset_index()
     )
 
-    amounts_by_year = {
-        int(row["ano"]): {
-            "amount_us_fob": float(row["amount_us_fob"]),
-            "amount_us_cif": float(row["amount_us_cif"])
-        }
-        for _, row in year_agg.iterrows()
-    }
+    amounts_by_year = dict(zip(
+        year_agg["ano"].astype("int64").tolist(),
+        to_records(year_agg, {
+            "amount_us_fob": ("amount_us_fob", "float"),
+            "amount_us_cif": ("amount_us_cif", "float"),
+        }),
+    ))
 
     summary = {
         "years": years,
@@ -197,87 +211,41 @@ def build_imports_summary(df: pd.DataFrame) -> Dict[str, Any]:
         "total_records": int(len(df))
     }
 
-    # Helper para convertir a lista de dicts con sumatorias
-    def brand_distribution_for_year(df_year: pd.DataFrame, top_n: int = 15):
-        if "marca" not in df_year.columns:
-            return []
-        grp = (
-            df_year.groupby("marca", dropna=False)[["amount_us_fob", "amount_us_cif"]]
-            .sum()
-            .reset_index()
-        )
-        # Ordenar por monto total (FOB + CIF) desc
-        grp["total_amount"] = grp["amount_us_fob"] + grp["amount_us_cif"]
-        grp = grp.sort_values("total_amount", ascending=False).head(top_n)
-
-        records = []
-        for _, row in grp.iterrows():
-            records.append({
-                "brand": None if pd.isna(row["marca"]) else str(row["marca"]),
-                "amount_us_fob": float(row["amount_us_fob"]),
-                "amount_us_cif": float(row["amount_us_cif"])
-            })
-        return records
-
-    def arancel_distribution_for_year(df_year: pd.DataFrame, top_n: int = 15):
-        if "descripcion_arancelaria" not in df_year.columns:
-            return []
-        grp = (
-            df_year.groupby("descripcion_arancelaria", dropna=False)[["amount_us_fob", "amount_us_cif"]]
-            .sum()
-            .reset_index()
-        )
-        grp["total_amount"] = grp["amount_us_fob"] + grp["amount_us_cif"]
-        grp = grp.sort_values("total_amount", ascending=False).head(top_n)
-
-        records = []
-        for _, row in grp.iterrows():
-            records.append({
-                "descripcion_arancelaria": None if pd.isna(row["descripcion_arancelaria"]) else str(row["descripcion_arancelaria"]),
-                "amount_us_fob": float(row["amount_us_fob"]),
-                "amount_us_cif": float(row["amount_us_cif"])
-            })
-        return records
-
-    def incoterm_distribution_for_year(df_year: pd.DataFrame):
-        if "incoterm" not in df_year.columns:
-            return []
-        grp = (
-            df_year.groupby("incoterm", dropna=False)[["amount_us_fob", "amount_us_cif"]]
-            .sum()
-            .reset_index()
-        )
-
-        records = []
-        for _, row in grp.iterrows():
-            records.append({
-                "incoterm": None if pd.isna(row["incoterm"]) else str(row["incoterm"]),
-                "amount_us_fob": float(row["amount_us_fob"]),
-                "amount_us_cif": float(row["amount_us_cif"])
+    # --------------------------
+    # DISTRIBUCIONES POR AÑO (una agregación por (ano, dimensión))
+    # --------------------------
+    # dimensión -> (columna, campo de salida, top N por año o None para todas)
+    distributions = {
+        "brand_distribution": ("marca", "brand", 15),
+        "arancel_distribution": ("descripcion_arancelaria", "descripcion_arancelaria", 15),
+        "incoterm_distribution": ("incoterm", "incoterm", None),
+        "vendor_distribution": ("proveedor", "proveedor", 15),
+    }
+    amounts = {"amount_us_fob": ("amount_us_fob", "sum"), "amount_us_cif": ("amount_us_cif", "sum")}
+    rollups = rollup(df, {
+        name: Dimension(("ano", column), amounts, dropna=False)
+        for name, (column, _, _) in distributions.items()
+        if column in df.columns
+    })
+
+    by_year: Dict[str, Dict[int, list]] = {}
+    for name, grp in rollups.items():
+        column, field, top_n = distributions[name]
+        grp = grp.reset_index()
+        grp = grp[grp["ano"].notna()]
+        if top_n is not None:
+            # Top N por año según monto total (FOB + CIF) desc; empates en orden de la clave
+            grp["total_amount"] = grp["amount_us_fob"] + grp["amount_us_cif"]
+            rank = grp.groupby("ano")["total_amount"].rank(method="first", ascending=False)
+            grp = grp[rank <= top_n].sort_values(["ano", "total_amount"], ascending=[True, False])
+        by_year[name] = {
+            int(year): records
+            for year, records in nest(grp, "ano", {
+                field: (column, "str_or_none"),
+                "amount_us_fob": ("amount_us_fob", "float"),
+                "amount_us_cif": ("amount_us_cif", "float"),
             })
-        return records
-
-    def vendor_distribution_for_year(df_year: pd.DataFrame, top_n: int = 15):
-      if "proveedor" not in df_year.columns:
-          return []
-      grp = (
-          df_year.groupby("proveedor", dropna=False)[["amount_us_fob", "amount_us_cif"]]
-          .sum()
-          .reset_index()
-      )
-      grp["total_amount"] = grp["amount_us_fob"] + grp["amount_us_cif"]
-      grp = grp.sort_values("total_amount", ascending=False).head(top_n)
-
-      records = []
-      for _, row in grp.iterrows():
-          proveedor = None if pd.isna(row["proveedor"]) else str(row["proveedor"])
-          records.append({
-              "proveedor": proveedor,
-              "amount_us_fob": float(row["amount_us_fob"]),
-              "amount_us_cif": float(row["amount_us_cif"])
-          })
-      return records
-
+        }
 
     # --------------------------
     # BLOQUES POR AÑO
@@ -287,14 +255,9 @@ def build_imports_summary(df: pd.DataFrame) -> Dict[str, Any]:
     }
 
     for year in years:
-        df_year = df[df["ano"] == year].copy()
-
-        year_key = f"year_{year}"
-        output[year_key] = {
-            "brand_distribution": brand_distribution_for_year(df_year),
-            "arancel_distribution": arancel_distribution_for_year(df_year),
-            "incoterm_distribution": incoterm_distribution_for_year(df_year),
-            "vendor_distribution": vendor_distribution_for_year(df_year),
+        output[f"year_{year}"] = {
+            name: by_year.get(name, {}).get(year, [])
+            for name in distributions
         }
 
-    return output
\ No newline at end of file
+    return output
@@ -1,5 +1,6 @@
 import pandas as pd
 import numpy as np
+from analitycs.nesting import to_records
 
 
 def analyze_inside_sales(df: pd.DataFrame) -> dict:
@@ -101,16 +102,12 @@ def analyze_inside_sales(df: pd.DataFrame) -> dict:
         )
         by_is = by_is.rename(columns={"mean": "avg_days", "median": "median_days"})
 
-        response_time_by_inside = []
-        for _, row in by_is.iterrows():
-            response_time_by_inside.append(
-                {
-                    "inside_sales": row["inside_sales"],
-                    "count": int(row["count"]),
-                    "avg_days": _to_float_or_none(row["avg_days"]),
-                    "median_days": _to_float_or_none(row["median_days"]),
-                }
-            )
+        response_time_by_inside = to_records(by_is, {
+            "inside_sales": ("inside_sales", None),
+            "count": ("count", "int"),
+            "avg_days": ("avg_days", "float_or_none"),
+            "median_days": ("median_days", "float_or_none"),
+        })
 
         response_time = {
             "overall": overall_response_time,
@@ -233,25 +230,19 @@ def analyze_inside_sales(df: pd.DataFrame) -> dict:
 
     base_sorted = base.sort_values("score", ascending=False)
 
-    scorecard_list = []
-    for _, row in base_sorted.iterrows():
-        scorecard_list.append(
-            {
-                "inside_sales": row["inside_sales"],
-                "total_opportunities": int(row["total_opportunities"]),
-                "total_quotes": int(row["total_quotes"]),
-                "total_sos": int(row["total_sos"]),
-                "total_q_amount": _to_float_or_none(row["total_q_amount"]),
-                "total_so_amount": _to_float_or_none(row["total_so_amount"]),
-                "hitrate_op_q_volume": _to_float_or_none(row["hitrate_op_q_volume"]),
-                "hitrate_q_so_volume": _to_float_or_none(row["hitrate_q_so_volume"]),
-                "hitrate_q_so_amount": _to_float_or_none(row["hitrate_q_so_amount"]),
-                "avg_response_time_days": _to_float_or_none(
-                    row["avg_response_time_days"]
-                ),
-                "score": _to_float_or_none(row["score"]),
-            }
-        )
+    scorecard_list = to_records(base_sorted, {
+        "inside_sales": ("inside_sales", None),
+        "total_opportunities": ("total_opportunities", "int"),
+        "total_quotes": ("total_quotes", "int"),
+        "total_sos": ("total_sos", "int"),
+        "total_q_amount": ("total_q_amount", "float_or_none"),
+        "total_so_amount": ("total_so_amount", "float_or_none"),
+        "hitrate_op_q_volume": ("hitrate_op_q_volume", "float_or_none"),
+        "hitrate_q_so_volume": ("hitrate_q_so_volume", "float_or_none"),
+        "hitrate_q_so_amount": ("hitrate_q_so_amount", "float_or_none"),
+        "avg_response_time_days": ("avg_response_time_days", "float_or_none"),
+        "score": ("score", "float_or_none"),
+    })
 
     result = {
         "summary": summary,
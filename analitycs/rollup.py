@@ -0,0 +1,66 @@
+import numpy as np
+import pandas as pd
+from dataclasses import dataclass, field
+from typing import Dict, Optional, Sequence, Tuple, Union
+
+# A group key: a column name or a Series aligned with the frame (e.g. a filled or binned column)
+Key = Union[str, pd.Series]
+
+
+@dataclass(frozen=True)
+class Dimension:
+    """One rollup of a frame: group keys plus named aggregations.
+
+    aggregations maps output name -> (column, func), where func is any pandas
+    groupby aggregation ("sum", "mean", "nunique", ...); (None, "size") counts
+    rows. Aggregations over columns missing from the frame are skipped. where
+    restricts the rows (boolean Series) and dropna=False keeps missing keys,
+    both as in DataFrame.groupby.
+    """
+    keys: Tuple[Key, ...]
+    aggregations: Dict[str, Tuple[Optional[str], str]] = field(default_factory=dict)
+    where: Optional[pd.Series] = None
+    dropna: bool = True
+
+
+def rollup(df: pd.DataFrame, dimensions: Dict[str, Dimension]) -> Dict[str, pd.DataFrame]:
+    """Aggregate df along several dimensions, one vectorized groupby per dimension.
+
+    Each dimension projects only the columns it reads and computes all of
+    its aggregations on a single grouping, so there are no frame copies and
+    no per-group or per-row Python loops. Results are indexed by
+    the keys in sorted order, like DataFrame.groupby(sort=True).
+    """
+    results: Dict[str, pd.DataFrame] = {}
+    for name, dimension in dimensions.items():
+        aggregations = {
+            out: (column, func)
+            for out, (column, func) in dimension.aggregations.items()
+            if column is None or column in df.columns
+        }
+        columns = list(dict.fromkeys(
+            [key for key in dimension.keys if isinstance(key, str)]
+            + [column for column, _ in aggregations.values() if column is not None]
+        ))
+        frame = df[columns]
+        keys = list(dimension.keys)
+        if dimension.where is not None:
+            frame = frame[dimension.where]
+            keys = [key if isinstance(key, str) else key[dimension.where] for key in keys]
+        grouped = frame.groupby(keys, sort=True, dropna=dimension.dropna)
+
+        named = {out: spec for out, spec in aggregations.items() if spec[0] is not None}
+        result = grouped.agg(**named) if named else pd.DataFrame(index=grouped.size().index)
+        for out, (column, func) in aggregations.items():
+            if column is None:
+                result[out] = grouped.size()
+        results[name] = result[list(aggregations)]
+    return results
+
+
+def bin_labels(values: Union[pd.Series, np.ndarray], edges: Sequence[float], labels: Sequence[str]) -> np.ndarray:
+    """Label each value with its bin: labels[i] for edges[i-1] <= value < edges[i].
+
+    Values below edges[0] get labels[0]; values from edges[-1] up, and NaN, get labels[-1].
+    """
+    return np.asarray(labels, dtype=object)[np.digitize(np.asarray(values, dtype=float), edges)]
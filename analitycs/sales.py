@@ -1,6 +1,8 @@
 import pandas as pd
 import numpy as np
-from typing import Dict, Any
+from typing import Dict, Any, List
+from analitycs.rollup import Dimension, rollup, bin_labels
+from analitycs.nesting import group_codes, nest, to_records, unique_lists
 
 def finance_summary(df: pd.DataFrame) -> dict:
     """
@@ -23,6 +25,42 @@ def finance_summary(df: pd.DataFrame) -> dict:
         start_date = None
         end_date = None
 
+    # -----------------------------
+    # RESÚMENES POR DIMENSIÓN (una sola llamada al motor de rollups)
+    # -----------------------------
+    has_subsidiary = {"subsidiary", "period"}.issubset(df.columns)
+    has_margin = {"gross_usd", "gross_margin", "customer"}.issubset(df.columns)
+    dimensions = {
+        "country": Dimension(("customer_country",), {"net_usd": ("net_usd", "sum")}),
+        "sales_rep": Dimension(("sales_rep",), {"net_usd": ("net_usd", "sum")}),
+        # Términos nulos se agrupan como "None"
+        "terms": Dimension((df["terms"].fillna("None"),), {"net_usd": ("net_usd", "sum")}),
+        "customer": Dimension(("customer",), {"net_usd": ("net_usd", "sum")}),
+    }
+    if has_margin:
+        dimensions["margin"] = Dimension(
+            ("customer",),
+            {"gross_usd_sum": ("gross_usd", "sum"), "gross_margin_sum": ("gross_margin", "sum")},
+            where=df["gross_usd"] > 0,
+        )
+    if has_subsidiary:
+        dimensions["subsidiary"] = Dimension(("period", "subsidiary"), {
+            "gross_usd": ("gross_usd", "sum"),
+            "net_usd": ("net_usd", "sum"),
+            "gross_margin": ("gross_margin", "sum"),
+            "gm_pct_prom": ("gross_margin_pct", "mean"),
+            "customers": ("customer", "nunique"),
+            "transactions": (None, "size"),
+        })
+    if "incoterms" in df.columns:
+        # Incoterms nulos se agrupan como "None"; clientes nulos se descartan al armar el bloque
+        dimensions["incoterms"] = Dimension(
+            ("customer", df["incoterms"].fillna("None")),
+            {"order_count": ("so_number", "nunique"), "amount": ("net_usd", "sum")},
+            dropna=False,
+        )
+    rollups = rollup(df, dimensions)
+
     # -----------------------------
     # 2) BOOKINGS
     # -----------------------------
@@ -30,21 +68,9 @@ def finance_summary(df: pd.DataFrame) -> dict:
     order_count = int(len(df))
     average_booking = float(df["net_usd"].mean()) if order_count > 0 else 0.0
 
-    # Bookings por país
-    bookings_by_country = (
-        df.groupby("customer_country")["net_usd"].sum()
-        .to_dict()
-    )
-
-    # Bookings por sales rep
-    bookings_by_sales_rep = (
-        df.groupby("sales_rep")["net_usd"].sum()
-        .to_dict()
-    )
-
-    # Forzar float en los diccionarios
-    bookings_by_country = {k: float(v) for k, v in bookings_by_country.items()}
-    bookings_by_sales_rep = {k: float(v) for k, v in bookings_by_sales_rep.items()}
+    # Bookings por país y por sales rep (forzando float)
+    bookings_by_country = {k: float(v) for k, v in rollups["country"]["net_usd"].items()}
+    bookings_by_sales_rep = {k: float(v) for k, v in rollups["sales_rep"]["net_usd"].items()}
 
     # -----------------------------
     # 3) GROSS MARGIN
@@ -63,44 +89,21 @@ def finance_summary(df: pd.DataFrame) -> dict:
 
     # ---------- 3.a) MARGIN BUCKETS ----------
     margin_bucket_summary = []
-    if {"gross_usd", "gross_margin", "customer"}.issubset(df.columns):
-        df_mb = df[df["gross_usd"] > 0].copy()
-
-        if not df_mb.empty:
-            # Agregar por cliente para calcular su GM% ponderado
-            cust = df_mb.groupby("customer").agg(
-                gross_usd_sum=("gross_usd", "sum"),
-                gross_margin_sum=("gross_margin", "sum"),
-            )
-            cust["gm_pct"] = cust["gross_margin_sum"] / cust["gross_usd_sum"]
-
-            def bucket(p):
-                if p < 0.10:
-                    return "0-10%"
-                elif p < 0.20:
-                    return "10-20%"
-                else:
-                    return "20%+"
-
-            cust["margin_bucket"] = cust["gm_pct"].apply(bucket)
-
-            bucket_agg = (
-                cust.groupby("margin_bucket")
-                .agg(
-                    num_customers=("gm_pct", "size"),
-                    gross_usd_sum=("gross_usd_sum", "sum"),
-                )
-                .reset_index()
-            )
-
-            margin_bucket_summary = [
-                {
-                    "margin_bucket": str(row["margin_bucket"]),
-                    "num_customers": int(row["num_customers"]),
-                    "gross_usd_sum": float(row["gross_usd_sum"]),
-                }
-                for _, row in bucket_agg.iterrows()
-            ]
+    if has_margin and not rollups["margin"].empty:
+        # GM% ponderado por cliente, clasificado en 0-10%, 10-20% y 20%+
+        cust = rollups["margin"]
+        cust = cust.assign(gm_pct=cust["gross_margin_sum"] / cust["gross_usd_sum"])
+        buckets = pd.Series(bin_labels(cust["gm_pct"], [0.10, 0.20], ["0-10%", "10-20%", "20%+"]), index=cust.index)
+        bucket_agg = rollup(cust, {"bucket": Dimension(
+            (buckets,),
+            {"num_customers": (None, "size"), "gross_usd_sum": ("gross_usd_sum", "sum")},
+        )})["bucket"]
+
+        margin_bucket_summary = to_records(bucket_agg.rename_axis("margin_bucket").reset_index(), {
+            "margin_bucket": ("margin_bucket", "str"),
+            "num_customers": ("num_customers", "int"),
+            "gross_usd_sum": ("gross_usd_sum", "float"),
+        })
 
     # -----------------------------
     # 4) TERMS
@@ -120,21 +123,14 @@ def finance_summary(df: pd.DataFrame) -> dict:
         terms_pct = {term: 0.0 for term in terms_counts.keys()}
 
     # Bookings por término (rellenando None como "None")
-    df_terms = df.copy()
-    df_terms["terms_clean"] = df_terms["terms"].fillna("None")
-    bookings_by_terms = (
-        df_terms.groupby("terms_clean")["net_usd"].sum()
-        .to_dict()
-    )
-    bookings_by_terms = {k: float(v) for k, v in bookings_by_terms.items()}
+    bookings_by_terms = {k: float(v) for k, v in rollups["terms"]["net_usd"].items()}
 
     # -----------------------------
     # 5) TOP CLIENTES & CONCENTRACIÓN
     # -----------------------------
     top_n = 10
     top_clients_series = (
-        df.groupby("customer")["net_usd"]
-        .sum()
+        rollups["customer"]["net_usd"]
         .sort_values(ascending=False)
         .head(top_n)
     )
@@ -154,77 +150,49 @@ def finance_summary(df: pd.DataFrame) -> dict:
     # 6) KPI POR SUBSIDIARY
     # -----------------------------
     kpi_by_subsidiary = []
-    if {"subsidiary", "period"}.issubset(df.columns):
-        grp = df.groupby(["period", "subsidiary"])
-
-        for (period, subsidiary), g in grp:
-            gross_usd = float(g["gross_usd"].sum()) if "gross_usd" in g else 0.0
-            net_usd = float(g["net_usd"].sum()) if "net_usd" in g else 0.0
-            gross_margin = float(g["gross_margin"].sum()) if "gross_margin" in g else 0.0
-
-            if "gross_margin_pct" in g and len(g) > 0:
-                gm_pct_prom = float(g["gross_margin_pct"].mean())
-            else:
-                gm_pct_prom = 0.0
-
-            customers = int(g["customer"].nunique()) if "customer" in g else 0
-            transactions = int(len(g))
-
-            if "gross_margin" in g and "gross_usd" in g and gross_usd != 0:
-                gross_margin_pct_weighted = float(g["gross_margin"].sum() / gross_usd)
-            else:
-                gross_margin_pct_weighted = 0.0
-
-            kpi_by_subsidiary.append({
-                "period": period,
-                "subsidiary": subsidiary,
-                "gross_usd": gross_usd,
-                "net_usd": net_usd,
-                "gross_margin": gross_margin,
-                "gm_pct_prom": gm_pct_prom,
-                "customers": customers,
-                "transactions": transactions,
-                "gross_margin_pct_weighted": gross_margin_pct_weighted
-            })
+    if has_subsidiary:
+        kpi = rollups["subsidiary"].reset_index()
+        for column in ("gross_usd", "net_usd", "gross_margin", "gm_pct_prom", "customers"):
+            if column not in kpi:
+                kpi[column] = 0.0
+        if "gross_margin" in rollups["subsidiary"]:
+            kpi["gross_margin_pct_weighted"] = (
+                kpi["gross_margin"] / kpi["gross_usd"].where(kpi["gross_usd"] != 0)
+            ).fillna(0.0)
+        else:
+            kpi["gross_margin_pct_weighted"] = 0.0
+
+        kpi_by_subsidiary = to_records(kpi, {
+            "period": ("period", None),
+            "subsidiary": ("subsidiary", None),
+            "gross_usd": ("gross_usd", "float"),
+            "net_usd": ("net_usd", "float"),
+            "gross_margin": ("gross_margin", "float"),
+            "gm_pct_prom": ("gm_pct_prom", "float"),
+            "customers": ("customers", "int"),
+            "transactions": ("transactions", "int"),
+            "gross_margin_pct_weighted": ("gross_margin_pct_weighted", "float"),
+        })
 
     # -----------------------------
     # 7) INCOTERMS POR CLIENTE
     # -----------------------------
     incoterms_block = {"by_customer": []}
     if "incoterms" in df.columns:
-        df_inc = df.copy()
-        df_inc["incoterm_clean"] = df_inc["incoterms"].fillna("None")
-
-        # Agrupar por cliente + incoterm
-        inc_grp = (
-            df_inc
-            .groupby(["customer", "incoterm_clean"], dropna=False)
-            .agg(
-                order_count=("so_number", "nunique"),
-                amount=("net_usd", "sum")
-            )
-            .reset_index()
+        # Clientes nulos se descartan; los incoterms de cada cliente quedan en orden
+        by_customer = nest(
+            rollups["incoterms"].rename_axis(["customer", "incoterm"]).reset_index(),
+            "customer",
+            {
+                "incoterm": ("incoterm", None),
+                "order_count": ("order_count", "int"),
+                "amount": ("amount", "float"),
+            },
         )
-
-        # Armar estructura por cliente
-        by_customer = []
-        for customer, sub in inc_grp.groupby("customer"):
-            details = [
-                {
-                    "incoterm": row["incoterm_clean"],
-                    "order_count": int(row["order_count"]),
-                    "amount": float(row["amount"])
-                }
-                for _, row in sub.iterrows()
-            ]
-
-            by_customer.append({
-                "customer": customer,
-                "incoterms_count": len(sub),
-                "incoterms_detail": details
-            })
-
-        incoterms_block["by_customer"] = by_customer
+        incoterms_block["by_customer"] = [
+            {"customer": customer, "incoterms_count": len(details), "incoterms_detail": details}
+            for customer, details in by_customer
+        ]
 
     # -----------------------------
     # 8) DATA SAMPLE (primer y último registro)
@@ -294,15 +262,14 @@ def opportunity_summary(df: pd.DataFrame) -> dict:
          'customer','subsidiary','status','inside_sales']
     """
 
-    # Asegurar tipo fecha
+    # Asegurar tipo fecha (una sola vez; min/max y groupby ignoran las fechas nulas)
     df["tran_date"] = pd.to_datetime(df["tran_date"], errors="coerce")
-    df_valid = df.dropna(subset=["tran_date"])
 
     # -----------------------------
     # 1) PERIODO
     # -----------------------------
-    start_ts = df_valid["tran_date"].min()
-    end_ts   = df_valid["tran_date"].max()
+    start_ts = df["tran_date"].min()
+    end_ts   = df["tran_date"].max()
 
     start_date_obj = start_ts.date()
     end_date_obj   = end_ts.date()
@@ -318,79 +285,41 @@ def opportunity_summary(df: pd.DataFrame) -> dict:
     same_week = (start_iso.year == end_iso.year) and (start_iso.week == end_iso.week)
 
     # -----------------------------
-    # 2) PERFORMANCE DE OPORTUNIDADES
-    #    (siempre calculamos todo, pero mostramos según regla)
-    # -----------------------------
-
-    # --- Por día ---
-    daily_counts = (
-        df_valid
-        .groupby(["inside_sales", df_valid["tran_date"].dt.date])
-        .size()
-        .reset_index(name="count")
-    )
-    daily_counts.columns = ["inside_sales", "date", "count"]
-    daily_counts["date"] = daily_counts["date"].astype(str)
-    low_daily_all = daily_counts[daily_counts["count"] < 4]
-
-    # --- Por semana ---
-    weekly_counts = (
-        df_valid
-        .groupby(["inside_sales", df_valid["tran_date"].dt.to_period("W")])
-        .size()
-        .reset_index(name="count")
-    )
-    weekly_counts.columns = ["inside_sales", "week", "count"]
-    weekly_counts["week"] = weekly_counts["week"].astype(str)
-    low_weekly_all = weekly_counts[weekly_counts["count"] < 15]
-
-    # --- Por mes ---
-    monthly_counts = (
-        df_valid
-        .groupby(["inside_sales", df_valid["tran_date"].dt.to_period("M")])
-        .size()
-        .reset_index(name="count")
-    )
-    monthly_counts.columns = ["inside_sales", "month", "count"]
-    monthly_counts["month"] = monthly_counts["month"].astype(str)
-    low_monthly_all = monthly_counts[monthly_counts["count"] < 50]
-
-    # -----------------------------
-    # 3) REGLA DE QUÉ MOSTRAR
+    # 2) REGLA DE QUÉ MOSTRAR
     # -----------------------------
     # Caso 1: mismo día y es hoy -> solo daily
     if (start_date_obj == end_date_obj) and (start_date_obj == today):
-        low_daily   = low_daily_all
-        low_weekly  = pd.DataFrame(columns=["inside_sales", "week", "count"])
-        low_monthly = pd.DataFrame(columns=["inside_sales", "month", "count"])
-
+        granularity = "daily"
     # Caso 2: fechas distintas pero misma semana -> solo weekly
     elif (start_date_obj != end_date_obj) and same_week:
-        low_daily   = pd.DataFrame(columns=["inside_sales", "date", "count"])
-        low_weekly  = low_weekly_all
-        low_monthly = pd.DataFrame(columns=["inside_sales", "month", "count"])
-
+        granularity = "weekly"
     # Caso 3: resto -> trabajar por mes (mismo mes o meses distintos)
+    # Aquí, si hay varios meses, saldrán como: month: "2025-10", "2025-11", etc.
     else:
-        low_daily   = pd.DataFrame(columns=["inside_sales", "date", "count"])
-        low_weekly  = pd.DataFrame(columns=["inside_sales", "week", "count"])
-        low_monthly = low_monthly_all
-        # Aquí, si hay varios meses, saldrán como:
-        # month: "2025-10", "2025-11", etc.
-
-    low_performance_indicators = {
-        "daily":   low_daily.to_dict(orient="records"),
-        "weekly":  low_weekly.to_dict(orient="records"),
-        "monthly": low_monthly.to_dict(orient="records"),
-    }
+        granularity = "monthly"
 
-     # Distribución por cliente
-    dist_customer = (
-        df.groupby("customer").size()
+    # -----------------------------
+    # 3) PERFORMANCE DE OPORTUNIDADES
+    #    (solo se calcula la granularidad que muestra la regla)
+    # -----------------------------
+    # granularidad -> (columna, clave de periodo sobre tran_date ya parseada, umbral de bajo desempeño)
+    granularities = {
+        "daily": ("date", lambda dates: dates.dt.date, 4),
+        "weekly": ("week", lambda dates: dates.dt.to_period("W"), 15),
+        "monthly": ("month", lambda dates: dates.dt.to_period("M"), 50),
+    }
+    column, period_key, threshold = granularities[granularity]
+    counts = (
+        df
+        .groupby(["inside_sales", period_key(df["tran_date"])])
+        .size()
         .reset_index(name="count")
-        .sort_values("count", ascending=False)
-        .to_dict(orient="records")
     )
+    counts.columns = ["inside_sales", column, "count"]
+    counts[column] = counts[column].astype(str)
+
+    low_performance_indicators = {"daily": [], "weekly": [], "monthly": []}
+    low_performance_indicators[granularity] = counts[counts["count"] < threshold].to_dict(orient="records")
 
     # Distribución por inside
     dist_inside = (
@@ -408,27 +337,22 @@ def opportunity_summary(df: pd.DataFrame) -> dict:
         .to_dict(orient="records")
     )
 
-    # Oportunidades con 2+ días sin cotización
-    df_valid = df.copy()
-    df_valid["tran_date"] = pd.to_datetime(df_valid["tran_date"], errors="coerce")
-
+    # Oportunidades con 2+ días sin cotización (tran_date ya viene parseada)
     today = pd.Timestamp.today().normalize()
-    df_valid["days_open"] = (today - df_valid["tran_date"]).dt.days
-
-    overdue = df_valid[
-        (df_valid["status"] == "In Progress") &
-        (df_valid["days_open"] >= 2)
-    ].copy()
+    days_open = (today - df["tran_date"]).dt.days
 
+    overdue_rows = np.flatnonzero(((df["status"] == "In Progress") & (days_open >= 2)).to_numpy())[:10]
+    overdue = df.iloc[overdue_rows].copy()
+    overdue["days_open"] = days_open.iloc[overdue_rows]
     overdue["tran_date"] = overdue["tran_date"].dt.date.astype(str)
 
-    overdue_list = overdue.head(10).to_dict(orient="records")
+    overdue_list = overdue.to_dict(orient="records")
     
-    total_opportunities = len(df_valid)
-    total_customers = df_valid["customer"].nunique()
+    total_opportunities = len(df)
+    total_customers = df["customer"].nunique()
 
     customer_counts = (
-        df_valid.groupby("customer")
+        df.groupby("customer")
         .size()
         .reset_index(name="count")
         .sort_values("count", ascending=False)
@@ -820,22 +744,19 @@ def summarize_is_bookings(df: pd.DataFrame) -> Dict[str, Any]:
             so_list=("SO", lambda x: list(x)),  # lista de SO por inside+status
         )
     )
-    status_distribution_by_is = []
-
-    for inside, group in status_by_inside.groupby("InsideSale"):
-        status_summary = {}
-        for _, row in group.iterrows():
-            status = row["Status"]
-            status_summary[status] = {
-                "num_orders": int(row["num_orders"]),
-                "total_amount": float(row["total_amount"]),
-                "so_list": list(row["so_list"]),
-            }
-
-        status_distribution_by_is.append({
-            "inside_sale": inside,
-            "status_summary": status_summary,
-        })
+    status_distribution_by_is = [
+        {"inside_sale": inside, "status_summary": status_summary}
+        for inside, status_summary in nest(
+            status_by_inside,
+            "InsideSale",
+            {
+                "num_orders": ("num_orders", "int"),
+                "total_amount": ("total_amount", "float"),
+                "so_list": ("so_list", "list"),
+            },
+            key="Status",
+        )
+    ]
 
     # 03. Top Customers by amount
     top_customers_raw = (
@@ -873,22 +794,22 @@ def summarize_is_bookings(df: pd.DataFrame) -> Dict[str, Any]:
     top5_customers_top5_insides = top5_customers_per_inside[
         top5_customers_per_inside["InsideSale"].isin(insides_keep)
     ]
-    result = []
-
-    for inside, group in top5_customers_top5_insides.groupby("InsideSale"):
-        total_top5_amount = float(group["amount"].sum())
-        result.append({
+    result = [
+        {
             "inside_sale": inside,
-            "top5_total_amount": total_top5_amount,
-            "top_customers": [
-                {
-                    "customer": row["Customer"],
-                    "numero_ordenes": int(row["numero_ordenes"]),
-                    "amount": float(row["amount"]),
-                }
-                for _, row in group.iterrows()
-            ],
-        })
+            "top5_total_amount": float(sum(customer["amount"] for customer in top_customers)),
+            "top_customers": top_customers,
+        }
+        for inside, top_customers in nest(
+            top5_customers_top5_insides,
+            "InsideSale",
+            {
+                "customer": ("Customer", None),
+                "numero_ordenes": ("numero_ordenes", "int"),
+                "amount": ("amount", "float"),
+            },
+        )
+    ]
     top5_insides_by_customer = sorted(result, key=lambda x: x["top5_total_amount"], reverse=True)
     
     general_summary = general_summary_is_q_so(df)
@@ -901,9 +822,141 @@ def summarize_is_bookings(df: pd.DataFrame) -> Dict[str, Any]:
         "full_data_reference": None  # Placeholder for full data reference
     }
     
+def _quotes_payload(
+    by_inside: pd.DataFrame,
+    status_by_inside: pd.DataFrame,
+    incoterms_by_inside: pd.DataFrame,
+    low_margin: pd.DataFrame,
+    subsidiary_base: pd.DataFrame,
+    inside_by_subsidiary: pd.DataFrame,
+    general_summary: Dict[str, Any],
+) -> Dict[str, Any]:
+    """Build the summarize_is_quotes payload from its aggregated frames.
+
+    Shared by the row-level (summarize_is_quotes) and SuiteQL rollup
+    (summarize_is_quote_rollups) paths, which only differ in how the frames
+    are computed. Frames are sorted by their keys, like groupby output;
+    low_margin / subsidiary_base may be None when the columns are missing.
+    """
+    # 01. KPI by Inside Sale
+    kpi_by_inside = by_inside[["InsideSale", "total_amount", "num_quotes"]].copy()
+    kpi_by_inside["avg_quote_amount"] = (
+        kpi_by_inside["total_amount"] / kpi_by_inside["num_quotes"]
+    )
+    kpi_by_inside["rank_by_amount"] = (
+        kpi_by_inside["total_amount"].rank(method="dense", ascending=False).astype(int)
+    )
+    kpi_by_inside = kpi_by_inside.sort_values("rank_by_amount").to_dict("records")
+
+    # 02. Funnel by Inside Sale
+    status_summary_by_inside = [
+        {"inside_sale": inside, "status_summary": status_summary}
+        for inside, status_summary in nest(
+            status_by_inside,
+            "InsideSale",
+            {
+                "num_quotes": ("num_quotes", "int"),
+                "total_amount": ("total_amount", "float"),
+                "quote_list": ("quote_list", "list"),
+            },
+            key="Status",
+        )
+    ]
+
+    # 03. Incoterms distribution
+    incoterms_by_inside = incoterms_by_inside.copy()
+    incoterms_by_inside["amount_share_inside"] = (
+        incoterms_by_inside
+        .groupby("InsideSale")["total_amount"]
+        .transform(lambda x: x / x.sum())
+    )
+    incoterms_payload = [
+        {"inside_sale": inside, "incoterms": incoterms}
+        for inside, incoterms in nest(
+            incoterms_by_inside,
+            "InsideSale",
+            {
+                "incoterm": ("IncoTerms", None),
+                "num_quotes": ("num_quotes", "int"),
+                "total_amount": ("total_amount", "float"),
+                "amount_share_inside": ("amount_share_inside", "float"),
+            },
+        )
+    ]
+
+    # 04. Inside Sales con total cotizado < 30000 USD
+    inside_sales_under_30000 = to_records(by_inside[by_inside["total_amount"] < 30000], {
+        "inside_sale": ("InsideSale", None),
+        "total_amount": ("total_amount", "float"),
+    })
+
+    # 05. Cotizaciones con margen < 20%
+    quotes_under_20pct_margin = []
+    if low_margin is not None:
+        quotes_under_20pct_margin = to_records(low_margin, {
+            "quote_number": ("QuoteNumber", None),
+            "inside_sale": ("InsideSale", None),
+            "customer": ("Customer", None),
+            "amount": ("Amount", "float_or_none"),
+            "gross_margin": ("GrossMargin" if "GrossMargin" in low_margin.columns else None, "float_or_none"),
+            "gross_margin_pct": ("GrossMarginPct", "float_or_none"),
+            "status": ("Status", None),
+        })
+
+    # 06. Agrupación por Subsidiary con distribución por InsideSale
+    subsidiary_distribution = []
+    if subsidiary_base is not None:
+        # Participación de cada inside en el total de su subsidiary
+        inside_by_subsidiary = inside_by_subsidiary.copy()
+        totals = subsidiary_base.set_index("Subsidiary")
+        sub_amount = inside_by_subsidiary["Subsidiary"].map(totals["total_amount"]).to_numpy(dtype=float)
+        sub_quotes = inside_by_subsidiary["Subsidiary"].map(totals["num_quotes"]).to_numpy(dtype=float)
+        amount = inside_by_subsidiary["total_amount"].to_numpy(dtype=float)
+        quotes = inside_by_subsidiary["num_quotes"].to_numpy(dtype=float)
+        inside_by_subsidiary["amount_share_subsidiary"] = np.divide(
+            amount, sub_amount, out=np.zeros_like(amount), where=sub_amount > 0
+        )
+        inside_by_subsidiary["quotes_share_subsidiary"] = np.divide(
+            quotes, sub_quotes, out=np.zeros_like(quotes), where=sub_quotes > 0
+        )
+
+        # Insides de cada subsidiary, de mayor a menor monto
+        inside_distribution = dict(nest(
+            inside_by_subsidiary.sort_values(
+                ["Subsidiary", "total_amount"], ascending=[True, False]
+            ),
+            "Subsidiary",
+            {
+                "inside_sale": ("InsideSale", None),
+                "total_amount": ("total_amount", "float"),
+                "num_quotes": ("num_quotes", "int"),
+                "amount_share_subsidiary": ("amount_share_subsidiary", "float"),
+                "quotes_share_subsidiary": ("quotes_share_subsidiary", "float"),
+            },
+        ))
+
+        subsidiary_distribution = [
+            {**row, "inside_sale_distribution": inside_distribution.get(row["subsidiary"], [])}
+            for row in to_records(subsidiary_base, {
+                "subsidiary": ("Subsidiary", None),
+                "total_amount": ("total_amount", "float"),
+                "num_quotes": ("num_quotes", "int"),
+            })
+        ]
+
+    return {
+        "general_summary": general_summary,
+        "kpi_by_inside": kpi_by_inside,
+        "status_summary_by_inside": status_summary_by_inside,
+        "incoterms_by_inside": incoterms_payload,
+        "inside_sales_under_30000": inside_sales_under_30000,
+        "quotes_under_20pct_margin": quotes_under_20pct_margin,
+        "subsidiary_distribution": subsidiary_distribution,
+        "full_data_reference": None,
+    }
+
 def summarize_is_quotes(df: pd.DataFrame) -> Dict[str, Any]:
     """Generate summaries from the IS quotes DataFrame."""
-    # 01. KPI by Inside Sale
     df = df.copy()
 
     # Asegurar tipos numéricos para evitar problemas
@@ -913,8 +966,8 @@ def summarize_is_quotes(df: pd.DataFrame) -> Dict[str, Any]:
     if "GrossMarginPct" in df.columns:
         df["GrossMarginPct"] = pd.to_numeric(df["GrossMarginPct"], errors="coerce")
 
-    # 01. KPI by Inside Sale
-    kpi_by_inside = (
+    # KPI y total cotizado por Inside Sale
+    by_inside = (
         df.groupby("InsideSale", as_index=False)
         .agg(
             total_amount=("Amount", "sum"),
@@ -922,18 +975,6 @@ def summarize_is_quotes(df: pd.DataFrame) -> Dict[str, Any]:
         )
     )
 
-    kpi_by_inside["avg_quote_amount"] = (
-        kpi_by_inside["total_amount"] / kpi_by_inside["num_quotes"]
-    )
-
-    kpi_by_inside["rank_by_amount"] = (
-        kpi_by_inside["total_amount"].rank(method="dense", ascending=False).astype(int)
-    )
-
-    kpi_by_inside = kpi_by_inside.sort_values("rank_by_amount").to_dict("records")
-    
-
-    # 02. Funnel + Win Rate by Inside Sale
     status_by_inside = (
         df.groupby(["InsideSale", "Status"], as_index=False)
         .agg(
@@ -943,50 +984,6 @@ def summarize_is_quotes(df: pd.DataFrame) -> Dict[str, Any]:
         )
     )
 
-    # Cálculo robusto de winrate (corrigiendo closed_amount)
-    df_win = df.copy()
-    df_win["is_closed"] = df_win["Status"].eq("Closed")
-    df_win["closed_amount"] = np.where(df_win["is_closed"], df_win["Amount"], 0.0)
-
-    winrate = (
-        df_win.groupby("InsideSale", as_index=False)
-        .agg(
-            total_quotes=("QuoteNumber", "nunique"),
-            total_amount=("Amount", "sum"),
-            closed_quotes=("is_closed", "sum"),
-            closed_amount=("closed_amount", "sum"),
-        )
-    )
-
-    # Evitar división por cero
-    winrate["win_rate_quotes"] = np.where(
-        winrate["total_quotes"] > 0,
-        winrate["closed_quotes"] / winrate["total_quotes"],
-        np.nan,
-    )
-    winrate["win_rate_amount"] = np.where(
-        winrate["total_amount"] > 0,
-        winrate["closed_amount"] / winrate["total_amount"],
-        np.nan,
-    )
-
-    status_summary_by_inside = []
-
-    for inside, group in status_by_inside.groupby("InsideSale"):
-        status_summary = {}
-        for _, row in group.iterrows():
-            status = row["Status"]
-            status_summary[status] = {
-                "num_quotes": int(row["num_quotes"]),
-                "total_amount": float(row["total_amount"]),
-                "quote_list": list(row["quote_list"]),
-            }
-        status_summary_by_inside.append({
-            "inside_sale": inside,
-            "status_summary": status_summary
-        })
-
-    # 03. Incoterms distribution
     incoterms_by_inside = (
         df.groupby(["InsideSale", "IncoTerms"], as_index=False)
         .agg(
@@ -994,61 +991,12 @@ def summarize_is_quotes(df: pd.DataFrame) -> Dict[str, Any]:
             total_amount=("Amount", "sum")
         )
     )
-    incoterms_by_inside["amount_share_inside"] = (
-        incoterms_by_inside
-        .groupby("InsideSale")["total_amount"]
-        .transform(lambda x: x / x.sum())
-    )
-    incoterms_payload = []
-
-    for inside, group in incoterms_by_inside.groupby("InsideSale"):
-        incoterms_payload.append({
-            "inside_sale": inside,
-            "incoterms": [
-                {
-                    "incoterm": row["IncoTerms"],
-                    "num_quotes": int(row["num_quotes"]),
-                    "total_amount": float(row["total_amount"]),
-                    "amount_share_inside": float(row["amount_share_inside"]),
-                }
-                for _, row in group.iterrows()
-            ],
-        })
-
-    # 04. NUEVO: Inside Sales con total cotizado < 30000 USD
-    totals_by_inside = (
-        df.groupby("InsideSale", as_index=False)
-        .agg(total_amount=("Amount", "sum"))
-    )
-
-    under_30000 = totals_by_inside[totals_by_inside["total_amount"] < 30000]
 
-    inside_sales_under_30000 = [
-        {
-            "inside_sale": row["InsideSale"],
-            "total_amount": float(row["total_amount"]),
-        }
-        for _, row in under_30000.iterrows()
-    ]
-
-    # 05. NUEVO: Cotizaciones con margen < 20%
-    quotes_under_20pct_margin = []
+    low_margin = None
     if "GrossMarginPct" in df.columns:
-        low_margin_df = df[df["GrossMarginPct"] < 0.20].copy()
-
-        for _, row in low_margin_df.iterrows():
-            quotes_under_20pct_margin.append({
-                "quote_number": row["QuoteNumber"],
-                "inside_sale": row["InsideSale"],
-                "customer": row["Customer"],
-                "amount": float(row["Amount"]) if pd.notna(row["Amount"]) else None,
-                "gross_margin": float(row["GrossMargin"]) if "GrossMargin" in df.columns and pd.notna(row["GrossMargin"]) else None,
-                "gross_margin_pct": float(row["GrossMarginPct"]) if pd.notna(row["GrossMarginPct"]) else None,
-                "status": row["Status"],
-            })
+        low_margin = df[df["GrossMarginPct"] < 0.20]
 
-    # 06. NUEVO: Agrupación por Subsidiary con distribución por InsideSale
-    subsidiary_distribution = []
+    subsidiary_base = inside_by_subsidiary = None
     if {"Subsidiary", "InsideSale", "QuoteNumber", "Amount"}.issubset(df.columns):
         subsidiary_base = (
             df.groupby("Subsidiary", as_index=False)
@@ -1057,7 +1005,6 @@ def summarize_is_quotes(df: pd.DataFrame) -> Dict[str, Any]:
                 num_quotes=("QuoteNumber", "nunique"),
             )
         )
-
         inside_by_subsidiary = (
             df.groupby(["Subsidiary", "InsideSale"], as_index=False)
             .agg(
@@ -1066,74 +1013,122 @@ def summarize_is_quotes(df: pd.DataFrame) -> Dict[str, Any]:
             )
         )
 
-        for _, sub_row in subsidiary_base.iterrows():
-            subsidiary = sub_row["Subsidiary"]
-            sub_total_amount = float(sub_row["total_amount"])
-            sub_num_quotes = int(sub_row["num_quotes"])
-
-            sub_inside = inside_by_subsidiary[
-                inside_by_subsidiary["Subsidiary"] == subsidiary
-            ].copy()
-            sub_inside = sub_inside.sort_values("total_amount", ascending=False)
-
-            inside_distribution = []
-            for _, inside_row in sub_inside.iterrows():
-                inside_total_amount = float(inside_row["total_amount"])
-                inside_num_quotes = int(inside_row["num_quotes"])
-                inside_distribution.append({
-                    "inside_sale": inside_row["InsideSale"],
-                    "total_amount": inside_total_amount,
-                    "num_quotes": inside_num_quotes,
-                    "amount_share_subsidiary": (
-                        inside_total_amount / sub_total_amount
-                        if sub_total_amount > 0
-                        else 0.0
-                    ),
-                    "quotes_share_subsidiary": (
-                        inside_num_quotes / sub_num_quotes
-                        if sub_num_quotes > 0
-                        else 0.0
-                    ),
-                })
-
-            subsidiary_distribution.append({
-                "subsidiary": subsidiary,
-                "total_amount": sub_total_amount,
-                "num_quotes": sub_num_quotes,
-                "inside_sale_distribution": inside_distribution,
-            })
-
     # General summary (tu función existente)
     general_summary = general_summary_is_q_so(df)
 
-    return {
-        "general_summary": general_summary,
-        "kpi_by_inside": kpi_by_inside,
-        "status_summary_by_inside": status_summary_by_inside,
-        "incoterms_by_inside": incoterms_payload,
-        "inside_sales_under_30000": inside_sales_under_30000,
-        "quotes_under_20pct_margin": quotes_under_20pct_margin,
-        "subsidiary_distribution": subsidiary_distribution,
-        "full_data_reference": None,
+    return _quotes_payload(
+        by_inside, status_by_inside, incoterms_by_inside, low_margin,
+        subsidiary_base, inside_by_subsidiary, general_summary,
+    )
+
+def summarize_is_quote_rollups(rollups: pd.DataFrame, quotes: pd.DataFrame) -> Dict[str, Any]:
+    """Build the summarize_is_quotes payload from SuiteQL rollups instead of quote rows.
+
+    rollups holds one row per group of each grouping set (see QUOTE_ROLLUPS),
+    tagged in rollup_name; quotes has one row per quote with the columns of
+    the status lists and the low-margin list (see get_quotes_status_lists).
+    """
+    rollups = rollups.copy()
+    rollups["total_amount"] = pd.to_numeric(rollups["total_amount"], errors="coerce").fillna(0.0)
+    for col in ("num_quotes", "num_customers"):
+        rollups[col] = pd.to_numeric(rollups[col], errors="coerce").fillna(0).astype(int)
+
+    def level(rollup: str, keys: list) -> pd.DataFrame:
+        # Igual que groupby: sin claves nulas y ordenado por las claves
+        part = rollups[rollups["rollup_name"] == rollup].dropna(subset=keys)
+        return part.sort_values(keys, kind="stable").reset_index(drop=True)
+
+    quotes = quotes.copy()
+    for col in ("Amount", "GrossMargin", "GrossMarginPct"):
+        quotes[col] = pd.to_numeric(quotes[col], errors="coerce")
+
+    # quote_list de cada (InsideSale, Status), como en summarize_is_quotes
+    status_by_inside = level("inside_status", ["InsideSale", "Status"])
+    quote_list = quotes.groupby(["InsideSale", "Status"])["QuoteNumber"].agg(list)
+    status_by_inside["quote_list"] = [
+        quote_list.get(key, []) for key in zip(status_by_inside["InsideSale"], status_by_inside["Status"])
+    ]
+
+    # General summary (mismo formato que general_summary_is_q_so)
+    total = rollups[rollups["rollup_name"] == "total"]
+    total = total.iloc[0] if len(total) else None
+    general_total = {
+        "total_amount": float(total["total_amount"]) if total is not None else 0.0,
+        "total_transactions": int(total["num_quotes"]) if total is not None else 0,
+        "total_customers": int(total["num_customers"]) if total is not None else 0,
+        "start_date": str(total["first_date"]) if total is not None and pd.notna(total["first_date"]) else "NaT",
+        "end_date": str(total["last_date"]) if total is not None and pd.notna(total["last_date"]) else "NaT",
     }
-    
+
+    by_period = level("period", ["period"])
+    period_summary = by_period[["period", "total_amount", "num_quotes", "num_customers"]].rename(
+        columns={"num_quotes": "total_transactions", "num_customers": "total_customers"}
+    )
+    period_summary["avg_ticket"] = period_summary["total_amount"] / period_summary["total_transactions"]
+    customers_by_period = by_period[["period", "num_customers"]].rename(columns={"num_customers": "customers"})
+
+    timeline_general = level("day", ["CreateDate"])[["CreateDate", "total_amount", "num_quotes"]].rename(
+        columns={"num_quotes": "total_transactions"}
+    )
+
+    general_summary = {
+        "general_total": general_total,
+        "period_summary": period_summary.to_dict(orient="records"),
+        "customer_summary": {
+            "total_unique_customers": general_total["total_customers"],
+            "customers_by_period": customers_by_period.to_dict(orient="records"),
+        },
+        "timeline_general": timeline_general.to_dict(orient="records"),
+    }
+
+    return _quotes_payload(
+        level("inside_sale", ["InsideSale"]),
+        status_by_inside,
+        level("inside_incoterm", ["InsideSale", "IncoTerms"]),
+        quotes[quotes["GrossMarginPct"] < 0.20],
+        level("subsidiary", ["Subsidiary"]),
+        level("subsidiary_inside", ["Subsidiary", "InsideSale"]),
+        general_summary,
+    )
+
+def _summary_with_lists(
+    df: pd.DataFrame,
+    key: str,
+    aggregations: Dict[str, Any],
+    lists: Dict[str, str],
+) -> pd.DataFrame:
+    """Aggregate df by key (missing keys included, as groupby(dropna=False)) plus
+    sorted lists of the distinct non-missing values of some columns per group.
+
+    Groups are the factorized codes of key, so the numeric aggregations and
+    the lists (built by one sort-and-split over all groups) line up row by row.
+    """
+    codes, keys = group_codes(df[key], dropna=False)
+    summary = df.groupby(codes, sort=True).agg(**aggregations).reset_index(drop=True)
+    summary.insert(0, key, keys)
+    for out, column in lists.items():
+        summary[out] = unique_lists(codes, len(keys), df[column])
+    return summary
+
 def summarize_items_quoted(df: pd.DataFrame) -> Dict[str, Any]:
     """Generate summaries from the items quoted DataFrame."""
     # Add calculated column for line value
     df["line_value"] = df["qty"] * df["unit_price"]
     # 01. More Used Vendor Summary
     vendor_summary = (
-        df.groupby("selected_vendor", dropna=False, as_index=False)
-        .agg(
-            num_quotes=("quote", "nunique"),
-            num_lines=("item", "count"),
-            total_qty=("qty", "sum"),
-            num_customers=("customer", "nunique"),
-            num_brands=("brand", "nunique"),
-            num_product_groups=("product_group", "nunique"),
-            total_value=("line_value", "sum"),  # opcional
-            quotes_list=("quote", lambda x: sorted(x.unique())),
-            brands_list=("brand", lambda x: sorted(x.dropna().unique())),
+        _summary_with_lists(
+            df,
+            "selected_vendor",
+            {
+                "num_quotes": ("quote", "nunique"),
+                "num_lines": ("item", "count"),
+                "total_qty": ("qty", "sum"),
+                "num_customers": ("customer", "nunique"),
+                "num_brands": ("brand", "nunique"),
+                "num_product_groups": ("product_group", "nunique"),
+                "total_value": ("line_value", "sum"),  # opcional
+            },
+            {"quotes_list": "quote", "brands_list": "brand"},
         )
         .sort_values(["num_quotes", "num_lines"], ascending=False)
         .to_dict("records")
@@ -1141,15 +1136,18 @@ def summarize_items_quoted(df: pd.DataFrame) -> Dict[str, Any]:
 
     # 02. More demanded Brand Summary
     brand_summary = (
-        df.groupby("brand", dropna=False, as_index=False)
-        .agg(
-            num_quotes=("quote", "nunique"),
-            num_lines=("item", "count"),
-            total_qty=("qty", "sum"),
-            num_customers=("customer", "nunique"),
-            num_vendors=("selected_vendor", "nunique"),
-            total_value=("line_value", "sum"),
-            quotes_list=("quote", lambda x: sorted(x.unique())),
+        _summary_with_lists(
+            df,
+            "brand",
+            {
+                "num_quotes": ("quote", "nunique"),
+                "num_lines": ("item", "count"),
+                "total_qty": ("qty", "sum"),
+                "num_customers": ("customer", "nunique"),
+                "num_vendors": ("selected_vendor", "nunique"),
+                "total_value": ("line_value", "sum"),
+            },
+            {"quotes_list": "quote"},
         )
         .sort_values(["num_lines", "total_qty"], ascending=False)
         .to_dict("records")
@@ -1166,42 +1164,40 @@ def summarize_items_quoted(df: pd.DataFrame) -> Dict[str, Any]:
             total_value=("line_value", "sum"),
         )
     )
-    customer_brand = (
-        customer_brand_df
-        .sort_values(["customer", "total_qty"], ascending=[True, False])
-        .groupby("customer", as_index=False)
-        .apply(
-            lambda g: pd.Series({
-                "brands": [
-                    {
-                        "brand": row["brand"],
-                        "num_quotes": int(row["num_quotes"]),
-                        "num_lines": int(row["num_lines"]),
-                        "total_qty": float(row["total_qty"]),
-                        "num_vendors": int(row["num_vendors"]),
-                        "total_value": float(row["total_value"]),
-                    }
-                    for _, row in g.iterrows()
-                ]
-            }),
-            include_groups=False
+    customer_brand = [
+        {"customer": customer, "brands": brands}
+        for customer, brands in nest(
+            customer_brand_df.sort_values(["customer", "total_qty"], ascending=[True, False]),
+            "customer",
+            {
+                "brand": ("brand", None),
+                "num_quotes": ("num_quotes", "int"),
+                "num_lines": ("num_lines", "int"),
+                "total_qty": ("total_qty", "float"),
+                "num_vendors": ("num_vendors", "int"),
+                "total_value": ("total_value", "float"),
+            },
         )
-        .to_dict("records")
-    )
+    ]
 
     # 04. Summary by Inside Sales 
     inside_sales_summary = (
-        df.groupby("inside_sales", dropna=False, as_index=False)
-        .agg(
-            num_product_groups=("product_group", "nunique"),
-            product_groups_list=("product_group", lambda x: sorted({pg for pg in x if pd.notna(pg)})),
-
-            num_brands=("brand", "nunique"),
-            brands_list=("brand", lambda x: sorted({b for b in x if pd.notna(b)})),
-
-            num_vendors=("selected_vendor", "nunique"),
-            vendors_list=("selected_vendor", lambda x: sorted({v for v in x if pd.notna(v)})),
+        _summary_with_lists(
+            df,
+            "inside_sales",
+            {
+                "num_product_groups": ("product_group", "nunique"),
+                "num_brands": ("brand", "nunique"),
+                "num_vendors": ("selected_vendor", "nunique"),
+            },
+            {
+                "product_groups_list": "product_group",
+                "brands_list": "brand",
+                "vendors_list": "selected_vendor",
+            },
         )
+        [["inside_sales", "num_product_groups", "product_groups_list", "num_brands",
+          "brands_list", "num_vendors", "vendors_list"]]
         .sort_values(["num_product_groups", "num_brands", "num_vendors"], ascending=False)
         .head(10)
         .to_dict("records")
@@ -1265,6 +1261,21 @@ def analize_hr_desviado(df_cus_brand: pd.DataFrame, df_country_brand: pd.DataFra
         .reset_index(drop=True)
         .to_dict(orient="records")
     )
+    return build_hr_desviado(df_customer_2025, df_customer_2024, df_country_2025, df_country_2024)
+
+
+def build_hr_desviado(
+    df_customer_2025: List[Dict[str, Any]],
+    df_customer_2024: List[Dict[str, Any]],
+    df_country_2025: List[Dict[str, Any]],
+    df_country_2024: List[Dict[str, Any]],
+    current_year: int = 2025,
+) -> Dict[str, Any]:
+    """
+    Arma la respuesta de get_vendors_to_quote a partir de las filas (ya ordenadas
+    por probabilidad descendente) del año actual (current_year) y del anterior,
+    por cliente/marca y por país/marca.
+    """
     result = {
         "vendors_by_customer_brand": {
             "current": {
@@ -1272,7 +1283,7 @@ def analize_hr_desviado(df_cus_brand: pd.DataFrame, df_country_brand: pd.DataFra
                 "data": df_customer_2025 if len(df_customer_2025) > 0 else "No recent data available this client" 
             },
             "old": {
-                "label": "Based on data before to 2025",
+                "label": f"Based on data before to {current_year}",
                 "data": df_customer_2024 if len(df_customer_2024) > 0 else "No historical data available this client"
             }
         },
@@ -1282,7 +1293,7 @@ def analize_hr_desviado(df_cus_brand: pd.DataFrame, df_country_brand: pd.DataFra
                 "data": df_country_2025 if len(df_country_2025) > 0 else "No recent data available this country"
             },
             "old": {
-                "label": "Based on data before to 2025",
+                "label": f"Based on data before to {current_year}",
                 "data": df_country_2024 if len(df_country_2024) > 0 else "No historical data available this country"
             }
         }
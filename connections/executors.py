@@ -0,0 +1,154 @@
+import os
+import asyncio
+import functools
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict
+from utils.singleflight import SingleFlight, call_key
+
+
+# Backends with their own worker threads. Tools tagged with @uses_backend run
+# their blocking I/O there; untagged tools run on "default".
+BACKENDS = ("netsuite", "postgres", "postgres_dev", "default")
+
+
+class BackendExecutor:
+    """Bounded thread pool for the blocking calls of one backend.
+
+    max_workers caps concurrent calls against the backend and max_queue caps
+    how many calls may wait for a worker; beyond that new calls are rejected
+    instead of piling up. Queue depth and counters are exposed via stats().
+    """
+
+    def __init__(self, name: str, max_workers: int, max_queue: int):
+        self.name = name
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix=f"{name}-io")
+        self._lock = threading.Lock()
+        self._queued = 0
+        self._running = 0
+        self._completed = 0
+        self._failed = 0
+        self._rejected = 0
+
+    def submit(self, fn: Callable[..., Any], *args, **kwargs) -> Future:
+        with self._lock:
+            if self._queued >= self.max_queue:
+                self._rejected += 1
+                raise RuntimeError(f"Backend '{self.name}' is busy: {self._queued} calls already queued")
+            self._queued += 1
+
+        def task():
+            with self._lock:
+                self._queued -= 1
+                self._running += 1
+            ok = False
+            try:
+                result = fn(*args, **kwargs)
+                ok = True
+                return result
+            finally:
+                with self._lock:
+                    self._running -= 1
+                    if ok:
+                        self._completed += 1
+                    else:
+                        self._failed += 1
+
+        try:
+            return self._executor.submit(task)
+        except Exception:
+            with self._lock:
+                self._queued -= 1
+            raise
+
+    async def run(self, fn: Callable[..., Any], *args, **kwargs) -> Any:
+        """Run fn on this backend's threads without blocking the event loop."""
+        return await asyncio.wrap_future(self.submit(fn, *args, **kwargs))
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "max_workers": self.max_workers,
+                "max_queue": self.max_queue,
+                "queue_depth": self._queued,
+                "running": self._running,
+                "completed": self._completed,
+                "failed": self._failed,
+                "rejected": self._rejected,
+            }
+
+
+_executors: Dict[str, BackendExecutor] = {}
+_executors_lock = threading.Lock()
+# Identical in-flight calls of @single_flight tools share one execution
+_single_flight = SingleFlight()
+
+
+def get_executor(backend: str) -> BackendExecutor:
+    """Return the executor of a backend, sized from EXECUTOR_<BACKEND>_WORKERS / _MAX_QUEUE."""
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown backend '{backend}', expected one of {BACKENDS}")
+    executor = _executors.get(backend)
+    if executor is None:
+        with _executors_lock:
+            executor = _executors.get(backend)
+            if executor is None:
+                prefix = f"EXECUTOR_{backend.upper()}"
+                # NetSuite calls beyond the pool size would only wait for a connection
+                if backend == "netsuite":
+                    default_workers = os.environ.get("NETSUITE_POOL_MAX_SIZE", "4")
+                elif backend in ("postgres", "postgres_dev"):
+                    default_workers = os.environ.get("PG_POOL_MAX_SIZE", "4")
+                else:
+                    default_workers = "4"
+                executor = BackendExecutor(
+                    backend,
+                    max_workers=int(os.environ.get(f"{prefix}_WORKERS", default_workers)),
+                    max_queue=int(os.environ.get(f"{prefix}_MAX_QUEUE", "32")),
+                )
+                _executors[backend] = executor
+    return executor
+
+
+def uses_backend(backend: str):
+    """Mark a tool function with the backend its blocking I/O goes to."""
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown backend '{backend}', expected one of {BACKENDS}")
+
+    def decorator(fn):
+        fn.__backend__ = backend
+        return fn
+    return decorator
+
+
+def as_async_tool(fn: Callable[..., Any]) -> Callable[..., Any]:
+    """Wrap a synchronous tool so it runs on its backend executor.
+
+    functools.wraps keeps the name, docstring and signature FastMCP uses to
+    build the tool schema. Tools marked with @single_flight are coalesced
+    before reaching the executor, so duplicates take no worker or queue slot.
+    """
+    executor = get_executor(getattr(fn, "__backend__", "default"))
+
+    @functools.wraps(fn)
+    async def wrapper(*args, **kwargs):
+        if not hasattr(fn, "__single_flight__"):
+            return await executor.run(fn, *args, **kwargs)
+        future = _single_flight.submit(call_key(fn, args, kwargs), lambda: executor.submit(fn, *args, **kwargs))
+        # shield: a cancelled caller must not cancel the execution the others wait on
+        return await asyncio.shield(asyncio.wrap_future(future))
+    return wrapper
+
+
+def single_flight_stats() -> Dict[str, Any]:
+    """Executed vs coalesced calls of @single_flight tools."""
+    return _single_flight.stats()
+
+
+def executor_stats() -> Dict[str, Dict[str, Any]]:
+    """Stats (queue depth, running, counters) of every executor created so far."""
+    with _executors_lock:
+        executors = dict(_executors)
+    return {name: executor.stats() for name, executor in executors.items()}
@@ -0,0 +1,148 @@
+import os
+import time
+import threading
+from collections import defaultdict
+from typing import Any, Callable, Dict, Hashable, List, Optional, Tuple
+import numpy as np
+import pandas as pd
+
+
+def _trigrams(text: str) -> set:
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+class NameIndex:
+    """In-memory trigram index over (id, name) rows for substring lookups.
+
+    search(text) returns the rows whose name contains text ignoring case, like
+    UPPER(name) LIKE '%' || UPPER(text) || '%', without scanning every name:
+    the posting lists of the query trigrams (over upper-cased names) are
+    intersected and only those candidates are checked. Queries shorter than 3
+    characters fall back to a scan. The rows come from loader() and are
+    reloaded every ttl seconds, or earlier through refresh() when a lookup
+    misses.
+    """
+
+    def __init__(self, name: str, loader: Callable[[], pd.DataFrame], ttl: Optional[float] = None):
+        self.name = name
+        self._loader = loader
+        self.ttl = ttl if ttl is not None else float(os.environ.get("NAME_INDEX_TTL", "3600"))
+        # A miss reloads the rows at most once per this many seconds
+        self.refresh_interval = float(os.environ.get("NAME_INDEX_REFRESH_INTERVAL", "60"))
+        self._lock = threading.Lock()
+        self._ids = np.empty(0, dtype=object)
+        self._names = np.empty(0, dtype=object)
+        self._upper = np.empty(0, dtype=object)
+        self._postings: Dict[str, np.ndarray] = {}
+        self._expires_at = 0.0
+        self._loaded_at = float("-inf")
+        self._stats = {"loads": 0, "searches": 0}
+        # Separate from _lock, which is held for a whole (re)load
+        self._stats_lock = threading.Lock()
+
+    def _build(self, rows: pd.DataFrame) -> None:
+        rows = rows[rows["name"].notna()]
+        ids = rows["id"].to_numpy(dtype=object)
+        names = rows["name"].astype(str).to_numpy(dtype=object)
+        upper = np.array([name.upper() for name in names], dtype=object)
+        postings: Dict[str, List[int]] = defaultdict(list)
+        for position, name in enumerate(upper):
+            for gram in _trigrams(name):
+                postings[gram].append(position)
+        self._ids, self._names, self._upper = ids, names, upper
+        self._postings = {gram: np.array(positions, dtype=np.int64) for gram, positions in postings.items()}
+
+    def load(self) -> None:
+        """Load the rows if they were never loaded or are older than ttl."""
+        if self._expires_at > time.monotonic():
+            return
+        with self._lock:
+            if self._expires_at > time.monotonic():
+                return
+            start = time.monotonic()
+            self._build(self._loader())
+            self._loaded_at = time.monotonic()
+            self._expires_at = self._loaded_at + self.ttl
+            with self._stats_lock:
+                self._stats["loads"] += 1
+            print(f"[NAME-INDEX] {self.name}: {len(self._names)} names indexed in {time.monotonic() - start:.2f}s")
+
+    def refresh(self) -> bool:
+        """Reload now unless the rows are younger than refresh_interval.
+
+        Returns whether the rows were reloaded, so a miss can be retried
+        against names created since the last load.
+        """
+        if time.monotonic() - self._loaded_at < self.refresh_interval:
+            return False
+        with self._lock:
+            if time.monotonic() - self._loaded_at < self.refresh_interval:
+                return False
+            self._expires_at = 0.0
+        self.load()
+        return True
+
+    def search(self, text: str) -> pd.DataFrame:
+        """Rows (id, name) whose name contains text (any case), prefix matches first."""
+        self.load()
+        with self._stats_lock:
+            self._stats["searches"] += 1
+        # One consistent snapshot, even if a reload swaps the arrays meanwhile
+        ids, names, upper, postings = self._ids, self._names, self._upper, self._postings
+        text = text.upper()
+        grams = _trigrams(text)
+        if grams:
+            lists = sorted((postings.get(gram, np.empty(0, dtype=np.int64)) for gram in grams), key=len)
+            candidates = lists[0]
+            for positions in lists[1:]:
+                if not len(candidates):
+                    break
+                candidates = np.intersect1d(candidates, positions, assume_unique=True)
+        else:
+            candidates = np.arange(len(names))
+        hits = [int(p) for p in candidates if text in upper[p]]
+        found = pd.DataFrame({"id": ids[hits], "name": names[hits]})
+        prefix = pd.Series([name.startswith(text) for name in upper[hits]], dtype=bool)
+        return pd.concat([found[prefix], found[~prefix]], ignore_index=True)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._stats_lock:
+            return {"names": len(self._names), "trigrams": len(self._postings), **self._stats}
+
+
+def _max_matches() -> int:
+    return int(os.environ.get("NAME_FILTER_MAX_MATCHES", "50"))
+
+
+def resolve_filter(index: NameIndex, value: Optional[str], label: str) -> Tuple[Optional[Tuple[Hashable, ...]], Optional[Dict[str, Any]]]:
+    """Turn a free-text filter into the ids it matches.
+
+    Returns (None, None) when there is no filter and (ids, None) for the
+    query to filter with IN (ids), as the LIKE filter did. A value that
+    matches nothing is retried once against freshly reloaded rows. The tool
+    returns (None, reply) right away instead of running the report when the
+    value still matches nothing, or when it matches more than
+    NAME_FILTER_MAX_MATCHES ids and is not itself one of the names: the
+    reply lists the candidates so the filter can be refined.
+    """
+    if not value:
+        return None, None
+    found = index.search(value)
+    if not len(found) and index.refresh():
+        found = index.search(value)
+    if not len(found):
+        return None, {"message": f"No {label} matches '{value}'.", "filter": label, "value": value, "matches": []}
+    limit = _max_matches()
+    if len(found) > limit:
+        exact = found[found["name"].str.upper() == value.upper()]
+        if not len(exact) or len(exact) > limit:
+            names = found["name"].drop_duplicates()
+            return None, {
+                "message": f"'{value}' matches {len(found)} {label} records; refine the filter with one of the names below.",
+                "filter": label,
+                "value": value,
+                "total_matches": int(len(found)),
+                "matches": names.head(limit).tolist(),
+            }
+        found = exact
+    return tuple(sorted(set(found["id"].tolist()))), None
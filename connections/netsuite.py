@@ -1,8 +1,25 @@
 import os
+import re
+import time
+import shlex
+import threading
 import traceback
+from collections import OrderedDict
 from contextlib import contextmanager
+from datetime import date, timedelta
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+from array import array
 from dotenv import load_dotenv
 import jaydebeapi as jd
+import jpype
+import numpy as np
+import pandas as pd
+from connections.query_cache import QueryResultCache, normalize_query, ttl_for_query
+from connections.range_cache import DayPartitionStore
+from connections.netsuite_dimensions import DimensionCache, RESOLVERS
+from connections.name_index import NameIndex
+from connections.netsuite_querys import PARTITION_ORDER, get_customer_names, get_employee_names
+from connections.executors import get_executor
 # from netsuite_querys import get_bookings_by_period
 # from typing import Any, Dict, List, Optional
 
@@ -10,6 +27,138 @@ import jaydebeapi as jd
 # Load environment variables from .env file (if present)
 load_dotenv()
 
+# Keep driver jar next to this file under lib/NQjc.jar
+DRIVER_JAR_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "lib", "NQjc.jar")
+
+# java.sql.Types codes used by the columnar reader
+_FLOAT_TYPES = {2, 3, 6, 7, 8}          # NUMERIC, DECIMAL, FLOAT, REAL, DOUBLE
+_INT_TYPES = {-6, -5, 4, 5}             # TINYINT, BIGINT, INTEGER, SMALLINT
+_DATE_TYPES = {91}                      # DATE
+_TIMESTAMP_TYPES = {93, 2014}           # TIMESTAMP, TIMESTAMP_WITH_TIMEZONE
+_NAT = np.iinfo(np.int64).min           # int64 sentinel numpy reads as NaT
+_FLOAT, _INT, _DATE, _TIMESTAMP, _STRING = range(5)
+
+_ORDER_BY = re.compile(r"\bORDER\s+BY\b", re.IGNORECASE)
+
+
+def _column_kind(jdbc_type: int) -> int:
+    if jdbc_type in _FLOAT_TYPES:
+        return _FLOAT
+    if jdbc_type in _INT_TYPES:
+        return _INT
+    if jdbc_type in _DATE_TYPES:
+        return _DATE
+    if jdbc_type in _TIMESTAMP_TYPES:
+        return _TIMESTAMP
+    return _STRING
+
+
+def _date_strings(days: np.ndarray) -> np.ndarray:
+    """Epoch days (_NAT for NULL) -> 'YYYY-MM-DD' strings / None, as jaydebeapi returned DATE."""
+    values = days.view("datetime64[D]")
+    text = np.datetime_as_string(values).astype(object)
+    text[np.isnat(values)] = None
+    return text
+
+
+def _timestamp_strings(seconds: np.ndarray, micros: np.ndarray) -> np.ndarray:
+    """Epoch seconds (_NAT for NULL) + microseconds -> str(datetime) strings / None.
+
+    Same text jaydebeapi returned for TIMESTAMP: 'YYYY-MM-DD HH:MM:SS', plus
+    '.ffffff' when the value has a fractional second.
+    """
+    if not len(seconds):
+        return np.empty(0, dtype=object)
+    values = seconds.view("datetime64[s]")
+    text = np.char.replace(np.datetime_as_string(values), "T", " ")
+    fraction = micros != 0
+    if fraction.any():
+        text = np.where(fraction, np.char.add(np.char.add(text, "."), np.char.zfill(micros.astype(str), 6)), text)
+    text = text.astype(object)
+    text[np.isnat(values)] = None
+    return text
+
+
+def _read_frame(rs, meta, max_rows: Optional[int] = None) -> Tuple[pd.DataFrame, int]:
+    """Read up to max_rows rows of a JDBC ResultSet into typed column buffers.
+
+    JDBC only exposes a row cursor, so every cell still costs one typed
+    getter call (getDouble/getLong/getDate/getTimestamp/getString), but
+    values go straight into flat per-column arrays instead of jaydebeapi's
+    getObject + converter + row tuple, and all conversions are done once per
+    column at the end. Numeric columns become float64 (int64 for integer
+    types without NULLs; jaydebeapi returned Python ints for NUMERIC values
+    with scale 0). DATE and TIMESTAMP columns keep jaydebeapi's string
+    output ('YYYY-MM-DD' / 'YYYY-MM-DD HH:MM:SS[.ffffff]'), everything else
+    is read with getString. Returns (frame, rows_read).
+    """
+    ncols = meta.getColumnCount()
+    names = [meta.getColumnName(i) for i in range(1, ncols + 1)]
+    kinds = [_column_kind(meta.getColumnType(i)) for i in range(1, ncols + 1)]
+    buffers: List[Any] = [
+        array("d") if kind == _FLOAT else [] if kind == _STRING else array("q")
+        for kind in kinds
+    ]
+    # Per-column side buffers: rows with a NULL integer, microseconds of timestamps
+    extras: List[Any] = [
+        [] if kind == _INT else array("q") if kind == _TIMESTAMP else None
+        for kind in kinds
+    ]
+    columns = list(zip(range(1, ncols + 1), kinds, buffers, extras))
+    utc = jpype.JClass("java.time.ZoneOffset").UTC if _TIMESTAMP in kinds else None
+    get_double, get_long, get_date, get_timestamp, get_string = (
+        rs.getDouble, rs.getLong, rs.getDate, rs.getTimestamp, rs.getString
+    )
+    was_null, next_row, nan = rs.wasNull, rs.next, np.nan
+
+    n = 0
+    while (max_rows is None or n < max_rows) and next_row():
+        # Columns are read in order: some drivers only allow forward reads within a row
+        for idx, kind, buf, extra in columns:
+            if kind == _FLOAT:
+                value = get_double(idx)
+                buf.append(nan if was_null() else value)
+            elif kind == _STRING:
+                buf.append(get_string(idx))
+            elif kind == _INT:
+                value = get_long(idx)
+                if was_null():
+                    extra.append(n)
+                buf.append(value)
+            elif kind == _DATE:
+                value = get_date(idx)
+                # toLocalDate avoids shifting the date by the JVM time zone
+                buf.append(_NAT if value is None else value.toLocalDate().toEpochDay())
+            else:
+                value = get_timestamp(idx)
+                if value is None:
+                    buf.append(_NAT)
+                    extra.append(0)
+                else:
+                    buf.append(value.toLocalDateTime().toEpochSecond(utc))
+                    extra.append(value.getNanos() // 1000)
+        n += 1
+
+    data: Dict[str, Any] = {}
+    for name, kind, buf, extra in zip(names, kinds, buffers, extras):
+        if kind == _FLOAT:
+            data[name] = np.frombuffer(buf, dtype=np.float64) if n else np.empty(0, dtype=np.float64)
+        elif kind == _STRING:
+            data[name] = np.array(buf, dtype=object)
+        else:
+            values = np.frombuffer(buf, dtype=np.int64) if n else np.empty(0, dtype=np.int64)
+            if kind == _INT:
+                if extra:
+                    values = values.astype(np.float64)
+                    values[extra] = np.nan
+                data[name] = values
+            elif kind == _DATE:
+                data[name] = _date_strings(values)
+            else:
+                micros = np.frombuffer(extra, dtype=np.int64) if n else np.empty(0, dtype=np.int64)
+                data[name] = _timestamp_strings(values, micros)
+    return pd.DataFrame(data, columns=names), n
+
 
 class NetSuiteConnection:
     """Wrapper around jaydebeapi connection for NetSuite.
@@ -24,12 +173,16 @@ class NetSuiteConnection:
 
     def __init__(self):
         self._conn = None
+        self.created_at: Optional[float] = None
+        self.last_used_at: Optional[float] = None
         self.driver = os.environ.get("DRIVER_NETSUITE")
         self.url = os.environ.get("URL_NETSUITE")
         self.usr = os.environ.get("USER_NETSUITE")
         self.pwd = os.environ.get("PWD_NETSUITE")
-        # Keep driver jar next to this file under lib/NQjc.jar
-        self.path_driver = os.path.join(os.path.dirname(os.path.abspath(__file__)), "lib", "NQjc.jar")
+        self.path_driver = DRIVER_JAR_PATH
+        # SQL text -> java PreparedStatement, most recently used last
+        self._statements: "OrderedDict[str, Any]" = OrderedDict()
+        self.statement_cache_size = int(os.environ.get("NETSUITE_STMT_CACHE_SIZE", "32"))
 
     def connect(self) -> bool:
         """Establish the JDBC connection. Returns True on success, False otherwise."""
@@ -39,6 +192,7 @@ class NetSuiteConnection:
 
             # jaydebeapi.connect takes (classname, url, [user, password], jarpath)
             self._conn = jd.connect(self.driver, self.url, [self.usr, self.pwd], self.path_driver)
+            self.created_at = self.last_used_at = time.monotonic()
             return True
         except Exception as e:
             print(f"Failed to connect to NetSuite: {e}")
@@ -54,7 +208,77 @@ class NetSuiteConnection:
             raise RuntimeError("Connection not established. Call connect() first or use the context manager.")
         return self._conn.cursor()
 
+    def is_valid(self, timeout: int = 5) -> bool:
+        """Check that the underlying JDBC connection is still usable."""
+        if not self._conn:
+            return False
+        try:
+            return bool(self._conn.jconn.isValid(timeout))
+        except Exception:
+            return False
+
+    def _close_statements(self) -> None:
+        while self._statements:
+            _, stmt = self._statements.popitem()
+            self._release_statement(stmt)
+
+    def _release_statement(self, stmt) -> None:
+        try:
+            stmt.close()
+        except Exception:
+            pass
+
+    @contextmanager
+    def _result_set(self, sql: str, params=None):
+        """Execute sql on a cached java.sql.PreparedStatement and yield its ResultSet (None if no rows).
+
+        Builders keep the SQL text stable and pass values as parameters, so
+        repeated calls reuse the already parsed statement and only rebind
+        (setObject, as jaydebeapi binds). Only the public JDBC API is used;
+        the result set is closed on exit and the statement stays cached,
+        up to statement_cache_size per connection (0 disables the cache).
+        SQL errors are raised as jaydebeapi.DatabaseError.
+        """
+        if not self._conn:
+            raise RuntimeError("Connection not established. Call connect() first or use the context manager.")
+        cached = self.statement_cache_size > 0
+        stmt = self._statements.get(sql) if cached else None
+        if stmt is None:
+            stmt = self._conn.jconn.prepareStatement(sql)
+            if cached:
+                self._statements[sql] = stmt
+                while len(self._statements) > self.statement_cache_size:
+                    _, evicted = self._statements.popitem(last=False)
+                    self._release_statement(evicted)
+        else:
+            self._statements.move_to_end(sql)
+            stmt.clearParameters()
+
+        rs = None
+        try:
+            try:
+                for idx, value in enumerate(params or (), 1):
+                    stmt.setObject(idx, value)
+                has_rows = stmt.execute()
+            except Exception as e:
+                # Drop the statement in case the failure left it unusable
+                if cached and self._statements.get(sql) is stmt:
+                    del self._statements[sql]
+                cached = False
+                raise jd.DatabaseError(str(e)) from e
+            rs = stmt.getResultSet() if has_rows else None
+            yield rs
+        finally:
+            if rs is not None:
+                try:
+                    rs.close()
+                except Exception:
+                    pass
+            if not cached:
+                self._release_statement(stmt)
+
     def close(self):
+        self._close_statements()
         try:
             if self._conn:
                 self._conn.close()
@@ -81,10 +305,7 @@ class NetSuiteConnection:
         """
         cur = self.cursor()
         try:
-            if params:
-                cur.execute(sql, params)
-            else:
-                cur.execute(sql)
+            cur.execute(sql, params)
             # cursor.description may be None for non-selects
             desc = cur.description or []
             columns = [d[0] for d in desc]
@@ -95,7 +316,547 @@ class NetSuiteConnection:
                 cur.close()
             except Exception:
                 pass
-        
+
+    def iter_query_frames(self, sql: str, params=None, batch_size: Optional[int] = None) -> Iterator[pd.DataFrame]:
+        """Execute a query and yield typed DataFrame batches of at most batch_size rows.
+
+        batch_size defaults to NETSUITE_FETCH_SIZE and is also used as the JDBC
+        fetch size. Rows are read straight into column arrays (see _read_frame)
+        instead of Python tuples. At least one (possibly empty) frame is always
+        yielded.
+        """
+        if batch_size is None:
+            batch_size = int(os.environ.get("NETSUITE_FETCH_SIZE", "1000"))
+        with self._result_set(sql, params) as rs:
+            if rs is None:
+                yield pd.DataFrame()
+                return
+            rs.setFetchSize(batch_size)
+            meta = rs.getMetaData()
+            first = True
+            while True:
+                frame, n = _read_frame(rs, meta, batch_size)
+                if n or first:
+                    yield frame
+                first = False
+                if n < batch_size:
+                    break
+
+    def execute_query_frame(self, sql: str, params=None) -> pd.DataFrame:
+        """Execute a query and return the whole result as a typed DataFrame."""
+        frames = list(self.iter_query_frames(sql, params))
+        if len(frames) == 1:
+            return frames[0]
+        return pd.concat(frames, ignore_index=True)
+
+
+class NetSuiteConnectionPool:
+    """Thread-safe pool of long-lived NetSuite JDBC connections.
+
+    Usage:
+        with get_netsuite_pool().connection() as ns:
+            columns, rows = ns.execute_query(sql)
+
+    Connections are created lazily up to ``max_size`` and kept open between
+    tool calls so steady-state queries skip the JDBC login. On borrow a
+    connection is discarded and replaced when it has been idle longer than
+    ``idle_timeout`` seconds, has lived longer than ``max_lifetime`` seconds
+    or fails validation. ``min_size`` connections are never dropped for
+    being idle.
+
+    Sizes and timeouts default to the NETSUITE_POOL_* environment variables.
+    """
+
+    def __init__(
+        self,
+        min_size: Optional[int] = None,
+        max_size: Optional[int] = None,
+        idle_timeout: Optional[float] = None,
+        max_lifetime: Optional[float] = None,
+        acquire_timeout: Optional[float] = None,
+        validation_timeout: Optional[int] = None,
+    ):
+        self.min_size = min_size if min_size is not None else int(os.environ.get("NETSUITE_POOL_MIN_SIZE", "0"))
+        self.max_size = max_size if max_size is not None else int(os.environ.get("NETSUITE_POOL_MAX_SIZE", "4"))
+        self.idle_timeout = idle_timeout if idle_timeout is not None else float(os.environ.get("NETSUITE_POOL_IDLE_TIMEOUT", "600"))
+        self.max_lifetime = max_lifetime if max_lifetime is not None else float(os.environ.get("NETSUITE_POOL_MAX_LIFETIME", "3600"))
+        self.acquire_timeout = acquire_timeout if acquire_timeout is not None else float(os.environ.get("NETSUITE_POOL_ACQUIRE_TIMEOUT", "120"))
+        self.validation_timeout = validation_timeout if validation_timeout is not None else int(os.environ.get("NETSUITE_POOL_VALIDATION_TIMEOUT", "5"))
+
+        if self.max_size < 1:
+            raise ValueError("NETSUITE_POOL_MAX_SIZE must be at least 1")
+        self.min_size = min(self.min_size, self.max_size)
+
+        # Idle connections, most recently used last (LIFO borrow keeps the hot ones warm)
+        self._idle: List[NetSuiteConnection] = []
+        self._size = 0
+        self._closed = False
+        self._cond = threading.Condition()
+        self._stats = {"connections_created": 0, "connections_discarded": 0, "borrows": 0, "waits": 0}
+
+    def _open_connection(self) -> NetSuiteConnection:
+        conn = NetSuiteConnection()
+        if not conn.connect():
+            raise RuntimeError("Could not establish NetSuite connection")
+        with self._cond:
+            self._stats["connections_created"] += 1
+        return conn
+
+    def _discard(self, conn: NetSuiteConnection) -> None:
+        conn.close()
+        with self._cond:
+            self._size -= 1
+            self._stats["connections_discarded"] += 1
+            self._cond.notify()
+
+    def _is_expired(self, conn: NetSuiteConnection, now: float, idle_count: int) -> bool:
+        if conn.created_at is None or now - conn.created_at > self.max_lifetime:
+            return True
+        # Connections below min_size are kept even when idle for long
+        if idle_count > self.min_size and conn.last_used_at is not None:
+            return now - conn.last_used_at > self.idle_timeout
+        return False
+
+    def acquire(self) -> NetSuiteConnection:
+        """Borrow a validated connection, opening a new one if the pool has room."""
+        deadline = time.monotonic() + self.acquire_timeout
+        while True:
+            conn = None
+            with self._cond:
+                if self._closed:
+                    raise RuntimeError("NetSuite connection pool is closed")
+                if self._idle:
+                    conn = self._idle.pop()
+                elif self._size < self.max_size:
+                    self._size += 1
+                else:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        raise TimeoutError("Timed out waiting for a NetSuite connection from the pool")
+                    self._stats["waits"] += 1
+                    self._cond.wait(remaining)
+                    continue
+                idle_count = len(self._idle) + 1
+
+            if conn is None:
+                # Reserved a slot above: open outside the lock, JDBC login is slow
+                try:
+                    conn = self._open_connection()
+                except Exception:
+                    with self._cond:
+                        self._size -= 1
+                        self._cond.notify()
+                    raise
+            elif self._is_expired(conn, time.monotonic(), idle_count) or not conn.is_valid(self.validation_timeout):
+                print("[NS-POOL] Discarding expired or invalid NetSuite connection")
+                self._discard(conn)
+                continue
+
+            with self._cond:
+                self._stats["borrows"] += 1
+            return conn
+
+    def release(self, conn: NetSuiteConnection, discard: bool = False) -> None:
+        """Return a borrowed connection to the pool (or drop it when discard=True)."""
+        with self._cond:
+            if not (discard or self._closed or conn._conn is None):
+                conn.last_used_at = time.monotonic()
+                self._idle.append(conn)
+                self._cond.notify()
+                return
+        self._discard(conn)
+
+    @contextmanager
+    def connection(self):
+        """Borrow a connection for the duration of a `with` block.
+
+        The connection is always given back, also when the block is left by
+        GeneratorExit (a streaming generator closed early), cancellation or
+        KeyboardInterrupt; it is discarded instead of returned when the block
+        raised and the connection no longer validates.
+        """
+        conn = self.acquire()
+        discard = False
+        try:
+            yield conn
+        except BaseException:
+            discard = not conn.is_valid(self.validation_timeout)
+            raise
+        finally:
+            self.release(conn, discard=discard)
+
+    def fill(self, count: Optional[int] = None) -> int:
+        """Pre-open connections until ``count`` (default min_size) are idle. Returns how many were opened."""
+        target = self.min_size if count is None else min(count, self.max_size)
+        opened = 0
+        while True:
+            with self._cond:
+                if self._closed or len(self._idle) >= target or self._size >= self.max_size:
+                    return opened
+                self._size += 1
+            try:
+                conn = self._open_connection()
+            except Exception:
+                with self._cond:
+                    self._size -= 1
+                raise
+            self.release(conn)
+            opened += 1
+
+    def close(self) -> None:
+        """Close every idle connection; borrowed ones are closed on release."""
+        with self._cond:
+            self._closed = True
+            idle, self._idle = self._idle, []
+            self._cond.notify_all()
+        for conn in idle:
+            self._discard(conn)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._cond:
+            return {
+                "size": self._size,
+                "idle": len(self._idle),
+                "in_use": self._size - len(self._idle),
+                "min_size": self.min_size,
+                "max_size": self.max_size,
+                **self._stats,
+            }
+
+
+_pool: Optional[NetSuiteConnectionPool] = None
+_pool_lock = threading.Lock()
+
+
+def get_netsuite_pool() -> NetSuiteConnectionPool:
+    """Return the process-wide NetSuite connection pool, creating it on first use."""
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = NetSuiteConnectionPool()
+    return _pool
+
+
+_result_cache: Optional[QueryResultCache] = None
+
+
+def get_result_cache() -> QueryResultCache:
+    """Return the process-wide NetSuite result cache (budget from NETSUITE_CACHE_MAX_BYTES)."""
+    global _result_cache
+    if _result_cache is None:
+        with _pool_lock:
+            if _result_cache is None:
+                _result_cache = QueryResultCache()
+    return _result_cache
+
+
+def query_frame(sql: str, params=None, ttl: Optional[float] = None, use_cache: bool = True) -> pd.DataFrame:
+    """Run a query on a pooled connection and return a typed DataFrame.
+
+    Results are cached under the normalized query text plus parameters; ttl
+    defaults to ttl_for_query (short when the range reaches today, long for
+    closed months). The caller always gets its own copy of the frame.
+    """
+    cache = get_result_cache()
+    key = normalize_query(sql, params)
+    if use_cache:
+        cached = cache.get(key)
+        if cached is not None:
+            print("[NS-CACHE] Hit")
+            return cached
+
+    with get_netsuite_pool().connection() as ns:
+        df = ns.execute_query_frame(sql, params)
+
+    if use_cache and cache.put(key, df, ttl if ttl is not None else ttl_for_query(sql, params)):
+        return df.copy()
+    return df
+
+
+def month_ranges(initial_date: str, final_date: str) -> List[Tuple[str, str]]:
+    """Split [initial_date, final_date] into calendar-month ranges ('YYYY-MM-DD' bounds)."""
+    start, end = date.fromisoformat(initial_date), date.fromisoformat(final_date)
+    ranges: List[Tuple[str, str]] = []
+    while start <= end:
+        next_month = (start.replace(day=1) + timedelta(days=32)).replace(day=1)
+        month_end = min(end, next_month - timedelta(days=1))
+        ranges.append((start.isoformat(), month_end.isoformat()))
+        start = next_month
+    return ranges
+
+
+def _run_on_netsuite_executor(run: Callable[[Any], pd.DataFrame], tasks: List[Any], workers: int) -> List[pd.DataFrame]:
+    """Run run(task) for every task on the netsuite backend executor, keeping task order.
+
+    The caller is usually a netsuite worker itself, so it never just waits: it
+    works through the tasks alongside up to workers - 1 helpers. Helpers the
+    executor cannot start right away (workers busy, queue full) find nothing
+    left to do once they run, and the caller only waits for tasks in progress.
+    """
+    results: List[Optional[pd.DataFrame]] = [None] * len(tasks)
+    errors: List[BaseException] = []
+    state = {"next": 0, "done": 0}
+    cond = threading.Condition()
+
+    def drain() -> None:
+        while True:
+            with cond:
+                if errors or state["next"] >= len(tasks):
+                    return
+                i = state["next"]
+                state["next"] += 1
+            error = None
+            try:
+                results[i] = run(tasks[i])
+            except BaseException as e:
+                error = e
+            with cond:
+                state["done"] += 1
+                if error is not None:
+                    errors.append(error)
+                cond.notify_all()
+
+    executor = get_executor("netsuite")
+    for _ in range(workers - 1):
+        try:
+            executor.submit(drain)
+        except RuntimeError:
+            break
+    drain()
+    with cond:
+        cond.wait_for(lambda: state["done"] == state["next"])
+    if errors:
+        raise errors[0]
+    return results
+
+
+def fetch_partitioned(
+    builder: Callable[..., Tuple[str, List[Any]]],
+    initial_date: str,
+    final_date: str,
+    *filters: Any,
+    subsidiaries: Optional[Sequence[int]] = None,
+    max_workers: Optional[int] = None,
+    use_cache: bool = True,
+) -> pd.DataFrame:
+    """Run builder(start, end, *filters) once per month (and per subsidiary) concurrently.
+
+    Each partition borrows its own pooled connection; at most max_workers
+    (NETSUITE_PARALLELISM, default the pool size) run at once, on the netsuite
+    backend executor. Partitions are merged in month, then subsidiary, order
+    and re-sorted by the builder's PARTITION_ORDER columns, so a global ORDER
+    BY survives the split. subsidiaries requires a builder accepting subsidiary=.
+    Builders listed in netsuite_dimensions.RESOLVERS select raw ids; their
+    display names are joined on the merged frame.
+    """
+    if max_workers is None:
+        max_workers = int(os.environ.get("NETSUITE_PARALLELISM", os.environ.get("NETSUITE_POOL_MAX_SIZE", "4")))
+    tasks = [
+        (start, end, subsidiary)
+        for start, end in (month_ranges(initial_date, final_date) or [(initial_date, final_date)])
+        for subsidiary in (subsidiaries or [None])
+    ]
+
+    order_by = PARTITION_ORDER.get(builder.__name__)
+
+    def build(task: Tuple[str, str, Optional[int]]) -> Tuple[str, List[Any]]:
+        start, end, subsidiary = task
+        if subsidiary is None:
+            return builder(start, end, *filters)
+        return builder(start, end, *filters, subsidiary=subsidiary)
+
+    statements = [build(task) for task in tasks]
+    if len(tasks) > 1 and order_by is None and _ORDER_BY.search(statements[0][0]):
+        raise ValueError(f"{builder.__name__} has an ORDER BY; list its columns in PARTITION_ORDER to partition it")
+
+    def run(statement: Tuple[str, List[Any]]) -> pd.DataFrame:
+        return query_frame(*statement, use_cache=use_cache)
+
+    workers = max(1, min(max_workers, len(tasks)))
+    if workers == 1:
+        frames = [run(statement) for statement in statements]
+    else:
+        print(f"[NS-PARTITION] {builder.__name__}: {len(tasks)} partitions, {workers} in parallel")
+        frames = _run_on_netsuite_executor(run, statements, workers)
+
+    non_empty = [frame for frame in frames if len(frame)]
+    if not non_empty:
+        df = frames[0]
+    elif len(non_empty) == 1:
+        df = non_empty[0]
+    else:
+        df = pd.concat(non_empty, ignore_index=True)
+        if order_by:
+            df = df.sort_values(list(order_by), kind="stable", ignore_index=True)
+    resolver = RESOLVERS.get(builder.__name__)
+    return resolver(get_dimension_cache(), df) if resolver else df
+
+
+_dimension_cache: Optional[DimensionCache] = None
+
+
+def get_dimension_cache() -> DimensionCache:
+    """Return the process-wide id -> display name cache (entries live NETSUITE_DIMENSION_TTL seconds)."""
+    global _dimension_cache
+    if _dimension_cache is None:
+        with _pool_lock:
+            if _dimension_cache is None:
+                _dimension_cache = DimensionCache(query_frame)
+    return _dimension_cache
+
+
+_name_indexes: Dict[str, NameIndex] = {}
+
+
+def _name_index(name: str, builder: Callable[[], Tuple[str, List[Any]]]) -> NameIndex:
+    index = _name_indexes.get(name)
+    if index is None:
+        with _pool_lock:
+            index = _name_indexes.get(name)
+            if index is None:
+                index = _name_indexes[name] = NameIndex(name, lambda: query_frame(*builder(), use_cache=False))
+    return index
+
+
+def get_customer_index() -> NameIndex:
+    """Trigram index of customer display names -> entity ids (customer_name filters)."""
+    return _name_index("netsuite_customers", get_customer_names)
+
+
+def get_employee_index() -> NameIndex:
+    """Trigram index of employee 'First Last' names -> employee ids (inside_sales filters)."""
+    return _name_index("netsuite_employees", get_employee_names)
+
+
+_partition_store: Optional[DayPartitionStore] = None
+
+
+def get_partition_store() -> DayPartitionStore:
+    """Return the process-wide day-partitioned store (budget from NETSUITE_PARTITION_MAX_BYTES)."""
+    global _partition_store
+    if _partition_store is None:
+        with _pool_lock:
+            if _partition_store is None:
+                _partition_store = DayPartitionStore()
+    return _partition_store
+
+
+def iter_date_range(
+    builder: Callable[..., Tuple[str, List[Any]]],
+    initial_date: str,
+    final_date: str,
+    *filters: Any,
+    date_column: str,
+    subsidiaries: Optional[Sequence[int]] = None,
+) -> Iterator[pd.DataFrame]:
+    """Yield the day partitions of a date-window query built by builder(initial_date, final_date, *filters).
+
+    Days already in the partition store are served from memory; only the
+    missing day ranges are queried (bypassing the result cache, the store
+    keeps them per day instead), split by month/subsidiary via fetch_partitioned.
+    """
+    def load(start: str, end: str) -> pd.DataFrame:
+        return fetch_partitioned(builder, start, end, *filters, subsidiaries=subsidiaries, use_cache=False)
+
+    return get_partition_store().iter_partitions(
+        builder.__name__,
+        filters,
+        date.fromisoformat(initial_date),
+        date.fromisoformat(final_date),
+        date_column,
+        load,
+    )
+
+
+def query_date_range(
+    builder: Callable[..., Tuple[str, List[Any]]],
+    initial_date: str,
+    final_date: str,
+    *filters: Any,
+    date_column: str,
+    subsidiaries: Optional[Sequence[int]] = None,
+) -> pd.DataFrame:
+    """Same as iter_date_range, stitched into the DataFrame handed to the summarizers."""
+    frames = list(iter_date_range(builder, initial_date, final_date, *filters, date_column=date_column, subsidiaries=subsidiaries))
+    if not frames:
+        return pd.DataFrame()
+    return frames[0] if len(frames) == 1 else pd.concat(frames, ignore_index=True)
+
+
+def start_jvm(jvm_options: Optional[List[str]] = None) -> bool:
+    """Boot the JVM with the NetSuite driver on the classpath.
+
+    Heap size comes from NETSUITE_JVM_HEAP (e.g. "512m") and any extra JVM/JIT
+    flags from NETSUITE_JVM_OPTIONS (e.g. "-XX:+UseSerialGC -XX:TieredStopAtLevel=1").
+    jaydebeapi reuses an already running JVM, so booting it here moves that cost
+    out of the first `jd.connect()`. Returns False if the JVM was already running.
+    """
+    if jpype.isJVMStarted():
+        return False
+
+    if jvm_options is None:
+        jvm_options = []
+        heap = os.environ.get("NETSUITE_JVM_HEAP")
+        if heap:
+            jvm_options.append(f"-Xmx{heap}")
+        jvm_options.extend(shlex.split(os.environ.get("NETSUITE_JVM_OPTIONS", "")))
+
+    # Same classpath and string conversion jaydebeapi would use when starting the JVM itself
+    class_path = [DRIVER_JAR_PATH]
+    if os.environ.get("CLASSPATH"):
+        class_path.extend(os.environ["CLASSPATH"].split(os.pathsep))
+
+    start = time.monotonic()
+    jpype.startJVM(
+        jpype.getDefaultJVMPath(),
+        *jvm_options,
+        f"-Djava.class.path={os.pathsep.join(class_path)}",
+        ignoreUnrecognized=True,
+        convertStrings=True,
+    )
+    print(f"[NS-WARMUP] JVM started in {time.monotonic() - start:.2f}s with options {jvm_options}")
+    return True
+
+
+def load_driver() -> None:
+    """Load and register the NetSuite JDBC driver class (DRIVER_NETSUITE)."""
+    driver = os.environ.get("DRIVER_NETSUITE")
+    if not driver:
+        raise ValueError("Missing DRIVER_NETSUITE environment variable")
+    start = time.monotonic()
+    jpype.JClass(driver)
+    print(f"[NS-WARMUP] Driver {driver} loaded in {time.monotonic() - start:.2f}s")
+
+
+def warm_up_netsuite(prewarm_connections: Optional[int] = None) -> bool:
+    """Start the JVM, load the driver and pre-open pooled connections.
+
+    prewarm_connections defaults to NETSUITE_POOL_PREWARM (or the pool min_size).
+    The dimension cache and the customer/employee name indexes are then
+    preloaded unless NETSUITE_DIMENSION_PRELOAD=0.
+    Failures are logged and reported as False so the server can still start.
+    """
+    try:
+        start_jvm()
+        load_driver()
+        pool = get_netsuite_pool()
+        if prewarm_connections is None:
+            prewarm_connections = int(os.environ.get("NETSUITE_POOL_PREWARM", str(pool.min_size)))
+        if prewarm_connections > 0:
+            start = time.monotonic()
+            opened = pool.fill(prewarm_connections)
+            print(f"[NS-WARMUP] {opened} pooled connection(s) opened in {time.monotonic() - start:.2f}s")
+        if os.environ.get("NETSUITE_DIMENSION_PRELOAD", "1") != "0":
+            get_dimension_cache().preload()
+            get_customer_index().load()
+            get_employee_index().load()
+        return True
+    except Exception as e:
+        print(f"[NS-WARMUP] NetSuite warm-up failed: {e}")
+        traceback.print_exc()
+        return False
+
 # sql = get_bookings_by_period("'2025-07-01'", "'2025-09-30'")
 # print("sql",sql)
 # conn = NetSuiteConnection()
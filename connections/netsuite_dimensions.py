@@ -0,0 +1,289 @@
+import os
+import time
+import threading
+import traceback
+from dataclasses import dataclass
+from datetime import date, timedelta
+from typing import Any, Callable, Dict, List, Optional, Tuple
+import numpy as np
+import pandas as pd
+
+
+@dataclass(frozen=True)
+class Dimension:
+    """A display-name lookup: BUILTIN.DF(column) evaluated on a few rows of source.
+
+    Names are fetched for the rows whose probe column matches the probe keys
+    of the ids we are missing (e.g. one transaction id per unknown entity), so
+    NetSuite resolves each name once instead of once per result row, and the
+    name is exactly what BUILTIN.DF returns inside the report queries.
+    """
+    name: str
+    source: str
+    column: str
+    probe: str
+    where: Optional[str] = None
+    # Filter for the startup preload ('?' binds the oldest day to load); None = on demand only.
+    # Dimensions with the same source, where and preload are preloaded by one query.
+    preload: Optional[str] = None
+
+
+_RECENT_TRANSACTIONS = "t.trandate >= TO_DATE(?, 'YYYY-MM-DD')"
+
+DIMENSIONS: Dict[str, Dimension] = {d.name: d for d in (
+    Dimension("customer", "transaction t", "t.entity", "t.id", preload=_RECENT_TRANSACTIONS),
+    Dimension("employee", "transaction t", "t.employee", "t.id", preload=_RECENT_TRANSACTIONS),
+    Dimension("currency", "transaction t", "t.currency", "t.id", preload=_RECENT_TRANSACTIONS),
+    Dimension("terms", "transaction t", "t.terms", "t.id", preload=_RECENT_TRANSACTIONS),
+    Dimension("incoterm", "transaction t", "t.custbody_evol_incoterms", "t.id", preload=_RECENT_TRANSACTIONS),
+    Dimension("inc", "transaction t", "t.custbody_inc", "t.id", preload=_RECENT_TRANSACTIONS),
+    Dimension("city", "transaction t", "t.custbody_city", "t.id", preload=_RECENT_TRANSACTIONS),
+    Dimension("estimate_status", "transaction t", "t.status", "t.id", where="t.type = 'Estimate'", preload=_RECENT_TRANSACTIONS),
+    Dimension("customer_subsidiary", "CustomerSubsidiaryRelationship csr", "csr.subsidiary", "csr.entity", where="csr.isprimarysub = 'T'", preload="1 = 1"),
+    Dimension("line_subsidiary", "transactionLine tl", "tl.subsidiary", "tl.transaction"),
+    Dimension("item", "transactionLine tl", "tl.item", "tl.transaction"),
+    Dimension("brand", "item i", "i.custitem13", "i.id", preload="1 = 1"),
+    Dimension("product_group", "item i", "i.class", "i.id", preload="1 = 1"),
+    Dimension("country", "EntityAddress ea", "ea.country", "ea.nkey"),
+)}
+
+# Probe keys per query; padded to these sizes so the SQL text (and the
+# prepared statement) repeats
+_PROBE_BUCKETS = (1, 8, 64, 500)
+
+
+def _keys(ids: pd.Series) -> pd.Series:
+    """Normalize ids so integer ids read as int64 or float64 (with NULLs) match."""
+    if pd.api.types.is_numeric_dtype(ids):
+        return ids.astype(np.float64)
+    return ids.astype(object).where(ids.notna(), None).map(lambda v: v if v is None else str(v))
+
+
+class DimensionCache:
+    """In-process id -> display name tables for the NetSuite dimensions.
+
+    Lookups are vectorized (Index.get_indexer). Ids that are unknown or older
+    than NETSUITE_DIMENSION_TTL are fetched incrementally through the
+    dimension's probe query; everything else never goes back to NetSuite.
+    """
+
+    def __init__(self, query: Callable[..., pd.DataFrame], ttl: Optional[float] = None):
+        self._query = query
+        self.ttl = ttl if ttl is not None else float(os.environ.get("NETSUITE_DIMENSION_TTL", "21600"))
+        self._lock = threading.Lock()
+        # dimension -> (names indexed by id, expiry per id)
+        self._tables: Dict[str, Tuple[pd.Series, np.ndarray]] = {}
+        self._stats = {"lookups": 0, "filled_ids": 0, "fill_queries": 0}
+
+    def _store(self, dimension: str, ids: pd.Series, names: pd.Series) -> None:
+        new = pd.Series(names.to_numpy(dtype=object), index=pd.Index(_keys(ids)))
+        new = new[~new.index.duplicated(keep="last")]
+        expires = np.full(len(new), time.monotonic() + self.ttl)
+        with self._lock:
+            current = self._tables.get(dimension)
+            if current is not None:
+                old_names, old_expires = current
+                keep = ~old_names.index.isin(new.index)
+                new = pd.concat([old_names[keep], new])
+                expires = np.concatenate([old_expires[keep], expires])
+            self._tables[dimension] = (new, expires)
+
+    def _fill(self, dimension: Dimension, ids: pd.Series, probes: pd.Series) -> None:
+        pending = pd.DataFrame({"id": _keys(ids), "probe": probes}).dropna().drop_duplicates("id")
+        probe_keys = [p.item() if hasattr(p, "item") else p for p in pending["probe"].drop_duplicates()]
+        where = f"AND {dimension.where}" if dimension.where else ""
+        found: List[pd.DataFrame] = []
+        while probe_keys:
+            size = next((b for b in _PROBE_BUCKETS if b >= len(probe_keys)), _PROBE_BUCKETS[-1])
+            chunk, probe_keys = probe_keys[:size], probe_keys[size:]
+            chunk = chunk + [chunk[-1]] * (size - len(chunk))
+            sql = f"""
+SELECT {dimension.column} AS id, BUILTIN.DF({dimension.column}) AS name
+FROM {dimension.source}
+WHERE {dimension.probe} IN ({", ".join("?" * size)})
+    {where}
+GROUP BY {dimension.column}, BUILTIN.DF({dimension.column})
+"""
+            found.append(self._query(sql, chunk, use_cache=False))
+            with self._lock:
+                self._stats["fill_queries"] += 1
+
+        rows = pd.concat(found, ignore_index=True) if found else pd.DataFrame({"id": [], "name": []})
+        # Ids the probes did not return are stored as unnamed so they are not probed on every call
+        unresolved = pending.loc[~pending["id"].isin(_keys(rows["id"])), "id"]
+        ids, names = _keys(rows["id"]), rows["name"].astype(object)
+        if len(unresolved):
+            ids = pd.concat([ids, unresolved], ignore_index=True)
+            names = pd.concat([names, pd.Series([None] * len(unresolved), dtype=object)], ignore_index=True)
+        self._store(dimension.name, ids, names)
+        with self._lock:
+            self._stats["filled_ids"] += len(pending)
+
+    def names(self, dimension: str, ids: pd.Series, probes: pd.Series) -> pd.Series:
+        """Display names for ids (NULL ids give None), fetching unknown ids via probes."""
+        spec = DIMENSIONS[dimension]
+        keys = _keys(ids)
+        with self._lock:
+            self._stats["lookups"] += 1
+
+        def lookup() -> Tuple[np.ndarray, Optional[pd.Series]]:
+            with self._lock:
+                table = self._tables.get(dimension)
+            if table is None:
+                return np.full(len(keys), -1), None
+            names, expires = table
+            positions = names.index.get_indexer(keys)
+            stale = positions >= 0
+            stale[stale] = expires[positions[stale]] <= time.monotonic()
+            positions[stale] = -1
+            return positions, names
+
+        positions, names = lookup()
+        missing = (positions < 0) & keys.notna().to_numpy()
+        if missing.any():
+            self._fill(spec, ids[missing], probes[missing])
+            positions, names = lookup()
+
+        out = np.full(len(keys), None, dtype=object)
+        hit = positions >= 0
+        if hit.any():
+            out[hit] = names.to_numpy(dtype=object)[positions[hit]]
+        return pd.Series(out, index=ids.index, dtype=object)
+
+    def preload(self, days: Optional[int] = None) -> int:
+        """Load the dimensions that have a preload filter; returns the number of names loaded.
+
+        Dimensions sharing source, where and preload filter are read in one
+        scan (e.g. every transaction column over the last days), grouped by
+        all their columns and split per dimension in process.
+        """
+        if days is None:
+            days = int(os.environ.get("NETSUITE_DIMENSION_PRELOAD_DAYS", "90"))
+        since = (date.today() - timedelta(days=days)).isoformat()
+        scans: Dict[Tuple[str, Optional[str], str], List[Dimension]] = {}
+        for spec in DIMENSIONS.values():
+            if spec.preload is not None:
+                scans.setdefault((spec.source, spec.where, spec.preload), []).append(spec)
+
+        loaded = 0
+        for (source, where, preload), specs in scans.items():
+            columns = ",\n    ".join(
+                f"{spec.column} AS id_{i}, BUILTIN.DF({spec.column}) AS name_{i}" for i, spec in enumerate(specs)
+            )
+            group_by = ", ".join(f"{spec.column}, BUILTIN.DF({spec.column})" for spec in specs)
+            sql = f"""
+SELECT {columns}
+FROM {source}
+WHERE {preload}
+    {f"AND {where}" if where else ""}
+GROUP BY {group_by}
+"""
+            try:
+                rows = self._query(sql, [since] if "?" in preload else [], use_cache=False)
+            except Exception as e:
+                # Dimensions that fail to preload are simply filled on demand
+                print(f"[NS-DIMENSIONS] Preload of {', '.join(spec.name for spec in specs)} failed: {e}")
+                traceback.print_exc()
+                continue
+            for i, spec in enumerate(specs):
+                part = rows[[f"id_{i}", f"name_{i}"]].dropna(subset=[f"id_{i}"]).drop_duplicates(f"id_{i}")
+                self._store(spec.name, part[f"id_{i}"], part[f"name_{i}"])
+                loaded += len(part)
+        print(f"[NS-DIMENSIONS] Preloaded {loaded} names in {len(scans)} queries")
+        return loaded
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            sizes = {name: len(table[0]) for name, table in self._tables.items()}
+            return {"dimensions": sizes, **self._stats}
+
+
+# ---------------------------------------------------------------------------
+# Name resolution for the row-level queries of netsuite_querys.py. Each
+# builder selects raw ids (<dim>_id) plus its probe key; these functions add
+# the display columns back and restore the original column order.
+# ---------------------------------------------------------------------------
+
+def _incoterms(cache: DimensionCache, df: pd.DataFrame, probe: str) -> pd.Series:
+    # CASE WHEN custbody_evol_incoterms IS NOT NULL THEN DF(evol) ELSE DF(inc) || ' ' || DF(city) END
+    evol = cache.names("incoterm", df["incoterm_id"], df[probe])
+    inc = cache.names("inc", df["inc_id"], df[probe]).fillna("")
+    city = cache.names("city", df["city_id"], df[probe]).fillna("")
+    return evol.where(df["incoterm_id"].notna(), inc + " " + city)
+
+
+def _defined(cache: DimensionCache, dimension: str, ids: pd.Series, probes: pd.Series) -> pd.Series:
+    # CASE WHEN <id> IS NULL THEN 'NO DEFINED' ELSE DF(<id>) END
+    return cache.names(dimension, ids, probes).where(ids.notna(), "NO DEFINED")
+
+
+def _resolve_quotes(cache: DimensionCache, df: pd.DataFrame) -> pd.DataFrame:
+    return df.assign(
+        Customer=cache.names("customer", df["customer_id"], df["tran_id"]),
+        Subsidiary=cache.names("line_subsidiary", df["subsidiary_id"], df["tran_id"]),
+        IncoTerms=_incoterms(cache, df, "tran_id"),
+    )[["CreateDate", "ExpirationDate", "Status", "InsideSale", "QuoteNumber", "Customer", "Subsidiary",
+       "IncoTerms", "Amount", "GrossMargin", "GrossMarginPct"]]
+
+
+def _resolve_bookings(cache: DimensionCache, df: pd.DataFrame) -> pd.DataFrame:
+    # subsidiary_override is 'IDICO Chile' or, in its ELSE branch, the raw subsidiary id
+    override = df["subsidiary_override"]
+    overridden = override.notna() & pd.to_numeric(override, errors="coerce").isna()
+    subsidiary = cache.names("customer_subsidiary", df["subsidiary_id"], df["customer_id"])
+    return df.assign(
+        subsidiary=override.where(overridden, subsidiary),
+        currency=cache.names("currency", df["currency_id"], df["tran_id"]),
+        customer=cache.names("customer", df["customer_id"], df["tran_id"]),
+        customer_country=cache.names("country", df["country_id"], df["address_id"]),
+        incoterms=_incoterms(cache, df, "tran_id"),
+        sales_rep=cache.names("employee", df["employee_id"], df["tran_id"]),
+        terms=cache.names("terms", df["terms_id"], df["tran_id"]),
+    )[["so_number", "status", "date", "period", "subsidiary", "currency", "customer", "customer_country",
+       "incoterms", "sales_rep", "gross_usd", "net_usd", "terms", "gross_margin", "gross_margin_pct"]]
+
+
+def _resolve_items_quoted(cache: DimensionCache, df: pd.DataFrame) -> pd.DataFrame:
+    return df.assign(
+        customer=cache.names("customer", df["customer_id"], df["tran_id"]),
+        status=cache.names("estimate_status", df["status_id"], df["tran_id"]),
+        item=cache.names("item", df["item_id"], df["tran_id"]),
+        brand=_defined(cache, "brand", df["brand_id"], df["item_id"]),
+        product_group=_defined(cache, "product_group", df["class_id"], df["item_id"]),
+    )[["customer", "quote", "status", "date", "inside_sales", "item", "brand", "product_group",
+       "selected_vendor", "qty", "unit_price"]]
+
+
+def _resolve_opportunities(cache: DimensionCache, df: pd.DataFrame) -> pd.DataFrame:
+    return df.assign(
+        customer=cache.names("customer", df["customer_id"], df["id"]),
+        subsidiary=cache.names("customer_subsidiary", df["subsidiary_id"], df["customer_id"]),
+    )[["id", "op_number", "tran_date", "expected_close_date", "customer", "subsidiary", "status", "inside_sales"]]
+
+
+def _resolve_op_so(cache: DimensionCache, df: pd.DataFrame) -> pd.DataFrame:
+    return df.assign(
+        customer=cache.names("customer", df["customer_id"], df["tran_id"]),
+    )[["op_number", "op_date", "op_status", "inside_sales", "customer", "q_number", "q_date", "q_status",
+       "q_amount", "so_number", "so_date", "so_status", "so_amount"]]
+
+
+def _resolve_sold_items(cache: DimensionCache, df: pd.DataFrame) -> pd.DataFrame:
+    return df.assign(
+        customer=cache.names("customer", df["customer_id"], df["tran_id"]),
+        item=cache.names("item", df["item_id"], df["tran_id"]),
+        brand=_defined(cache, "brand", df["brand_id"], df["item_id"]),
+        product_group=_defined(cache, "product_group", df["class_id"], df["item_id"]),
+    )[["customer", "quote", "status", "date", "inside_sales", "item", "item_description", "brand",
+       "product_group", "selected_vendor", "qty", "unit_price", "unit_cost", "estimated_line_cost",
+       "gross_margin_pct"]]
+
+
+RESOLVERS: Dict[str, Callable[[DimensionCache, pd.DataFrame], pd.DataFrame]] = {
+    "get_quotes_by_inside": _resolve_quotes,
+    "get_bookings_data": _resolve_bookings,
+    "get_items_quoted_by_customer": _resolve_items_quoted,
+    "get_opportunities_data": _resolve_opportunities,
+    "get_op_so_data": _resolve_op_so,
+    "get_sold_items_by_period": _resolve_sold_items,
+}
@@ -1,4 +1,99 @@
-def get_quotes_by_inside(initial_date: str, final_date: str, inside_sales: str, customer_name: str) -> str:
+from typing import Any, List, Optional, Sequence, Tuple
+
+
+# Builders return (sql, params): the SQL text only varies with which optional
+# filters are present, so NetSuite (and the per-connection statement cache)
+# sees a handful of stable statements. Dates are bound as 'YYYY-MM-DD' strings
+# and compared through TO_DATE against the native trandate column, which keeps
+# the predicate index-friendly (TO_CHAR(trandate) BETWEEN ... is not).
+#
+# Row-level builders select raw ids (<name>_id) instead of BUILTIN.DF(...) and
+# a probe key (tran_id: the transaction the row comes from); the display names
+# are joined back in-process by connections.netsuite_dimensions (see RESOLVERS
+# there), which keeps the original column names and order.
+#
+# Customer / Inside Sales filters arrive as entity / employee ids, resolved
+# from the user's text by connections.name_index, and are applied as IN lists.
+
+
+# IN lists are padded to these sizes (repeating the last id) so the SQL text repeats
+_IN_BUCKETS = (1, 8, 64, 512)
+
+
+def _in(expression: str, ids: Optional[Sequence[Any]], params: List[Any]) -> str:
+    """Optional IN (...) predicate; no ids adds no SQL and no parameter.
+
+    More ids than the largest bucket (a broad name filter) are split into
+    OR-ed lists of at most that size, below Oracle's 1000-element IN limit.
+    """
+    if not ids:
+        return ""
+    ids = list(ids)
+    lists = []
+    for i in range(0, len(ids), _IN_BUCKETS[-1]):
+        chunk = ids[i:i + _IN_BUCKETS[-1]]
+        size = next(bucket for bucket in _IN_BUCKETS if bucket >= len(chunk))
+        params.extend(chunk + [chunk[-1]] * (size - len(chunk)))
+        lists.append(f"{expression} IN ({', '.join('?' * size)})")
+    if len(lists) == 1:
+        return f"AND {lists[0]}"
+    return f"AND ({' OR '.join(lists)})"
+
+
+def get_customer_names() -> Tuple[str, List[Any]]:
+    """Display name of every customer, as BUILTIN.DF(t.entity) shows it (for the name index)."""
+    return """
+SELECT csr.entity AS id, BUILTIN.DF(csr.entity) AS name
+FROM CustomerSubsidiaryRelationship csr
+WHERE csr.isprimarysub = 'T';
+""", []
+
+def get_employee_names() -> Tuple[str, List[Any]]:
+    """'First Last' of every employee, the InsideSale / inside_sales value of the reports."""
+    return """
+SELECT e.id AS id, e.firstname || ' ' || e.lastname AS name
+FROM employee e;
+""", []
+
+
+_QUOTE_NAMES = """
+    BUILTIN.DF(b.ENTITY) AS Customer,
+    BUILTIN.DF(a.SUBSIDIARY) AS Subsidiary,
+    CASE 
+        WHEN b.custbody_evol_incoterms IS NOT NULL THEN BUILTIN.DF(b.custbody_evol_incoterms)
+        ELSE BUILTIN.DF(b.custbody_inc) || ' ' || BUILTIN.DF(b.custbody_city)
+    END AS IncoTerms,"""
+_QUOTE_NAMES_GROUP = """
+    BUILTIN.DF(b.ENTITY),
+    CASE 
+        WHEN b.custbody_evol_incoterms IS NOT NULL THEN BUILTIN.DF(b.custbody_evol_incoterms)
+        ELSE BUILTIN.DF(b.custbody_inc) || ' ' || BUILTIN.DF(b.custbody_city)
+    END,
+    BUILTIN.DF(a.SUBSIDIARY),"""
+_QUOTE_IDS = """
+    b.ENTITY AS customer_id,
+    a.SUBSIDIARY AS subsidiary_id,
+    b.custbody_evol_incoterms AS incoterm_id,
+    b.custbody_inc AS inc_id,
+    b.custbody_city AS city_id,
+    b.ID AS tran_id,"""
+_QUOTE_IDS_GROUP = """
+    b.ENTITY,
+    b.custbody_evol_incoterms,
+    b.custbody_inc,
+    b.custbody_city,
+    a.SUBSIDIARY,
+    b.ID,"""
+
+def _quotes_base(initial_date: str, final_date: str, employee_ids: Optional[Sequence[int]], customer_ids: Optional[Sequence[int]], ids: bool = False) -> Tuple[str, List[Any]]:
+    """Quote-level query without the trailing ';', so it can also be wrapped as a subquery.
+
+    ids=True selects raw ids for the in-process name join; the rollup queries
+    group by the names, so they keep BUILTIN.DF.
+    """
+    params: List[Any] = [initial_date, final_date]
+    customer_filter = _in("b.ENTITY", customer_ids, params)
+    inside_filter = _in("b.employee", employee_ids, params)
     return f"""
 
 SELECT 
@@ -6,13 +101,7 @@ SELECT
     TO_CHAR(b.duedate, 'YYYY-MM-DD') AS ExpirationDate,
     ts.name AS Status,
     e.firstname || ' ' || e.lastname AS InsideSale,
-    b.TRANID AS QuoteNumber,
-    BUILTIN.DF(b.ENTITY) AS Customer,
-    BUILTIN.DF(a.SUBSIDIARY) AS Subsidiary,
-    CASE 
-        WHEN b.custbody_evol_incoterms IS NOT NULL THEN BUILTIN.DF(b.custbody_evol_incoterms)
-        ELSE BUILTIN.DF(b.custbody_inc) || ' ' || BUILTIN.DF(b.custbody_city)
-    END AS IncoTerms,
+    b.TRANID AS QuoteNumber,{_QUOTE_IDS if ids else _QUOTE_NAMES}
     SUM(a.creditforeignamount*b.EXCHANGERATE) AS Amount,
     b.custbodygross_profit_amt_fr_vc AS GrossMargin,
     b.custbody_gross_profit_percent_final_vc AS GrossMarginPct
@@ -22,37 +111,88 @@ INNER JOIN employee e ON e.id = b.employee
 INNER JOIN transactionStatus ts ON ts.id = b.status AND ts.trantype = 'Estimate'
 WHERE
     b.TYPE = 'Estimate'
-    AND TO_CHAR(b.trandate, 'YYYY-MM-DD') BETWEEN '{initial_date}' AND '{final_date}'
+    AND b.trandate BETWEEN TO_DATE(?, 'YYYY-MM-DD') AND TO_DATE(?, 'YYYY-MM-DD')
     AND BUILTIN.DF(b.STATUS) <> 'Quote : Voided'
     AND BUILTIN.DF(b.custbody_evol_idico_services_campo) NOT IN ('ACORD', 'SIEVO')
     AND a.itemtype='InvtPart'
-    AND (
-        '{customer_name}' IS NULL
-        OR '{customer_name}' = ''
-        OR BUILTIN.DF(b.ENTITY) LIKE '%' || '{customer_name}' || '%'
-    )
-    AND (
-        '{inside_sales}' IS NULL
-        OR '{inside_sales}' = ''
-        OR e.firstname || ' ' || e.lastname LIKE '%' || '{inside_sales}' || '%'
-    )
+    {customer_filter}
+    {inside_filter}
 GROUP BY
     TO_CHAR(b.trandate, 'YYYY-MM-DD'),
     TO_CHAR(b.duedate, 'YYYY-MM-DD'),
     ts.name,
     e.firstname || ' ' || e.lastname,
-    b.TRANID,
-    BUILTIN.DF(b.ENTITY),
-    CASE 
-        WHEN b.custbody_evol_incoterms IS NOT NULL THEN BUILTIN.DF(b.custbody_evol_incoterms)
-        ELSE BUILTIN.DF(b.custbody_inc) || ' ' || BUILTIN.DF(b.custbody_city)
-    END,
-    BUILTIN.DF(a.SUBSIDIARY),
+    b.TRANID,{_QUOTE_IDS_GROUP if ids else _QUOTE_NAMES_GROUP}
     b.custbodygross_profit_amt_fr_vc,
-    b.custbody_gross_profit_percent_final_vc;
-"""
+    b.custbody_gross_profit_percent_final_vc""", params
+
+def get_quotes_by_inside(initial_date: str, final_date: str, employee_ids: Optional[Sequence[int]], customer_ids: Optional[Sequence[int]]) -> Tuple[str, List[Any]]:
+    sql, params = _quotes_base(initial_date, final_date, employee_ids, customer_ids, ids=True)
+    return sql + ";\n", params
+
+# Rollups needed by summarize_is_quotes: grouping set name -> dimensions
+_QUOTE_DIMENSIONS = {
+    "InsideSale": "q.InsideSale",
+    "Status": "q.Status",
+    "IncoTerms": "q.IncoTerms",
+    "Subsidiary": "q.Subsidiary",
+    "period": "SUBSTR(q.CreateDate, 1, 7)",
+    "CreateDate": "q.CreateDate",
+}
+QUOTE_ROLLUPS = {
+    "total": (),
+    "inside_sale": ("InsideSale",),
+    "inside_status": ("InsideSale", "Status"),
+    "inside_incoterm": ("InsideSale", "IncoTerms"),
+    "subsidiary": ("Subsidiary",),
+    "subsidiary_inside": ("Subsidiary", "InsideSale"),
+    "period": ("period",),
+    "day": ("CreateDate",),
+}
 
-def get_sales_orders_by_inside(initial_date: str, final_date: str, inside_sales: str) -> str:
+def get_quotes_rollups(initial_date: str, final_date: str, employee_ids: Optional[Sequence[int]], customer_ids: Optional[Sequence[int]]) -> Tuple[str, List[Any]]:
+    """One row per group of every QUOTE_ROLLUPS grouping set, tagged in rollup_name."""
+    base, params = _quotes_base(initial_date, final_date, employee_ids, customer_ids)
+    names = list(_QUOTE_DIMENSIONS)
+    expressions = list(_QUOTE_DIMENSIONS.values())
+    cases = []
+    sets = []
+    for rollup, dims in QUOTE_ROLLUPS.items():
+        # GROUPING_ID sets bit (n - 1 - i) when dimension i is rolled up
+        grouping_id = sum(1 << (len(names) - 1 - i) for i, name in enumerate(names) if name not in dims)
+        cases.append(f"WHEN {grouping_id} THEN '{rollup}'")
+        sets.append("(" + ", ".join(_QUOTE_DIMENSIONS[d] for d in dims) + ")")
+    dimensions = ",\n    ".join(f"{expr} AS {name}" for name, expr in _QUOTE_DIMENSIONS.items())
+    return f"""
+SELECT
+    CASE GROUPING_ID({", ".join(expressions)})
+        {" ".join(cases)}
+    END AS rollup_name,
+    {dimensions},
+    SUM(q.Amount) AS total_amount,
+    COUNT(DISTINCT q.QuoteNumber) AS num_quotes,
+    COUNT(DISTINCT q.Customer) AS num_customers,
+    MIN(q.CreateDate) AS first_date,
+    MAX(q.CreateDate) AS last_date
+FROM ({base}) q
+GROUP BY GROUPING SETS ({", ".join(sets)});
+""", params
+
+def get_quotes_status_lists(initial_date: str, final_date: str, employee_ids: Optional[Sequence[int]], customer_ids: Optional[Sequence[int]]) -> Tuple[str, List[Any]]:
+    """Quote numbers per Inside Sale and status plus the margin columns.
+
+    One scan serves both the quote_list of the status summary and the
+    quotes with gross margin below 20%, which are filtered in process.
+    """
+    base, params = _quotes_base(initial_date, final_date, employee_ids, customer_ids)
+    return f"""
+SELECT q.InsideSale, q.Status, q.QuoteNumber, q.Customer, q.Amount, q.GrossMargin, q.GrossMarginPct
+FROM ({base}) q;
+""", params
+
+def get_sales_orders_by_inside(initial_date: str, final_date: str, employee_ids: Optional[Sequence[int]]) -> Tuple[str, List[Any]]:
+    params: List[Any] = [initial_date, final_date]
+    inside_filter = _in("a.employee", employee_ids, params)
     return f"""
 
 SELECT
@@ -73,15 +213,11 @@ INNER JOIN employee e ON e.id = a.employee
 INNER JOIN transactionStatus ts ON ts.id = a.status AND ts.trantype = 'SalesOrd'
 WHERE
     a.TYPE = 'SalesOrd'
-    AND TO_CHAR(a.trandate, 'YYYY-MM-DD') BETWEEN '{initial_date}' AND '{final_date}'
+    AND a.trandate BETWEEN TO_DATE(?, 'YYYY-MM-DD') AND TO_DATE(?, 'YYYY-MM-DD')
     AND BUILTIN.DF(a.STATUS) NOT IN ('Sales Order : Cancelled','Sales Order : Closed')
     AND BUILTIN.DF(a.custbody_evol_idico_services_campo) NOT IN ('ACORD', 'SIEVO')
     AND b.itemtype='InvtPart'
-    AND (
-        '{inside_sales}' IS NULL
-        OR '{inside_sales}' = ''
-        OR e.firstname || ' ' || e.lastname LIKE '%' || '{inside_sales}' || '%'
-    )
+    {inside_filter}
 GROUP BY
     TO_CHAR(a.trandate, 'YYYY-MM-DD'),
     ts.name,
@@ -93,10 +229,10 @@ GROUP BY
         WHEN a.custbody_evol_incoterms IS NOT NULL THEN BUILTIN.DF(a.custbody_evol_incoterms)
         ELSE BUILTIN.DF(a.custbody_inc) || ' ' || BUILTIN.DF(a.custbody_city)
     END;
-    """
+    """, params
     
-def get_bookings_by_period(initial_date: str, final_date: str) -> str:
-    return f"""
+def get_bookings_by_period(initial_date: str, final_date: str) -> Tuple[str, List[Any]]:
+    return """
 SELECT
     TO_CHAR(t.trandate, 'YYYY-MM') AS period,
     BUILTIN.DF(csr.subsidiary) AS subsidiary,
@@ -110,7 +246,7 @@ SELECT
 FROM transaction t
 INNER JOIN CustomerSubsidiaryRelationship csr ON csr.entity = t.entity AND csr.isprimarysub = 'T'
 INNER JOIN transactionStatus ts ON ts.id = t.status AND ts.trantype = 'SalesOrd'
-WHERE TO_CHAR(t.trandate, 'YYYY-MM-DD') BETWEEN '{initial_date}' AND '{final_date}'
+WHERE t.trandate BETWEEN TO_DATE(?, 'YYYY-MM-DD') AND TO_DATE(?, 'YYYY-MM-DD')
   AND csr.subsidiary IN (5, 4, 3)
   AND t.type IN ('SalesOrd')
   AND ts.id NOT IN ('C', 'H', 'A', 'Y')
@@ -123,9 +259,29 @@ GROUP BY
     BUILTIN.DF(t.entity)
 ORDER BY
      TO_CHAR(t.trandate, 'YYYY-MM') ASC;
-    """
+    """, [initial_date, final_date]
+
+# Subsidiaries covered by the bookings reports
+BOOKINGS_SUBSIDIARIES = (3, 4, 5)
+
+# ORDER BY columns of the builders run through fetch_partitioned: the merged
+# month / subsidiary partitions are re-sorted by them (stable, so rows keep
+# their partition order within equal keys). A partitioned builder with an
+# ORDER BY must be listed here.
+PARTITION_ORDER = {
+    "get_bookings_data": ("period",),
+}
 
-def get_bookings_data(initial_date: str, final_date: str, customer_name: str, inside_sales: str) -> str:
+def get_bookings_data(initial_date: str, final_date: str, customer_ids: Optional[Sequence[int]], employee_ids: Optional[Sequence[int]], subsidiary: Optional[int] = None) -> Tuple[str, List[Any]]:
+    params: List[Any] = [initial_date, final_date]
+    if subsidiary is None:
+        subsidiary_filter = "csr.subsidiary IN (5, 4, 3)"
+    else:
+        # One subsidiary per partition, see fetch_partitioned
+        subsidiary_filter = "csr.subsidiary = ?"
+        params.append(subsidiary)
+    customer_filter = _in("t.entity", customer_ids, params)
+    inside_filter = _in("t.employee", employee_ids, params)
     return f"""
     SELECT
 	t.tranid AS so_number,
@@ -134,68 +290,60 @@ def get_bookings_data(initial_date: str, final_date: str, customer_name: str, in
     TO_CHAR(t.trandate, 'YYYY-MM') AS period,
     CASE 
     	WHEN csr.subsidiary = 5 AND t.custbody_transaccion_chile = 'T' THEN 'IDICO Chile'
-    	ELSE BUILTIN.DF(csr.subsidiary)
-    END AS subsidiary,
-    BUILTIN.DF(t.currency) AS currency,
-    BUILTIN.DF(t.entity) AS customer,
-    BUILTIN.DF(ea.country) AS customer_country,
-    CASE 
-        WHEN t.custbody_evol_incoterms IS NOT NULL THEN BUILTIN.DF(t.custbody_evol_incoterms)
-        ELSE BUILTIN.DF(t.custbody_inc) || ' ' || BUILTIN.DF(t.custbody_city)
-    END AS incoterms,
-    BUILTIN.DF(t.employee) AS sales_rep,
+    	ELSE TO_CHAR(csr.subsidiary)
+    END AS subsidiary_override,
+    csr.subsidiary AS subsidiary_id,
+    t.currency AS currency_id,
+    t.entity AS customer_id,
+    ea.country AS country_id,
+    ea.nkey AS address_id,
+    t.custbody_evol_incoterms AS incoterm_id,
+    t.custbody_inc AS inc_id,
+    t.custbody_city AS city_id,
+    t.employee AS employee_id,
     t.foreigntotal * t.exchangerate AS gross_usd,
     (t.foreigntotal - NVL(t.taxtotal, 0)) * t.exchangerate AS net_usd,
-    BUILTIN.DF(t.terms) AS terms,
+    t.terms AS terms_id,
     t.custbody_items_gross_profit_amount_usd AS gross_margin,
-    t.custbody_items_g_profit_pc_vrq_cost AS gross_margin_pct
+    t.custbody_items_g_profit_pc_vrq_cost AS gross_margin_pct,
+    t.id AS tran_id
 FROM transaction t
 INNER JOIN CustomerSubsidiaryRelationship csr ON csr.entity = t.entity AND csr.isprimarysub = 'T'
 INNER JOIN transactionStatus ts ON ts.id = t.status AND ts.trantype = 'SalesOrd'
 LEFT JOIN entityAddressBook eab ON eab.entity = t.entity AND eab.defaultbilling = 'T'
 LEFT JOIN EntityAddress ea ON ea.nkey = eab.addressbookaddress
 INNER JOIN employee e ON e.id = t.employee
-WHERE TO_CHAR(t.trandate, 'YYYY-MM-DD') BETWEEN '{initial_date}' AND '{final_date}'
-  AND csr.subsidiary IN (5, 4, 3)
+WHERE t.trandate BETWEEN TO_DATE(?, 'YYYY-MM-DD') AND TO_DATE(?, 'YYYY-MM-DD')
+  AND {subsidiary_filter}
   AND t.type  IN ('SalesOrd')
   AND ts.id NOT IN ('C', 'H', 'A', 'Y')
   AND t.entity NOT IN (37839, 3085, 213418,2414, 355535, 1066, 401658, 101528, 144291, 183866, 185705, 186223)
   --AND t.employee <> 104334
   AND t.custbody7 = 'F'
-  AND (
-        '{customer_name}' IS NULL
-        OR '{customer_name}' = ''
-        OR BUILTIN.DF(t.entity) LIKE '%' || '{customer_name}' || '%'
-    )
-  AND (
-        '{inside_sales}' IS NULL
-        OR '{inside_sales}' = ''
-        OR e.firstname || ' ' || e.lastname LIKE '%' || '{inside_sales}' || '%'
-    )
+  {customer_filter}
+  {inside_filter}
 ORDER BY
      TO_CHAR(t.trandate, 'YYYY-MM') ASC;
-    """
+    """, params
 
-def get_items_quoted_by_customer(initial_date: str, final_date: str, customer_name: str, inside_sales: str) -> str:
+def get_items_quoted_by_customer(initial_date: str, final_date: str, customer_ids: Optional[Sequence[int]], employee_ids: Optional[Sequence[int]]) -> Tuple[str, List[Any]]:
+    params: List[Any] = [initial_date, final_date]
+    customer_filter = _in("t.entity", customer_ids, params)
+    inside_filter = _in("t.employee", employee_ids, params)
     return f"""
 SELECT 
-	BUILTIN.DF(t.entity) AS customer,
+	t.entity AS customer_id,
 	t.tranid AS quote,
-	BUILTIN.DF(t.status) AS status,
+	t.status AS status_id,
 	t.trandate AS date,
     e.firstname || ' ' || e.lastname AS inside_sales,
-	BUILTIN.DF(tl.item) AS item,
-    CASE 
-        WHEN i.custitem13 IS NULL THEN 'NO DEFINED'
-        ELSE BUILTIN.DF(i.custitem13)
-    END AS brand,
-	CASE 
-		WHEN i.class IS NULL THEN 'NO DEFINED'
-		ELSE BUILTIN.DF(i.class)
-	END AS product_group,
+	tl.item AS item_id,
+    i.custitem13 AS brand_id,
+	i.class AS class_id,
     tl.custcol_evol_selected_vendors AS selected_vendor,
 	-tl.quantity AS qty,
-	tl.rate AS unit_price
+	tl.rate AS unit_price,
+	t.id AS tran_id
 FROM transaction t 
 INNER JOIN Customer c ON c.id = t.entity
 INNER JOIN transactionLine tl ON tl.transaction = t.id AND tl.itemtype = 'InvtPart'
@@ -203,28 +351,22 @@ INNER JOIN item i ON i.id = tl.item
 INNER JOIN employee e ON e.id = t.employee
 WHERE 
 	t.type = 'Estimate'
-	AND (
-        '{customer_name}' IS NULL
-        OR '{customer_name}' = ''
-        OR BUILTIN.DF(t.entity) LIKE '%' || '{customer_name}' || '%'
-    )
-    AND (
-        '{inside_sales}' IS NULL
-        OR '{inside_sales}' = ''
-        OR (e.firstname || ' ' || e.lastname) LIKE '%' || '{inside_sales}' || '%'
-    )
-	AND TO_CHAR(t.trandate, 'YYYY-MM-DD') BETWEEN '{initial_date}' AND '{final_date}';
-    """
+	AND t.trandate BETWEEN TO_DATE(?, 'YYYY-MM-DD') AND TO_DATE(?, 'YYYY-MM-DD')
+	{customer_filter}
+	{inside_filter};
+    """, params
 
-def get_opportunities_data(initial_date: str, final_date: str, inside_sales: str) -> str:
+def get_opportunities_data(initial_date: str, final_date: str, employee_ids: Optional[Sequence[int]]) -> Tuple[str, List[Any]]:
+    params: List[Any] = [initial_date, final_date]
+    inside_filter = _in("op.employee", employee_ids, params)
     return f"""
 SELECT 
 	op.id,
 	op.tranid AS op_number,
 	TO_CHAR(op.trandate, 'YYYY-MM-DD') AS tran_date,
 	TO_CHAR(op.expectedclosedate, 'YYYY-MM-DD') AS expected_close_date,
-	BUILTIN.DF(op.entity) AS customer,
-	BUILTIN.DF(csr.subsidiary) AS subsidiary,
+	op.entity AS customer_id,
+	csr.subsidiary AS subsidiary_id,
 	ts.name AS status,
 	e.firstname || ' ' || e.lastname AS inside_sales
 FROM TRANSACTION op
@@ -232,23 +374,19 @@ INNER JOIN CustomerSubsidiaryRelationship csr ON csr.entity = op.entity AND csr.
 INNER JOIN employee e ON e.id = op.employee
 INNER JOIN transactionStatus ts ON ts.id = op.status AND ts.trantype = 'Opprtnty'
 WHERE op.TYPE = 'Opprtnty'
-AND (
-    '{inside_sales}' IS NULL
-    OR '{inside_sales}' = ''
-    OR (e.firstname || ' ' || e.lastname) LIKE '%' || '{inside_sales}' || '%'
-)
-AND TO_CHAR(op.trandate, 'YYYY-MM-DD') BETWEEN '{initial_date}' AND '{final_date}'
+AND op.trandate BETWEEN TO_DATE(?, 'YYYY-MM-DD') AND TO_DATE(?, 'YYYY-MM-DD')
+{inside_filter}
 AND (op.winlossreason <> 21 OR op.winlossreason IS NULL);
-    """
+    """, params
 
-def get_op_so_data(initial_date: str, final_date: str) -> str:
-    return f"""
+def get_op_so_data(initial_date: str, final_date: str) -> Tuple[str, List[Any]]:
+    return """
 SELECT
 	op.tranid AS op_number,
 	TO_CHAR(op.trandate, 'YYYY-MM-DD') as op_date,
 	ops.name AS op_status,
 	e.firstname || ' ' || e.lastname AS inside_sales,
-	BUILTIN.DF(op.entity) AS customer,
+	op.entity AS customer_id,
 	q.tranid AS q_number,
 	TO_CHAR(q.trandate, 'YYYY-MM-DD') as q_date,
 	qs.name AS q_status,
@@ -256,7 +394,8 @@ SELECT
 	so.tranid AS so_number,
 	TO_CHAR(so.trandate, 'YYYY-MM-DD') as so_date,
 	sos.name AS so_status,
-	(so.foreigntotal - NVL(so.taxtotal, 0)) * so.exchangerate AS so_amount
+	(so.foreigntotal - NVL(so.taxtotal, 0)) * so.exchangerate AS so_amount,
+	op.id AS tran_id
 FROM transaction op
 INNER JOIN transactionStatus ops ON ops.id = op.status AND ops.trantype = 'Opprtnty'
 INNER JOIN employee e ON e.id = op.employee
@@ -267,34 +406,32 @@ LEFT JOIN NextTransactionLink q_to_so ON q_to_so.previousdoc = q.id AND q_to_so.
 LEFT JOIN transaction so ON so.id = q_to_so.nextdoc AND so.type = 'SalesOrd'
 LEFT JOIN transactionStatus sos ON sos.id = so.status AND sos.trantype = 'SalesOrd'
 WHERE op.type = 'Opprtnty' 
-AND TO_CHAR(op.trandate, 'YYYY-MM-DD') BETWEEN '{initial_date}' AND '{final_date}'
+AND op.trandate BETWEEN TO_DATE(?, 'YYYY-MM-DD') AND TO_DATE(?, 'YYYY-MM-DD')
 AND (op.winlossreason <> 21 OR op.winlossreason IS NULL);
-    """
+    """, [initial_date, final_date]
 
-def get_sold_items_by_period(initial_date: str, final_date: str, customer_name: str, inside_sales: str) -> str:
+def get_sold_items_by_period(initial_date: str, final_date: str, customer_ids: Optional[Sequence[int]], employee_ids: Optional[Sequence[int]]) -> Tuple[str, List[Any]]:
+    params: List[Any] = [initial_date, final_date]
+    customer_filter = _in("t.entity", customer_ids, params)
+    inside_filter = _in("t.employee", employee_ids, params)
     return f"""
 SELECT 
-	BUILTIN.DF(t.entity) AS customer,
+	t.entity AS customer_id,
 	t.tranid AS quote,
 	ts.name AS status,
 	TO_CHAR(t.trandate, 'YYYY-MM-DD') AS date,
     e.firstname || ' ' || e.lastname AS inside_sales,
-	BUILTIN.DF(tl.item) AS item,
+	tl.item AS item_id,
 	SUBSTR(i.purchasedescription, 1, 60) AS item_description,
-    CASE 
-        WHEN i.custitem13 IS NULL THEN 'NO DEFINED'
-        ELSE BUILTIN.DF(i.custitem13)
-    END AS brand,
-	CASE 
-		WHEN i.class IS NULL THEN 'NO DEFINED'
-		ELSE BUILTIN.DF(i.class)
-	END AS product_group,
+    i.custitem13 AS brand_id,
+	i.class AS class_id,
     tl.custcol_evol_selected_vendors AS selected_vendor,
 	-tl.quantity AS qty,
 	tl.rate AS unit_price,
 	tl.custcol_evol_vrq_cost AS unit_cost,
 	tl.costestimatebase AS estimated_line_cost,
-	tl.custcol_gm_percertange AS gross_margin_pct 
+	tl.custcol_gm_percertange AS gross_margin_pct,
+	t.id AS tran_id
 FROM transaction t 
 INNER JOIN Customer c ON c.id = t.entity
 INNER JOIN transactionLine tl ON tl.transaction = t.id AND tl.itemtype = 'InvtPart'
@@ -303,15 +440,7 @@ INNER JOIN employee e ON e.id = t.employee
 INNER JOIN transactionStatus ts ON ts.id = t.status AND ts.trantype = 'SalesOrd'
 WHERE 
 	t.type = 'SalesOrd'
-	AND (
-        '{customer_name}' IS NULL
-        OR '{customer_name}'= ''
-        OR BUILTIN.DF(t.entity) LIKE '%' || '{customer_name}' || '%'
-    )
-    AND (
-        '{inside_sales}' IS NULL
-        OR '{inside_sales}' = ''
-        OR (e.firstname || ' ' || e.lastname) LIKE '%' || '{inside_sales}' || '%'
-    )
-	AND TO_CHAR(t.trandate, 'YYYY-MM-DD') BETWEEN '{initial_date}' AND '{final_date}';
-    """
\ No newline at end of file
+	AND t.trandate BETWEEN TO_DATE(?, 'YYYY-MM-DD') AND TO_DATE(?, 'YYYY-MM-DD')
+	{customer_filter}
+	{inside_filter};
+    """, params
@@ -1,149 +1,415 @@
+import io
 import os
-import psycopg
-from typing import Any, List, Tuple, Optional
+import uuid
+import threading
+from psycopg.adapt import Loader
+from psycopg_pool import ConnectionPool
+import numpy as np
+import pandas as pd
+from typing import Any, Dict, Iterator, List, Sequence, Tuple, Optional
 import traceback
+from connections.name_index import NameIndex
+from connections.vendor_index import VendorIndex
+from connections.postgresql_querys import get_import_customer_names, get_hr_customer_names, get_hr_cus_brand_table, get_hr_country_brand_table
 
 
-def execute_pg_query(sql: str) -> List[Tuple[Any, ...]]:
+# Un pool por destino: "prod" usa PGHOST y "dev" usa PGHOST_DEV
+_PG_HOST_ENV = {"prod": "PGHOST", "dev": "PGHOST_DEV"}
+_pools: Dict[str, ConnectionPool] = {}
+_pools_lock = threading.Lock()
+
+
+class NumericLoader(Loader):
     """
-    Ejecuta una consulta SQL en PostgreSQL y devuelve los resultados.
+    Carga NUMERIC como float en lugar de Decimal, así los DataFrames quedan en
+    float64 desde el fetch. El loader no conoce el typmod de la columna, por lo
+    que no distingue numeric(p,0): siempre float, también para "100" (un SUM
+    sin decimales), para no mezclar int y float en una misma columna. Solo
+    copy_pg_frame, que lee el typmod al describir la consulta, carga
+    numeric(p,0) como int64.
+    """
+    def load(self, data) -> Any:
+        return float(bytes(data))  # incluye NaN / Infinity
 
-    - Si la consulta es un SELECT, devuelve (columns, rows).
-    - Si la consulta no devuelve filas (INSERT/UPDATE/DELETE), devuelve ([], []).
 
-    Los parámetros de conexión se leen de variables de entorno:
-    PGHOST_DEV, PGPORT, PGDATABASE, PGUSER, PGPASSWORD.
+def _configure_connection(conn) -> None:
+    """
+    Configura cada conexión nueva del pool. Con PG_NUMERIC=decimal se mantiene
+    el Decimal de psycopg; por defecto (float) se registra NumericLoader.
     """
+    if os.getenv("PG_NUMERIC", "float").lower() != "decimal":
+        conn.adapters.register_loader("numeric", NumericLoader)
 
-    host = os.getenv("PGHOST", "localhost")
-    port = os.getenv("PGPORT", "5432")
-    db   = os.getenv("PGDATABASE", "postgres")
-    user = os.getenv("PGUSER", "postgres")
 
-    print(f"[PG-CONNECT] Conectando a PostgreSQL → host={host}, port={port}, db={db}, user={user}")
+def get_pg_pool(target: str) -> ConnectionPool:
+    """
+    Devuelve el pool de conexiones del destino ("prod" o "dev"), creándolo la primera vez.
 
-    # Log de error en la conexión
-    try:
-        conn = psycopg.connect(
-            host=host,
-            port=port,
-            dbname=db,
-            user=user,
-            password=os.getenv("PGPASSWORD", ""),
+    Tamaños y tiempos se leen de variables de entorno:
+    PG_POOL_MIN_SIZE, PG_POOL_MAX_SIZE, PG_POOL_MAX_IDLE, PG_POOL_MAX_LIFETIME, PG_POOL_TIMEOUT.
+    Cada conexión se valida (check_connection) antes de prestarla y se configura
+    con _configure_connection (NUMERIC como float, ver PG_NUMERIC).
+    """
+    with _pools_lock:
+        pool = _pools.get(target)
+        if pool is not None:
+            return pool
+
+        host = os.getenv(_PG_HOST_ENV[target], "localhost")
+        port = os.getenv("PGPORT", "5432")
+        db   = os.getenv("PGDATABASE", "postgres")
+        user = os.getenv("PGUSER", "postgres")
+        min_size = int(os.getenv("PG_POOL_MIN_SIZE", "0"))
+        max_size = int(os.getenv("PG_POOL_MAX_SIZE", "4"))
+
+        print(f"[PG-POOL] Creando pool {target} → host={host}, port={port}, db={db}, user={user}, min={min_size}, max={max_size}")
+        pool = ConnectionPool(
+            kwargs={
+                "host": host,
+                "port": port,
+                "dbname": db,
+                "user": user,
+                "password": os.getenv("PGPASSWORD", ""),
+            },
+            min_size=min_size,
+            max_size=max(max_size, min_size, 1),
+            max_idle=float(os.getenv("PG_POOL_MAX_IDLE", "600")),
+            max_lifetime=float(os.getenv("PG_POOL_MAX_LIFETIME", "3600")),
+            timeout=float(os.getenv("PG_POOL_TIMEOUT", "30")),
+            configure=_configure_connection,
+            check=ConnectionPool.check_connection,
+            name=f"pg-{target}",
+            open=True,
         )
-        print("[PG-CONNECT] Conexión establecida correctamente.")
-    except Exception as e:
-        print(f"[PG-ERROR] Error al conectar a PostgreSQL: {e}")
-        traceback.print_exc()
-        # Re-lanzamos la excepción para que el caller sepa que falló
-        raise
+        _pools[target] = pool
+        return pool
+
+
+def pg_pool_stats() -> Dict[str, Dict[str, Any]]:
+    """
+    Estadísticas (get_stats de psycopg_pool) de los pools ya creados.
+    """
+    with _pools_lock:
+        pools = dict(_pools)
+    return {target: pool.get_stats() for target, pool in pools.items()}
 
+
+def close_pg_pools() -> None:
+    """
+    Cierra todos los pools (al apagar el servidor).
+    """
+    with _pools_lock:
+        pools = list(_pools.values())
+        _pools.clear()
+    for pool in pools:
+        pool.close()
+
+
+def _execute_pg(target: str, sql: str, params: Optional[Sequence[Any]] = None) -> List[Tuple[Any, ...]]:
+    """
+    Ejecuta una consulta con una conexión prestada del pool del destino.
+    El pool hace commit al devolver la conexión, o rollback si hubo error.
+    """
     try:
-        print(f"[PG-QUERY] Ejecutando SQL: {sql[:200]}{'...' if len(sql) > 200 else ''}")
+        with get_pg_pool(target).connection() as conn:
+            print(f"[PG-QUERY] Ejecutando SQL: {sql[:200]}{'...' if len(sql) > 200 else ''}")
 
-        with conn.cursor() as cur:
-            cur.execute(sql)
+            with conn.cursor() as cur:
+                cur.execute(sql, params)
 
-            if cur.description is None:
-                # No hay resultado (por ejemplo INSERT/UPDATE/DELETE)
-                conn.commit()
-                print("[PG-RESULT] Query sin retorno (INSERT/UPDATE/DELETE). Commit realizado.")
-                return [], []
+                if cur.description is None:
+                    # No hay resultado (por ejemplo INSERT/UPDATE/DELETE); el commit lo hace el pool
+                    print("[PG-RESULT] Query sin retorno (INSERT/UPDATE/DELETE).")
+                    return [], []
 
-            # Nombres de columnas
-            columns = [col.name for col in cur.description]
+                # Nombres de columnas
+                columns = [col.name for col in cur.description]
 
-            # Filas como lista de tuplas
-            rows = cur.fetchall()
+                # Filas como lista de tuplas
+                rows = cur.fetchall()
 
-            print(f"[PG-RESULT] Filas retornadas: {len(rows)}")
-            return columns, rows
+                print(f"[PG-RESULT] Filas retornadas: {len(rows)}")
+                return columns, rows
 
     except Exception as e:
-        # Log de error en ejecución de query
-        print(f"[PG-ERROR] Error ejecutando SQL: {e}")
+        # Errores de conexión (timeout del pool) o de ejecución; el rollback lo hace el pool
+        print(f"[PG-ERROR] Error ejecutando SQL en {target}: {e}")
         traceback.print_exc()
-        # Intentamos rollback por si la transacción quedó abierta
-        try:
-            conn.rollback()
-            print("[PG-ERROR] Rollback realizado.")
-        except Exception as rollback_err:
-            print(f"[PG-ERROR] Error al hacer rollback: {rollback_err}")
         # Re-lanzamos la excepción para que el caller pueda manejarla
         raise
 
-    finally:
-        conn.close()
-        print("[PG-CONNECT] Conexión cerrada.")
-        
-def execute_pg_query_dev(sql: str) -> List[Tuple[Any, ...]]:
+
+def execute_pg_query(sql: str, params: Optional[Sequence[Any]] = None) -> List[Tuple[Any, ...]]:
+    """
+    Ejecuta una consulta SQL en PostgreSQL y devuelve los resultados.
+
+    - Si la consulta es un SELECT, devuelve (columns, rows).
+    - Si la consulta no devuelve filas (INSERT/UPDATE/DELETE), devuelve ([], []).
+    - params (opcional) se enlaza a los placeholders %s de la consulta.
+
+    Usa el pool de PGHOST (ver get_pg_pool).
+    """
+    return _execute_pg("prod", sql, params)
+
+
+def execute_pg_query_dev(sql: str, params: Optional[Sequence[Any]] = None) -> List[Tuple[Any, ...]]:
     """
     Ejecuta una consulta SQL en PostgreSQL y devuelve los resultados.
 
     - Si la consulta es un SELECT, devuelve (columns, rows).
     - Si la consulta no devuelve filas (INSERT/UPDATE/DELETE), devuelve ([], []).
+    - params (opcional) se enlaza a los placeholders %s de la consulta.
 
-    Los parámetros de conexión se leen de variables de entorno:
-    PGHOST_DEV, PGPORT, PGDATABASE, PGUSER, PGPASSWORD.
+    Usa el pool de PGHOST_DEV (ver get_pg_pool).
     """
+    return _execute_pg("dev", sql, params)
+
 
-    host = os.getenv("PGHOST_DEV", "localhost")
-    port = os.getenv("PGPORT", "5432")
-    db   = os.getenv("PGDATABASE", "postgres")
-    user = os.getenv("PGUSER", "postgres")
 
-    print(f"[PG-CONNECT] Conectando a PostgreSQL → host={host}, port={port}, db={db}, user={user}")
+def iter_pg_query(sql: str, params: Optional[Sequence[Any]] = None, target: str = "dev", itersize: Optional[int] = None) -> Iterator[Tuple[List[str], List[Tuple[Any, ...]]]]:
+    """
+    Ejecuta un SELECT con un cursor del lado del servidor y devuelve (columns, rows) por lotes.
 
-    # Log de error en la conexión
+    Cada lote tiene hasta itersize filas (PG_ITERSIZE, default 10000), así que
+    nunca se materializa el resultado completo. Si no hay filas se devuelve un
+    único lote vacío con las columnas. La conexión del pool queda tomada hasta
+    que se consume (o se cierra) el generador.
+    """
+    itersize = itersize or int(os.getenv("PG_ITERSIZE", "10000"))
+    print(f"[PG-STREAM] Ejecutando SQL en {target} (itersize={itersize}): {sql.strip()[:200]}{'...' if len(sql.strip()) > 200 else ''}")
     try:
-        conn = psycopg.connect(
-            host=host,
-            port=port,
-            dbname=db,
-            user=user,
-            password=os.getenv("PGPASSWORD", ""),
-        )
-        print("[PG-CONNECT] Conexión establecida correctamente.")
+        with get_pg_pool(target).connection() as conn:
+            # Los cursores con nombre viven dentro de la transacción de la conexión
+            with conn.cursor(name=f"mcp_{uuid.uuid4().hex[:16]}") as cur:
+                cur.itersize = itersize
+                cur.execute(sql, params)
+                columns = [col.name for col in cur.description]
+                total = 0
+                while True:
+                    rows = cur.fetchmany(itersize)
+                    if not rows:
+                        break
+                    total += len(rows)
+                    yield columns, rows
+                if total == 0:
+                    yield columns, []
+                print(f"[PG-STREAM] Filas retornadas: {total}")
     except Exception as e:
-        print(f"[PG-ERROR] Error al conectar a PostgreSQL: {e}")
+        print(f"[PG-ERROR] Error ejecutando SQL en {target}: {e}")
         traceback.print_exc()
-        # Re-lanzamos la excepción para que el caller sepa que falló
         raise
 
+
+def iter_pg_frames(sql: str, params: Optional[Sequence[Any]] = None, target: str = "dev", itersize: Optional[int] = None) -> Iterator[pd.DataFrame]:
+    """
+    Igual que iter_pg_query, pero cada lote llega como DataFrame.
+    """
+    for columns, rows in iter_pg_query(sql, params, target=target, itersize=itersize):
+        yield pd.DataFrame(rows, columns=columns)
+
+
+# OIDs de enteros (int2, int4, int8) y de float4, float8, numeric
+_PG_INT_TYPES = {21, 23, 20}
+_PG_FLOAT_TYPES = {700, 701, 1700}
+
+
+def _quote_ident(name: str) -> str:
+    return '"' + name.replace('"', '""') + '"'
+
+
+class _CopyReader(io.RawIOBase):
+    """
+    Adapta los bloques de un COPY TO STDOUT a un archivo de lectura,
+    para que pandas parsee mientras llegan los datos.
+    """
+    def __init__(self, copy):
+        self._blocks = iter(copy)
+        self._pending = memoryview(b"")
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:
+        while not self._pending:
+            block = next(self._blocks, None)
+            if block is None:
+                return 0
+            self._pending = memoryview(block)
+        size = min(len(buffer), len(self._pending))
+        buffer[:size] = self._pending[:size]
+        self._pending = self._pending[size:]
+        return size
+
+
+def copy_pg_frame(sql: str, params: Optional[Sequence[Any]] = None, target: str = "dev") -> pd.DataFrame:
+    """
+    Carga el resultado de un SELECT con COPY (query) TO STDOUT directo a columnas NumPy.
+
+    Primero se describe la consulta (LIMIT 0) para conocer el tipo de cada
+    columna; luego se usa FORMAT csv y el parser en C de pandas arma las
+    columnas mientras llegan los bloques: texto como object, NUMERIC como
+    float64 (int64 si es numeric(p,0)), enteros y float como números, fechas
+    como datetime64. No se crea una tupla de Python por fila. Los parámetros
+    se enlazan del lado del cliente (COPY no acepta parámetros del servidor).
+    """
+    query = sql.strip().rstrip(";")
+    print(f"[PG-COPY] Ejecutando SQL en {target}: {query[:200]}{'...' if len(query) > 200 else ''}")
     try:
-        print(f"[PG-QUERY] Ejecutando SQL: {sql[:200]}{'...' if len(sql) > 200 else ''}")
+        with get_pg_pool(target).connection() as conn:
+            with conn.cursor() as cur:
+                cur.execute(f"SELECT * FROM ({query}) AS q LIMIT 0", params)
+                columns = [col.name for col in cur.description]
+                # numeric(p,0) con p <= 18 cabe en int8: se carga como entero (int64)
+                oids = [
+                    20 if col.type_code == 1700 and col.scale == 0 and (col.precision or 0) <= 18 else col.type_code
+                    for col in cur.description
+                ]
+                idents = [f"q.{_quote_ident(name)}" for name in columns]
+
+                select = ", ".join(
+                    f"{ident}::float8" if oid == 1700 else ident
+                    for ident, oid in zip(idents, oids)
+                )
+                dtypes = {
+                    name: (np.float64 if oid in _PG_FLOAT_TYPES else None if oid in _PG_INT_TYPES else object)
+                    for name, oid in zip(columns, oids)
+                }
+                with cur.copy(f"COPY (SELECT {select} FROM ({query}) AS q) TO STDOUT (FORMAT csv, NULL '\\N')", params) as copy:
+                    df = pd.read_csv(
+                        io.BufferedReader(_CopyReader(copy)),
+                        header=None,
+                        names=columns,
+                        dtype={name: dtype for name, dtype in dtypes.items() if dtype is not None},
+                        keep_default_na=False,
+                        na_values=["\\N"],
+                        encoding=conn.info.encoding,
+                    )
+                for name, oid in zip(columns, oids):
+                    if oid == 16:
+                        df[name] = df[name].map({"t": True, "f": False})
+                    elif oid in (1082, 1114):
+                        df[name] = pd.to_datetime(df[name])
+                    elif oid == 1184:
+                        df[name] = pd.to_datetime(df[name], utc=True)
+                print(f"[PG-COPY] Filas retornadas: {len(df)}")
+                return df
+    except Exception as e:
+        print(f"[PG-ERROR] Error ejecutando COPY en {target}: {e}")
+        traceback.print_exc()
+        raise
+
+
+def load_pg_frames(sql: str, params: Optional[Sequence[Any]] = None, target: str = "dev") -> Iterator[pd.DataFrame]:
+    """
+    Devuelve el resultado como DataFrames con el cargador de PG_BULK_LOADER:
+    "copy" (default) entrega un único DataFrame columnar (copy_pg_frame) y
+    "cursor" entrega lotes de un cursor del servidor (iter_pg_frames).
+    """
+    if os.getenv("PG_BULK_LOADER", "copy").lower() == "cursor":
+        yield from iter_pg_frames(sql, params, target=target)
+    else:
+        yield copy_pg_frame(sql, params, target=target)
+
 
-        with conn.cursor() as cur:
-            cur.execute(sql)
+# (sql, params) de una consulta y (columns, rows) de su resultado
+PgQuery = Tuple[str, Optional[Sequence[Any]]]
+PgResult = Tuple[List[str], List[Tuple[Any, ...]]]
 
-            if cur.description is None:
-                # No hay resultado (por ejemplo INSERT/UPDATE/DELETE)
-                conn.commit()
-                print("[PG-RESULT] Query sin retorno (INSERT/UPDATE/DELETE). Commit realizado.")
-                return [], []
 
-            # Nombres de columnas
-            columns = [col.name for col in cur.description]
+def _fetch(cur) -> PgResult:
+    if cur.description is None:
+        return [], []
+    return [col.name for col in cur.description], cur.fetchall()
 
-            # Filas como lista de tuplas
-            rows = cur.fetchall()
 
-            print(f"[PG-RESULT] Filas retornadas: {len(rows)}")
-            return columns, rows
+def _run_pipeline(target: str, queries: Dict[str, PgQuery]) -> Dict[str, PgResult]:
+    """
+    Envía las consultas en modo pipeline por una sola conexión del pool:
+    un único viaje de ida y vuelta en lugar de uno por consulta.
+    """
+    with get_pg_pool(target).connection() as conn:
+        with conn.pipeline():
+            cursors = {}
+            for name, (sql, params) in queries.items():
+                print(f"[PG-BATCH] {name}: {sql.strip()[:200]}{'...' if len(sql.strip()) > 200 else ''}")
+                cur = conn.cursor()
+                cur.execute(sql, params)
+                cursors[name] = cur
+        # Al salir del bloque pipeline los resultados ya están sincronizados
+        results = {name: _fetch(cur) for name, cur in cursors.items()}
+        for cur in cursors.values():
+            cur.close()
+        return results
+
 
+def execute_pg_batch(queries: Dict[str, PgQuery], target: str = "dev") -> Dict[str, PgResult]:
+    """
+    Ejecuta consultas independientes de una vez y devuelve {nombre: (columns, rows)}.
+    """
+    try:
+        return _run_pipeline(target, queries)
     except Exception as e:
-        # Log de error en ejecución de query
-        print(f"[PG-ERROR] Error ejecutando SQL: {e}")
+        print(f"[PG-ERROR] Error ejecutando el lote {sorted(queries)} en {target}: {e}")
         traceback.print_exc()
-        # Intentamos rollback por si la transacción quedó abierta
-        try:
-            conn.rollback()
-            print("[PG-ERROR] Rollback realizado.")
-        except Exception as rollback_err:
-            print(f"[PG-ERROR] Error al hacer rollback: {rollback_err}")
-        # Re-lanzamos la excepción para que el caller pueda manejarla
         raise
 
-    finally:
-        conn.close()
-        print("[PG-CONNECT] Conexión cerrada.")
+
+_name_indexes: Dict[str, NameIndex] = {}
+_name_indexes_lock = threading.Lock()
+
+
+def _name_index(name: str, sql: str) -> NameIndex:
+    """
+    Índice de nombres (ver connections/name_index.py) cargado desde PGHOST_DEV;
+    el id de cada fila es el propio nombre.
+    """
+    def load() -> pd.DataFrame:
+        columns, rows = execute_pg_query_dev(sql)
+        names = pd.DataFrame(rows, columns=columns)["name"]
+        return pd.DataFrame({"id": names, "name": names})
+
+    with _name_indexes_lock:
+        if name not in _name_indexes:
+            _name_indexes[name] = NameIndex(name, load)
+        return _name_indexes[name]
+
+
+def get_import_customer_index() -> NameIndex:
+    """
+    Índice de importadores de ods.analytics.datasur (filtro de get_customer_imports).
+    """
+    return _name_index("pg_import_customers", get_import_customer_names())
+
+
+def get_hr_customer_index() -> NameIndex:
+    """
+    Índice de clientes de ods.analytics.hr_cus_brand_consolidado (filtro de get_vendors_to_quote).
+    """
+    return _name_index("pg_hr_customers", get_hr_customer_names())
+
+
+_vendor_index: Optional[VendorIndex] = None
+_vendor_index_lock = threading.Lock()
+
+
+def get_vendor_index() -> VendorIndex:
+    """
+    Índice de proveedores de get_vendors_to_quote (ver connections/vendor_index.py):
+    las dos tablas de tasa de acierto se cargan juntas en un solo viaje (execute_pg_batch).
+    """
+    global _vendor_index
+
+    def load() -> Tuple[pd.DataFrame, pd.DataFrame]:
+        results = execute_pg_batch({
+            "cus_brand": (get_hr_cus_brand_table(), None),
+            "country_brand": (get_hr_country_brand_table(), None),
+        })
+        return (
+            pd.DataFrame(results["cus_brand"][1], columns=results["cus_brand"][0]),
+            pd.DataFrame(results["country_brand"][1], columns=results["country_brand"][0]),
+        )
+
+    with _vendor_index_lock:
+        if _vendor_index is None:
+            _vendor_index = VendorIndex("pg_vendors", load)
+        return _vendor_index
@@ -1,3 +1,13 @@
+from typing import Any, List, Optional, Sequence, Tuple
+
+
+def _select(columns: Optional[Sequence[str]]) -> str:
+    """
+    Lista de columnas del SELECT: solo las que usa la tool, o * (todas) si columns es None.
+    """
+    return ", ".join(columns) if columns else "*"
+
+
 def get_helga_guides_query(po: str | None, status: str | None, service: str | None) -> str:
     where_clauses = []
 
@@ -34,13 +44,14 @@ def get_helga_guides_query(po: str | None, status: str | None, service: str | No
     {where_sql};
     """
     
-def get_on_time_delivery(initial_date: str, final_date: str, so_number: str = None) -> str:
+def get_on_time_delivery(initial_date: str, final_date: str, so_number: str = None, columns: Optional[Sequence[str]] = None) -> str:
     """
     Devuelve una consulta SQL para obtener el tiempo de entrega de las órdenes de compra en PostgreSQL.
+    columns limita las columnas del SELECT (None = todas).
     """
     if so_number:
         return f"""
-        SELECT *
+        SELECT {_select(columns)}
         FROM ods.analytics.tableau_otd otd
         WHERE otd.so_doc_number = '{so_number}';
         """
@@ -48,77 +59,105 @@ def get_on_time_delivery(initial_date: str, final_date: str, so_number: str = No
       
     return f"""
     SELECT 
-    * 
+    {_select(columns)} 
     FROM ods.analytics.tableau_otd otd
     WHERE to_date(otd.if_create_date, 'YYYY/MM/DD')
         BETWEEN DATE '{initial_date}' AND DATE '{final_date}';
     """
     
-def get_scorecard_by_is_month(inside_sales: str = None) -> str:
+def get_scorecard_by_is_month(inside_sales: str = None, columns: Optional[Sequence[str]] = None) -> str:
     """
     Devuelve una consulta SQL para obtener el scorecard por IS en PostgreSQL.
+    columns limita las columnas del SELECT (None = todas).
     """
     if inside_sales:
         return f"""
-        SELECT * FROM ods.analytics.tableau_scorecard_by_inside_mensual WHERE sales_rep = '{inside_sales}';
+        SELECT {_select(columns)} FROM ods.analytics.tableau_scorecard_by_inside_mensual WHERE sales_rep = '{inside_sales}';
         """
-    return """
-    SELECT * FROM ods.analytics.tableau_scorecard_by_inside_mensual;
+    return f"""
+    SELECT {_select(columns)} FROM ods.analytics.tableau_scorecard_by_inside_mensual;
     """
     
-def get_scorecard_by_is_daily(inside_sales: str = None) -> str:
+def get_scorecard_by_is_daily(inside_sales: str = None, columns: Optional[Sequence[str]] = None) -> str:
     """
     Devuelve una consulta SQL para obtener el scorecard por IS en PostgreSQL.
+    columns limita las columnas del SELECT (None = todas).
     """
     if inside_sales:
         return f"""
-        SELECT * FROM ods.analytics.tableau_scorecard_by_inside_diario WHERE sales_rep = '{inside_sales}';
+        SELECT {_select(columns)} FROM ods.analytics.tableau_scorecard_by_inside_diario WHERE sales_rep = '{inside_sales}';
         """
-    return """
-    SELECT * FROM ods.analytics.tableau_scorecard_by_inside_diario;
+    return f"""
+    SELECT {_select(columns)} FROM ods.analytics.tableau_scorecard_by_inside_diario;
     """
     
-def get_scorecard_by_is_year(inside_sales: str = None) -> str:
+def get_scorecard_by_is_year(inside_sales: str = None, columns: Optional[Sequence[str]] = None) -> str:
     """
     Devuelve una consulta SQL para obtener el scorecard por IS en PostgreSQL.
+    columns limita las columnas del SELECT (None = todas).
     """
     if inside_sales:
         return f"""
-        SELECT * FROM ods.analytics.tableau_scorecard_by_inside_anual WHERE sales_rep = '{inside_sales}';
+        SELECT {_select(columns)} FROM ods.analytics.tableau_scorecard_by_inside_anual WHERE sales_rep = '{inside_sales}';
         """
+    return f"""
+    SELECT {_select(columns)} FROM ods.analytics.tableau_scorecard_by_inside_anual;
+    """
+
+def get_import_customer_names() -> str:
+    """
+    Devuelve una consulta SQL con los nombres de importador de datasur (para el índice de nombres).
+    """
     return """
-    SELECT * FROM ods.analytics.tableau_scorecard_by_inside_anual;
+    SELECT DISTINCT importador AS name FROM ods.analytics.datasur WHERE importador IS NOT NULL;
     """
 
-def get_customer_imports_data(customer_name: str) -> str:
+def get_customer_imports_data(importers: Optional[Sequence[str]], columns: Optional[Sequence[str]] = None) -> Tuple[str, List[Any]]:
     """
-    Devuelve una consulta SQL para obtener las importaciones de un cliente específico en PostgreSQL.
+    Devuelve (sql, params) para obtener las importaciones de los importadores indicados en PostgreSQL.
+    Los nombres vienen resueltos por el índice de nombres, por lo que se filtra por igualdad;
+    sin importadores no se filtra. columns limita las columnas del SELECT (None = todas).
     """
+    if not importers:
+        return f"""
+    SELECT {_select(columns)} FROM ods.analytics.datasur;
+    """, []
     return f"""
-    SELECT * FROM ods.analytics.datasur WHERE importador LIKE '%{customer_name}%';
+    SELECT {_select(columns)} FROM ods.analytics.datasur WHERE importador = ANY(%s);
+    """, [list(importers)]
+
+def get_hr_customer_names() -> str:
     """
-def get_vendors_customer_brand(customer_name: str, brand: str) -> str:
+    Devuelve una consulta SQL con los nombres de cliente de hr_cus_brand_consolidado (para el índice de nombres).
     """
-    Devuelve una consulta SQL para obtener la tasa de acierto de desvío para un cliente y marca específicos en PostgreSQL.
+    return """
+    SELECT DISTINCT customer_name AS name FROM ods.analytics.hr_cus_brand_consolidado WHERE customer_name IS NOT NULL;
+    """
+
+def get_vendors_customer_brand(customer_names: Sequence[str], brand: str, columns: Optional[Sequence[str]] = None) -> Tuple[str, List[Any]]:
+    """
+    Devuelve (sql, params) para obtener la tasa de acierto de desvío para los clientes (ya resueltos) y la marca en PostgreSQL.
+    columns limita las columnas del SELECT (None = todas).
     """
     return f"""
-    SELECT * FROM ods.analytics.hr_cus_brand_consolidado 
-    WHERE customer_name LIKE '%' || UPPER('{customer_name}') || '%'
-    AND brand LIKE '%' || UPPER('{brand}') || '%'
+    SELECT {_select(columns)} FROM ods.analytics.hr_cus_brand_consolidado 
+    WHERE customer_name = ANY(%s)
+    AND brand LIKE '%%' || UPPER(%s) || '%%'
     AND probabilidad > 0
     ORDER BY 
     customer_name ASC,
     brand ASC,
     probabilidad DESC,
     count_so DESC;
-    """
+    """, [list(customer_names), brand]
     
-def get_vendors_country_brand(country: str, brand: str) -> str:
+def get_vendors_country_brand(country: str, brand: str, columns: Optional[Sequence[str]] = None) -> str:
     """
     Devuelve una consulta SQL para obtener la tasa de acierto de desvío para un país y marca específicos en PostgreSQL.
+    columns limita las columnas del SELECT (None = todas).
     """
     return f"""
-    SELECT * FROM ods.analytics.hr_country_brand_consolidado
+    SELECT {_select(columns)} FROM ods.analytics.hr_country_brand_consolidado
     WHERE country LIKE '%' || UPPER('{country}') || '%'
     AND brand LIKE '%' || UPPER('{brand}') || '%'
     ORDER BY 
@@ -128,6 +167,22 @@ def get_vendors_country_brand(country: str, brand: str) -> str:
         count_so DESC;
     """
 
+def get_hr_cus_brand_table() -> str:
+    """
+    Devuelve una consulta SQL con toda la tabla hr_cus_brand_consolidado (para el índice de proveedores).
+    """
+    return """
+    SELECT * FROM ods.analytics.hr_cus_brand_consolidado;
+    """
+
+def get_hr_country_brand_table() -> str:
+    """
+    Devuelve una consulta SQL con toda la tabla hr_country_brand_consolidado (para el índice de proveedores).
+    """
+    return """
+    SELECT * FROM ods.analytics.hr_country_brand_consolidado;
+    """
+
 def get_customer_country(customer_name: str) -> str:
     """
     Devuelve una consulta SQL para obtener el país de un cliente específico en PostgreSQL.
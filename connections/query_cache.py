@@ -0,0 +1,109 @@
+import os
+import re
+import time
+import threading
+from collections import OrderedDict
+from datetime import date
+from typing import Any, Dict, Hashable, Optional, Sequence, Tuple
+import pandas as pd
+
+
+_DATE_RE = re.compile(r"\b(\d{4}-\d{2}-\d{2})\b")
+
+
+def normalize_query(sql: str, params: Optional[Sequence[Any]] = None) -> Tuple[str, Tuple[Any, ...]]:
+    """Cache key for a query: SQL text with indentation/blank lines stripped plus its parameters."""
+    lines = (line.strip() for line in sql.strip().splitlines())
+    return "\n".join(line for line in lines if line), tuple(params or ())
+
+
+def ttl_for_query(sql: str, params: Optional[Sequence[Any]] = None) -> float:
+    """Pick a TTL from the most recent date the query asks for.
+
+    - reaches today (or later): NETSUITE_CACHE_TTL_TODAY, data still changing
+    - current month but before today: NETSUITE_CACHE_TTL_OPEN_MONTH
+    - only closed past months: NETSUITE_CACHE_TTL_CLOSED_MONTH
+    Queries without dates use the open month TTL.
+    """
+    found = _DATE_RE.findall(sql) + [m for p in (params or ()) for m in _DATE_RE.findall(str(p))]
+    if not found:
+        return float(os.environ.get("NETSUITE_CACHE_TTL_OPEN_MONTH", "1800"))
+    return ttl_for_day(date.fromisoformat(max(found)))
+
+
+def ttl_for_day(day: date) -> float:
+    """TTL for data of a given day, using the same tiers as ttl_for_query."""
+    today = date.today()
+    if day >= today:
+        return float(os.environ.get("NETSUITE_CACHE_TTL_TODAY", "300"))
+    if day >= today.replace(day=1):
+        return float(os.environ.get("NETSUITE_CACHE_TTL_OPEN_MONTH", "1800"))
+    return float(os.environ.get("NETSUITE_CACHE_TTL_CLOSED_MONTH", "86400"))
+
+
+class QueryResultCache:
+    """LRU cache of query results (DataFrames) bounded by total bytes, with per-entry TTL.
+
+    get() returns a copy so callers can add or convert columns freely.
+    """
+
+    def __init__(self, max_bytes: Optional[int] = None):
+        self.max_bytes = max_bytes if max_bytes is not None else int(os.environ.get("NETSUITE_CACHE_MAX_BYTES", str(256 * 1024 * 1024)))
+        self._entries: "OrderedDict[Hashable, Tuple[pd.DataFrame, float, int]]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0, "expired": 0, "evictions": 0, "too_large": 0}
+
+    def get(self, key: Hashable) -> Optional[pd.DataFrame]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self._stats["misses"] += 1
+                return None
+            df, expires_at, size = entry
+            if expires_at <= time.monotonic():
+                del self._entries[key]
+                self._bytes -= size
+                self._stats["expired"] += 1
+                self._stats["misses"] += 1
+                return None
+            self._entries.move_to_end(key)
+            self._stats["hits"] += 1
+        return df.copy()
+
+    def put(self, key: Hashable, df: pd.DataFrame, ttl: float) -> bool:
+        """Store a result; returns False when it does not fit in the byte budget."""
+        if ttl <= 0:
+            return False
+        size = int(df.memory_usage(index=True, deep=True).sum())
+        with self._lock:
+            if size > self.max_bytes:
+                self._stats["too_large"] += 1
+                return False
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._bytes -= old[2]
+            self._entries[key] = (df, time.monotonic() + ttl, size)
+            self._bytes += size
+            # Evict least recently used entries until we are back under budget
+            while self._bytes > self.max_bytes:
+                _, (_, _, evicted_size) = self._entries.popitem(last=False)
+                self._bytes -= evicted_size
+                self._stats["evictions"] += 1
+        return True
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self._stats["hits"] + self._stats["misses"]
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "hit_rate": self._stats["hits"] / lookups if lookups else None,
+                **self._stats,
+            }
@@ -0,0 +1,84 @@
+import os
+from datetime import date, timedelta
+from typing import Any, Callable, Dict, Hashable, Iterator, List, Optional, Tuple
+import pandas as pd
+from connections.query_cache import QueryResultCache, ttl_for_day
+
+
+def _day_keys(series: pd.Series) -> pd.Series:
+    """'YYYY-MM-DD' key of every row, whether the column is a datetime or a TO_CHAR string."""
+    if pd.api.types.is_datetime64_any_dtype(series):
+        return series.dt.strftime("%Y-%m-%d")
+    return series.astype(str).str[:10]
+
+
+class DayPartitionStore:
+    """Per-day partitions of date-window query results.
+
+    A request for [start, end] is answered from the cached days and only the
+    missing days are fetched, one loader call per contiguous gap. Each fetched
+    gap is split by its date column and stored day by day (empty days too),
+    so a later, wider window only pays for the new days. Partitions expire with
+    ttl_for_day (today's partition is short-lived, closed months live long) and
+    are evicted LRU under NETSUITE_PARTITION_MAX_BYTES.
+    """
+
+    def __init__(self, max_bytes: Optional[int] = None):
+        if max_bytes is None:
+            max_bytes = int(os.environ.get("NETSUITE_PARTITION_MAX_BYTES", str(256 * 1024 * 1024)))
+        self._partitions = QueryResultCache(max_bytes=max_bytes)
+
+    def iter_partitions(
+        self,
+        dataset: str,
+        filters: Hashable,
+        start: date,
+        end: date,
+        date_column: str,
+        loader: Callable[[str, str], pd.DataFrame],
+    ) -> Iterator[pd.DataFrame]:
+        """Yield the non-empty day partitions of [start, end], in day order."""
+        days = [start + timedelta(days=i) for i in range((end - start).days + 1)]
+        if not days:
+            # Inverted window: nothing to partition, let the query return its empty result
+            yield loader(start.isoformat(), end.isoformat())
+            return
+        cached = {day: self._partitions.get((dataset, filters, day)) for day in days}
+
+        # Contiguous runs of missing days -> one fetch each
+        gaps: List[Tuple[date, date]] = []
+        for day in days:
+            if cached[day] is not None:
+                continue
+            if gaps and gaps[-1][1] == day - timedelta(days=1):
+                gaps[-1] = (gaps[-1][0], day)
+            else:
+                gaps.append((day, day))
+
+        if gaps:
+            missing = ", ".join(f"{s.isoformat()}..{e.isoformat()}" for s, e in gaps)
+            print(f"[NS-RANGE] {dataset}: {len(days) - sum((e - s).days + 1 for s, e in gaps)} cached day(s), fetching {missing}")
+
+        for gap_start, gap_end in gaps:
+            df = loader(gap_start.isoformat(), gap_end.isoformat())
+            by_day = {key: part for key, part in df.groupby(_day_keys(df[date_column]), sort=False)} if len(df) else {}
+            day = gap_start
+            while day <= gap_end:
+                part = by_day.get(day.isoformat())
+                part = df.iloc[0:0] if part is None else part.reset_index(drop=True)
+                self._partitions.put((dataset, filters, day), part, ttl_for_day(day))
+                # The stored frame must not be touched by the caller
+                cached[day] = part.copy()
+                day += timedelta(days=1)
+
+        # Empty days are only kept in the store; one is yielded when the whole window is empty
+        yielded = False
+        for day in days:
+            if len(cached[day]):
+                yielded = True
+                yield cached[day]
+        if not yielded:
+            yield cached[days[0]]
+
+    def stats(self) -> Dict[str, Any]:
+        return self._partitions.stats()
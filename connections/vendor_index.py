@@ -0,0 +1,183 @@
+import os
+import time
+import threading
+import traceback
+from collections import defaultdict
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+import pandas as pd
+
+# Years of the current / old blocks of get_vendors_to_quote
+CURRENT_YEAR, PREVIOUS_YEAR = 2025, 2024
+
+# year -> vendor rows (dicts), best probabilidad first
+YearRows = Dict[Any, List[Dict[str, Any]]]
+
+
+def _by_year(df: pd.DataFrame, key: str) -> Tuple[Dict[Tuple[str, str], YearRows], Dict[str, List[str]]]:
+    """Group rows by (key, brand) and year, each list sorted by probabilidad and count_so desc.
+
+    Also returns key -> sorted brands, so a lookup walks the keys in the
+    same order as the SQL ORDER BY key, brand.
+    """
+    df = df.sort_values(["probabilidad", "count_so"], ascending=False, kind="mergesort", na_position="last")
+    records = df.to_dict(orient="records")
+    groups: Dict[Tuple[str, str], YearRows] = defaultdict(dict)
+    for (value, brand, year), positions in df.groupby([key, "brand", "year"], sort=False).indices.items():
+        groups[(value, brand)][year] = [records[p] for p in positions]
+    brands: Dict[str, List[str]] = defaultdict(list)
+    for value, brand in sorted(groups):
+        brands[value].append(brand)
+    return dict(groups), dict(brands)
+
+
+class _Snapshot:
+    """Immutable lookup tables built from one load of both hit-rate tables."""
+
+    def __init__(self, cus_brand: pd.DataFrame, country_brand: pd.DataFrame):
+        customers = cus_brand.dropna(subset=["customer_name"]).drop_duplicates("customer_name")
+        # Same rows get_vendors_customer_brand returns: probabilidad > 0 only
+        cus_brand = cus_brand[cus_brand["probabilidad"] > 0]
+        self.customer_rows, self.customer_brands = _by_year(cus_brand, "customer_name")
+        self.country_rows, self.country_brands = _by_year(country_brand, "country")
+        self.countries = sorted(self.country_brands)
+        self.customer_country = {
+            name: country
+            for name, country in zip(customers["customer_name"], customers["country"])
+            if pd.notna(country)
+        }
+
+
+def _sort_key(row: Dict[str, Any]) -> Tuple[bool, float, bool, float]:
+    # probabilidad DESC, count_so DESC, NULLs last (the SQL ORDER BY of both tables)
+    probability, count = row["probabilidad"], row["count_so"]
+    return (
+        pd.isna(probability), 0.0 if pd.isna(probability) else -probability,
+        pd.isna(count), 0.0 if pd.isna(count) else -count,
+    )
+
+
+def _merge(groups: Dict[Tuple[str, str], YearRows], keys: List[Tuple[str, str]]) -> YearRows:
+    """Combine the per-year lists of several keys, by probabilidad then count_so desc.
+
+    The rows are copies: callers may change them without touching the snapshot.
+    """
+    if len(keys) == 1:
+        return {year: [dict(row) for row in rows] for year, rows in groups[keys[0]].items()}
+    merged: YearRows = defaultdict(list)
+    for key in keys:
+        for year, rows in groups[key].items():
+            merged[year].extend(dict(row) for row in rows)
+    for rows in merged.values():
+        rows.sort(key=_sort_key)
+    return dict(merged)
+
+
+class VendorIndex:
+    """In-memory index of the customer/brand and country/brand vendor hit rates.
+
+    loader() returns the (hr_cus_brand_consolidado, hr_country_brand_consolidado)
+    frames. Lookups keep the semantics of the SQL they replace (exact customer
+    names, brand and country as LIKE '%text%') and read an immutable snapshot,
+    so they never wait on Postgres once the first load is done. A snapshot
+    older than ttl keeps answering while a background thread reloads it.
+    """
+
+    def __init__(self, name: str, loader: Callable[[], Tuple[pd.DataFrame, pd.DataFrame]], ttl: Optional[float] = None):
+        self.name = name
+        self._loader = loader
+        self.ttl = ttl if ttl is not None else float(os.environ.get("VENDOR_INDEX_TTL", "900"))
+        self._lock = threading.Lock()
+        self._snapshot: Optional[_Snapshot] = None
+        self._loaded_at = 0.0
+        self._refreshing = False
+        self._stats = {"loads": 0, "background_loads": 0, "failed_loads": 0, "lookups": 0}
+        self._stats_lock = threading.Lock()
+
+    def _count(self, stat: str) -> None:
+        with self._stats_lock:
+            self._stats[stat] += 1
+
+    def refresh(self) -> None:
+        """Load both tables and swap in a new snapshot."""
+        start = time.monotonic()
+        cus_brand, country_brand = self._loader()
+        snapshot = _Snapshot(cus_brand, country_brand)
+        self._snapshot, self._loaded_at = snapshot, time.monotonic()
+        self._count("loads")
+        print(f"[VENDOR-INDEX] {self.name}: {len(snapshot.customer_rows)} customer/brand and "
+              f"{len(snapshot.country_rows)} country/brand keys loaded in {time.monotonic() - start:.2f}s")
+
+    def _refresh_in_background(self) -> None:
+        try:
+            self.refresh()
+            self._count("background_loads")
+        except Exception as e:
+            # Keep serving the previous snapshot; the next stale lookup retries
+            self._count("failed_loads")
+            print(f"[VENDOR-INDEX] {self.name}: background refresh failed: {e}")
+            traceback.print_exc()
+        finally:
+            self._refreshing = False
+
+    def refresh_in_background(self) -> None:
+        """Start a reload on a daemon thread unless one is already running."""
+        with self._lock:
+            if self._refreshing:
+                return
+            self._refreshing = True
+        threading.Thread(target=self._refresh_in_background, name=f"{self.name}-refresh", daemon=True).start()
+
+    def _current(self) -> _Snapshot:
+        if self._snapshot is None:
+            with self._lock:
+                if self._snapshot is None:
+                    self.refresh()
+        elif time.monotonic() - self._loaded_at > self.ttl:
+            self.refresh_in_background()
+        self._count("lookups")
+        return self._snapshot
+
+    def customer_brand(self, customers: Sequence[str], brand: str) -> YearRows:
+        """Vendor rows per year for the given customer names and brands containing brand."""
+        snapshot = self._current()
+        keys = [
+            (customer, name)
+            for customer in sorted(set(customers))
+            for name in snapshot.customer_brands.get(customer, ())
+            if brand in name
+        ]
+        return _merge(snapshot.customer_rows, keys) if keys else {}
+
+    def country_brand(self, country: str, brand: str) -> YearRows:
+        """Vendor rows per year for countries containing country and brands containing brand."""
+        snapshot = self._current()
+        keys = [
+            (value, name)
+            for value in snapshot.countries if country in value
+            for name in snapshot.country_brands[value] if brand in name
+        ]
+        return _merge(snapshot.country_rows, keys) if keys else {}
+
+    def country_of(self, customers: Sequence[str]) -> str:
+        """Country of the first customer (in name order) that has one, '' if none does."""
+        snapshot = self._current()
+        for customer in sorted(set(customers)):
+            country = snapshot.customer_country.get(customer)
+            if country is not None:
+                return country
+        return ""
+
+    def years(self) -> Tuple[int, int]:
+        """(current, previous) year of the current / old blocks, fixed as in get_vendors_to_quote before the index."""
+        return CURRENT_YEAR, PREVIOUS_YEAR
+
+    def stats(self) -> Dict[str, Any]:
+        snapshot = self._snapshot
+        with self._stats_lock:
+            stats = dict(self._stats)
+        return {
+            "customer_brand_keys": len(snapshot.customer_rows) if snapshot else 0,
+            "country_brand_keys": len(snapshot.country_rows) if snapshot else 0,
+            "age_seconds": round(time.monotonic() - self._loaded_at, 1) if snapshot else None,
+            **stats,
+        }
@@ -1,8 +1,13 @@
+import os
 from fastmcp import FastMCP
+from connections.netsuite import warm_up_netsuite
+from connections.postgresql import get_vendor_index
+from connections.executors import as_async_tool
 from tools.sales import SALES_TOOLS
 from tools.files import FILES_TOOLS
 from tools.operations import OPS_TOOLS
 from tools.performance import PERFORMANCE_TOOLS
+from tools.monitoring import MONITORING_TOOLS
 
 
 app = FastMCP("idico-sales")
@@ -14,10 +19,11 @@ DEFAULT_ANNOTATIONS = {
 }
 
 def tool_register(fn):
+    # Tools run on their backend executor so blocking JDBC/psycopg calls don't stall the server
     app.tool(
         enabled=True,
         annotations=DEFAULT_ANNOTATIONS,
-    )(fn)
+    )(as_async_tool(fn))
     
 for tool_sales in SALES_TOOLS:
     tool_register(tool_sales)
@@ -30,12 +36,24 @@ for tool_performance in PERFORMANCE_TOOLS:
     
 for tool_ops in OPS_TOOLS:
     tool_register(tool_ops)
+
+for tool_monitoring in MONITORING_TOOLS:
+    tool_register(tool_monitoring)
     
 
+def startup():
+    """Warm up backends before accepting MCP requests (NETSUITE_WARMUP=0 / VENDOR_INDEX_WARMUP=0 disable it)."""
+    if os.environ.get("VENDOR_INDEX_WARMUP", "1") != "0":
+        # Loads on its own thread while NetSuite warms up
+        get_vendor_index().refresh_in_background()
+    if os.environ.get("NETSUITE_WARMUP", "1") != "0":
+        warm_up_netsuite()
+    print("[STARTUP] Server ready")
 
 
 if __name__ == "__main__":
     import asyncio
+    startup()
     try:
         app.run(
             transport="streamable-http",
@@ -0,0 +1,53 @@
+import asyncio
+import threading
+import unittest
+
+from connections.executors import BackendExecutor, as_async_tool, get_executor, uses_backend
+
+
+class BackendExecutorTest(unittest.TestCase):
+    def test_rejects_beyond_the_queue_limit(self):
+        executor = BackendExecutor("test", max_workers=1, max_queue=1)
+        started, release = threading.Event(), threading.Event()
+        running = executor.submit(lambda: (started.set(), release.wait(1)))
+        # The first call holds the only worker, the next one has to queue
+        started.wait(1)
+        queued = executor.submit(lambda: "queued")
+        with self.assertRaises(RuntimeError):
+            executor.submit(lambda: "rejected")
+        release.set()
+        running.result(1)
+        self.assertEqual(queued.result(1), "queued")
+        stats = executor.stats()
+        self.assertEqual((stats["completed"], stats["rejected"], stats["queue_depth"]), (2, 1, 0))
+
+    def test_failures_are_counted(self):
+        executor = BackendExecutor("test", max_workers=1, max_queue=4)
+        with self.assertRaises(ZeroDivisionError):
+            executor.submit(lambda: 1 / 0).result(1)
+        self.assertEqual(executor.stats()["failed"], 1)
+
+
+class AsyncToolTest(unittest.TestCase):
+    def test_tool_runs_on_its_backend_threads(self):
+        @uses_backend("postgres_dev")
+        def tool(value: int) -> str:
+            """Doc kept for the tool schema."""
+            return f"{threading.current_thread().name}:{value}"
+
+        wrapped = as_async_tool(tool)
+        self.assertEqual(wrapped.__doc__, "Doc kept for the tool schema.")
+        result = asyncio.run(wrapped(3))
+        self.assertTrue(result.startswith("postgres_dev-io"))
+        self.assertTrue(result.endswith(":3"))
+        self.assertGreaterEqual(get_executor("postgres_dev").stats()["completed"], 1)
+
+    def test_dataset_tools_use_the_netsuite_backend(self):
+        from tools.files import get_dataset, get_excel_file
+
+        self.assertEqual(get_dataset.__backend__, "netsuite")
+        self.assertEqual(get_excel_file.__backend__, "netsuite")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,82 @@
+import json
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from analitycs.operations import build_imports_summary
+
+
+def imports_frame(n: int = 2000, seed: int = 9) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    fob = np.where(rng.random(n) < .05, np.nan, (rng.random(n) * 10000).round(2))
+    return pd.DataFrame({
+        "ano": rng.choice([2022.0, 2023.0, 2024.0, np.nan], n, p=[.3, .3, .35, .05]),
+        "marca": rng.choice([f"B{i}" for i in range(30)] + [None], n),
+        "proveedor": rng.choice([f"P{i}" for i in range(25)] + [None], n),
+        "descripcion_arancelaria": rng.choice([f"D{i}" for i in range(20)] + [None], n),
+        "incoterm": rng.choice(["FOB", "CIF", "EXW", None], n),
+        "amount_us_fob": fob,
+        "amount_us_cif": (fob * 1.1).round(2),
+    })
+
+
+def distribution(df_year: pd.DataFrame, column: str, field: str, top_n=15):
+    """One per-year distribution as the summary built it before (a groupby per year copy)."""
+    grp = df_year.groupby(column, dropna=False)[["amount_us_fob", "amount_us_cif"]].sum().reset_index()
+    if top_n is not None:
+        grp["total_amount"] = grp["amount_us_fob"] + grp["amount_us_cif"]
+        grp = grp.sort_values("total_amount", ascending=False).head(top_n)
+    return [
+        {field: None if pd.isna(key) else str(key), "amount_us_fob": float(fob), "amount_us_cif": float(cif)}
+        for key, fob, cif in zip(grp[column], grp["amount_us_fob"], grp["amount_us_cif"])
+    ]
+
+
+def baseline_years(df: pd.DataFrame):
+    df = df.copy()
+    for col in ["amount_us_fob", "amount_us_cif"]:
+        df[col] = pd.to_numeric(df[col], errors="coerce").fillna(0.0)
+    blocks = {}
+    for year in sorted(int(y) for y in df["ano"].dropna().unique()):
+        df_year = df[df["ano"] == year]
+        blocks[f"year_{year}"] = {
+            "brand_distribution": distribution(df_year, "marca", "brand"),
+            "arancel_distribution": distribution(df_year, "descripcion_arancelaria", "descripcion_arancelaria"),
+            "incoterm_distribution": distribution(df_year, "incoterm", "incoterm", top_n=None),
+            "vendor_distribution": distribution(df_year, "proveedor", "proveedor"),
+        }
+    return blocks
+
+
+class BuildImportsSummaryTest(unittest.TestCase):
+    def test_matches_the_per_year_groupbys(self):
+        df = imports_frame()
+        summary = build_imports_summary(df.copy())
+        expected = baseline_years(df)
+        self.assertEqual(summary["summary"]["years"], [2022, 2023, 2024])
+        for key, block in expected.items():
+            self.assertEqual(json.dumps(summary[key]), json.dumps(block), key)
+
+    def test_batched_input_matches_one_frame(self):
+        df = imports_frame(600)
+        whole = build_imports_summary(df.copy())
+        batched = build_imports_summary(df.iloc[start:start + 250] for start in range(0, len(df), 250))
+        self.assertEqual(json.dumps(batched, sort_keys=True), json.dumps(whole, sort_keys=True))
+
+    def test_top_15_ties_follow_key_order(self):
+        df = pd.DataFrame({
+            "ano": [2024] * 20,
+            "marca": [f"B{i:02d}" for i in range(20)],
+            "proveedor": "P",
+            "descripcion_arancelaria": "D",
+            "incoterm": "FOB",
+            "amount_us_fob": 1.0,
+            "amount_us_cif": 1.0,
+        })
+        brands = build_imports_summary(df)["year_2024"]["brand_distribution"]
+        self.assertEqual([row["brand"] for row in brands], [f"B{i:02d}" for i in range(15)])
+
+
+if __name__ == "__main__":
+    unittest.main()
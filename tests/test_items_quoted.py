@@ -0,0 +1,104 @@
+import json
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from analitycs.sales import summarize_items_quoted
+
+
+def items_frame(n: int = 500, seed: int = 8) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        "customer": rng.choice([f"C{i}" for i in range(15)], n),
+        "quote": [f"Q{i}" for i in rng.integers(0, 120, n)],
+        "inside_sales": rng.choice(["ANA", "JOHN", "LUZ", None], n),
+        "item": [f"I{i}" for i in rng.integers(0, 60, n)],
+        "brand": rng.choice(["3M", "ABB", "SKF", None], n),
+        "product_group": rng.choice(["Bearings", "Filters", None], n),
+        "selected_vendor": rng.choice(["V1", "V2", "V3", None], n),
+        "qty": rng.integers(1, 50, n).astype(float),
+        "unit_price": (rng.random(n) * 100).round(2),
+    })
+
+
+def baseline(df: pd.DataFrame):
+    """The list aggregates as the summary built them before, with a lambda per group."""
+    df = df.assign(line_value=df["qty"] * df["unit_price"])
+    vendor = (
+        df.groupby("selected_vendor", dropna=False, as_index=False)
+        .agg(
+            num_quotes=("quote", "nunique"),
+            num_lines=("item", "count"),
+            total_qty=("qty", "sum"),
+            num_customers=("customer", "nunique"),
+            num_brands=("brand", "nunique"),
+            num_product_groups=("product_group", "nunique"),
+            total_value=("line_value", "sum"),
+            quotes_list=("quote", lambda x: sorted(x.unique())),
+            brands_list=("brand", lambda x: sorted(x.dropna().unique())),
+        )
+        .sort_values(["num_quotes", "num_lines"], ascending=False)
+        .to_dict("records")
+    )
+    brand = (
+        df.groupby("brand", dropna=False, as_index=False)
+        .agg(
+            num_quotes=("quote", "nunique"),
+            num_lines=("item", "count"),
+            total_qty=("qty", "sum"),
+            num_customers=("customer", "nunique"),
+            num_vendors=("selected_vendor", "nunique"),
+            total_value=("line_value", "sum"),
+            quotes_list=("quote", lambda x: sorted(x.unique())),
+        )
+        .sort_values(["num_lines", "total_qty"], ascending=False)
+        .to_dict("records")
+    )
+    inside = (
+        df.groupby("inside_sales", dropna=False, as_index=False)
+        .agg(
+            num_product_groups=("product_group", "nunique"),
+            product_groups_list=("product_group", lambda x: sorted({pg for pg in x if pd.notna(pg)})),
+            num_brands=("brand", "nunique"),
+            brands_list=("brand", lambda x: sorted({b for b in x if pd.notna(b)})),
+            num_vendors=("selected_vendor", "nunique"),
+            vendors_list=("selected_vendor", lambda x: sorted({v for v in x if pd.notna(v)})),
+        )
+        .sort_values(["num_product_groups", "num_brands", "num_vendors"], ascending=False)
+        .head(10)
+        .to_dict("records")
+    )
+    return {"vendor_summary": vendor, "brand_summary": brand, "inside_sales_summary": inside}
+
+
+def dumps(value) -> str:
+    # NaN keys (missing vendor / brand) compare as text
+    return json.dumps(value, default=str)
+
+
+class SummarizeItemsQuotedTest(unittest.TestCase):
+    def test_matches_the_per_group_lambdas(self):
+        for n in (1, 40, 500):
+            df = items_frame(n)
+            summary = summarize_items_quoted(df.copy())
+            for block, expected in baseline(df).items():
+                self.assertEqual(dumps(summary[block]), dumps(expected), f"{block} with {n} rows")
+
+    def test_missing_keys_form_their_own_group(self):
+        df = items_frame(100)
+        vendors = [row["selected_vendor"] for row in summarize_items_quoted(df.copy())["vendor_summary"]]
+        self.assertEqual(len(vendors), 4)
+        self.assertEqual(sum(pd.isna(vendor) for vendor in vendors), 1)
+
+    def test_null_quote_numbers(self):
+        df = items_frame(50)
+        df.loc[[0, 1], "quote"] = None
+        summary = summarize_items_quoted(df.copy())
+        for row in summary["vendor_summary"]:
+            self.assertEqual(row["quotes_list"], sorted(row["quotes_list"]))
+            self.assertNotIn(None, row["quotes_list"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,90 @@
+import threading
+import unittest
+
+import pandas as pd
+
+from connections.name_index import NameIndex, resolve_filter
+
+
+def index(rows):
+    return NameIndex("test", lambda: pd.DataFrame(rows, columns=["id", "name"]), ttl=3600)
+
+
+class NameIndexTest(unittest.TestCase):
+    def setUp(self):
+        self.index = index([
+            (1, "Acme Corp"), (2, "ACME Peru"), (3, "Globex"), (4, "The ACME shop"), (5, None), (6, "Initech"),
+        ])
+
+    def test_matches_like_upper_substring(self):
+        names = [name for _, name in [(1, "Acme Corp"), (2, "ACME Peru"), (3, "Globex"), (4, "The ACME shop"), (6, "Initech")]]
+        for text in ("acme", "ACME", "cMe p", "ex", "x", "tech", "zzz"):
+            expected = {name for name in names if text.upper() in name.upper()}
+            self.assertEqual(set(self.index.search(text)["name"]), expected, text)
+
+    def test_prefix_matches_first(self):
+        found = self.index.search("acme")
+        self.assertEqual(found["name"].tolist(), ["Acme Corp", "ACME Peru", "The ACME shop"])
+        self.assertEqual(found["id"].tolist(), [1, 2, 4])
+
+    def test_counters_are_consistent_under_threads(self):
+        def searches():
+            for _ in range(200):
+                self.index.search("acme")
+
+        threads = [threading.Thread(target=searches) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        stats = self.index.stats()
+        self.assertEqual((stats["searches"], stats["loads"], stats["names"]), (800, 1, 5))
+
+
+class ResolveFilterTest(unittest.TestCase):
+    def test_no_filter(self):
+        self.assertEqual(resolve_filter(index([]), "", "customer"), (None, None))
+
+    def test_no_match_replies(self):
+        ids, reply = resolve_filter(index([(1, "Acme")]), "globex", "customer")
+        self.assertIsNone(ids)
+        self.assertEqual(reply["matches"], [])
+
+    def test_matches_under_the_cap_filter_by_every_match(self):
+        rows = [(i, f"CUSTOMER {i}") for i in range(50)]
+        ids, reply = resolve_filter(index(rows), "customer", "customer")
+        self.assertIsNone(reply)
+        self.assertEqual(ids, tuple(range(50)))
+
+    def test_too_many_matches_reply_with_candidates(self):
+        rows = [(i, f"CUSTOMER {i}") for i in range(700)]
+        ids, reply = resolve_filter(index(rows), "customer", "customer")
+        self.assertIsNone(ids)
+        self.assertEqual(reply["total_matches"], 700)
+        self.assertEqual(len(reply["matches"]), 50)
+
+    def test_exact_name_resolves_a_broad_match(self):
+        rows = [(i, f"CUSTOMER {i}") for i in range(700)] + [(700, "Customer")]
+        ids, reply = resolve_filter(index(rows), "customer", "customer")
+        self.assertIsNone(reply)
+        self.assertEqual(ids, (700,))
+
+    def test_miss_reloads_once_before_replying(self):
+        tables = [[(1, "Acme")], [(1, "Acme"), (2, "Globex")]]
+        loads = []
+
+        def loader():
+            loads.append(1)
+            return pd.DataFrame(tables[min(len(loads), 2) - 1], columns=["id", "name"])
+
+        names = NameIndex("test", loader, ttl=3600)
+        names.load()
+        names.refresh_interval = 0
+        self.assertEqual(resolve_filter(names, "globex", "customer"), ((2,), None))
+        # Rows were just reloaded: another miss replies without a third load
+        names.refresh_interval = 60
+        ids, reply = resolve_filter(names, "initech", "customer")
+        self.assertEqual((ids, reply["matches"], len(loads)), (None, [], 2))
+
+if __name__ == "__main__":
+    unittest.main()
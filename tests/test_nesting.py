@@ -0,0 +1,92 @@
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from analitycs.nesting import group_codes, nest, to_records, unique_lists
+
+
+class ToRecordsTest(unittest.TestCase):
+    def test_casts(self):
+        frame = pd.DataFrame({
+            "n": [1.0, 2.0],
+            "x": [1, np.nan],
+            "s": [3, None],
+            "items": [("a", "b"), ("c",)],
+        })
+        records = to_records(frame, {
+            "n": ("n", "int"),
+            "x": ("x", "float_or_none"),
+            "xs": ("x", "float"),
+            "s": ("s", "str_or_none"),
+            "items": ("items", "list"),
+            "raw": ("n", None),
+            "none": (None, None),
+        })
+        self.assertEqual(records[0], {"n": 1, "x": 1.0, "xs": 1.0, "s": "3.0", "items": ["a", "b"], "raw": 1.0, "none": None})
+        self.assertIsNone(records[1]["x"])
+        self.assertTrue(np.isnan(records[1]["xs"]))
+        self.assertIsNone(records[1]["s"])
+        self.assertEqual(type(records[0]["n"]), int)
+
+    def test_unknown_cast(self):
+        with self.assertRaises(ValueError):
+            to_records(pd.DataFrame({"a": [1]}), {"a": ("a", "decimal")})
+
+    def test_empty_frame(self):
+        self.assertEqual(to_records(pd.DataFrame({"a": []}), {"a": ("a", "int")}), [])
+
+
+class NestTest(unittest.TestCase):
+    def setUp(self):
+        self.frame = pd.DataFrame({
+            "rep": ["LUZ", "ANA", None, "LUZ", "ANA", "JOHN"],
+            "status": ["Open", "Open", "Open", "Closed", "Closed", "Open"],
+            "amount": [1.0, 2.0, 3.0, 4.0, 5.0, 6.0],
+        })
+
+    def test_matches_groupby_iteration(self):
+        fields = {"status": ("status", None), "amount": ("amount", "float")}
+        nested = nest(self.frame, "rep", fields)
+        expected = [(rep, to_records(group, fields)) for rep, group in self.frame.groupby("rep")]
+        self.assertEqual(nested, expected)
+
+    def test_keyed_groups(self):
+        nested = dict(nest(self.frame, "rep", {"amount": ("amount", "float")}, key="status"))
+        self.assertEqual(nested["LUZ"], {"Open": {"amount": 1.0}, "Closed": {"amount": 4.0}})
+        self.assertEqual(list(nested), ["ANA", "JOHN", "LUZ"])
+
+    def test_empty_frame(self):
+        self.assertEqual(nest(self.frame.iloc[0:0], "rep", {"amount": ("amount", "float")}), [])
+
+
+class GroupCodesTest(unittest.TestCase):
+    def test_groupby_order(self):
+        keys = pd.Series(["b", None, "a", "b"])
+        codes, uniques = group_codes(keys)
+        self.assertEqual(codes.tolist(), [1, -1, 0, 1])
+        self.assertEqual(uniques.tolist(), ["a", "b"])
+        codes, uniques = group_codes(keys, dropna=False)
+        self.assertEqual(codes.tolist(), [1, 2, 0, 1])
+        self.assertEqual(len(uniques), 3)
+
+    def test_unique_lists_match_groupby(self):
+        rng = np.random.default_rng(2)
+        frame = pd.DataFrame({
+            "group": rng.choice(["g1", "g2", "g3", None], 200),
+            "value": rng.choice(["x", "y", "z", "w", None], 200),
+        })
+        codes, uniques = group_codes(frame["group"])
+        lists = unique_lists(codes, len(uniques), frame["value"])
+        expected = frame.dropna(subset=["group"]).groupby("group")["value"].apply(lambda v: sorted(v.dropna().unique()))
+        self.assertEqual(lists, expected.tolist())
+
+    def test_unique_lists_edge_cases(self):
+        codes, uniques = group_codes(pd.Series(["a", "b"]))
+        self.assertEqual(unique_lists(codes, len(uniques), pd.Series([None, None])), [[], []])
+        self.assertEqual(unique_lists(codes, len(uniques), pd.Series([None, "v"])), [[], ["v"]])
+        self.assertEqual(unique_lists(np.array([], dtype=np.intp), 0, pd.Series([], dtype=object)), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
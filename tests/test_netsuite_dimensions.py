@@ -0,0 +1,109 @@
+import re
+import threading
+import unittest
+
+import pandas as pd
+
+from connections.netsuite_dimensions import DIMENSIONS, DimensionCache, RESOLVERS
+
+
+class FakeNetSuite:
+    """Answers the probe and preload queries from id -> name tables per column.
+
+    Every query returns the whole table of its columns, like probes that hit
+    every known id.
+    """
+
+    def __init__(self, names):
+        self.names = names
+        self.queries = []
+
+    def __call__(self, sql, params, use_cache=True):
+        self.queries.append((sql, params))
+        frame = {}
+        for column, suffix in re.findall(r"(\S+) AS id(_\d+|), BUILTIN\.DF\(\1\) AS name\2", sql):
+            table = self.names[column]
+            frame[f"id{suffix}"] = list(table)
+            frame[f"name{suffix}"] = list(table.values())
+        # A preload scan returns combinations; pad the shorter columns
+        size = max((len(values) for values in frame.values()), default=0)
+        return pd.DataFrame({k: v + [None] * (size - len(v)) for k, v in frame.items()})
+
+
+class DimensionCacheTest(unittest.TestCase):
+    def test_unknown_ids_are_probed_once(self):
+        netsuite = FakeNetSuite({"t.entity": {10: "ACME", 11: "Globex"}})
+        cache = DimensionCache(netsuite)
+        ids = pd.Series([10, 11, None, 10, 12])
+        probes = pd.Series([10, 11, 1, 10, 12])
+        self.assertEqual(cache.names("customer", ids, probes).tolist(), ["ACME", "Globex", None, "ACME", None])
+        # Known ids, and 12 stored as unnamed, are not probed again
+        cache.names("customer", ids, probes)
+        self.assertEqual(len(netsuite.queries), 1)
+        self.assertEqual(cache.stats()["fill_queries"], 1)
+        self.assertEqual(cache.stats()["lookups"], 2)
+
+    def test_expired_ids_are_refreshed(self):
+        netsuite = FakeNetSuite({"t.entity": {10: "ACME"}})
+        cache = DimensionCache(netsuite, ttl=0)
+        cache.names("customer", pd.Series([10]), pd.Series([10]))
+        cache.names("customer", pd.Series([10]), pd.Series([10]))
+        self.assertEqual(len(netsuite.queries), 2)
+
+    def test_preload_shares_one_scan_per_source(self):
+        names = {spec.column: {1: f"{spec.name} 1", 2: f"{spec.name} 2"} for spec in DIMENSIONS.values()}
+        netsuite = FakeNetSuite(names)
+        cache = DimensionCache(netsuite)
+        cache.preload(days=30)
+        scans = {(s.source, s.where, s.preload) for s in DIMENSIONS.values() if s.preload is not None}
+        self.assertEqual(len(netsuite.queries), len(scans))
+        self.assertLess(len(netsuite.queries), sum(s.preload is not None for s in DIMENSIONS.values()))
+        for spec in DIMENSIONS.values():
+            if spec.preload is not None:
+                resolved = cache.names(spec.name, pd.Series([2]), pd.Series([2]))
+                self.assertEqual(resolved.tolist(), [f"{spec.name} 2"])
+        self.assertEqual(len(netsuite.queries), len(scans))
+
+    def test_counters_are_consistent_under_threads(self):
+        cache = DimensionCache(FakeNetSuite({"t.entity": {1: "A"}}))
+        cache.names("customer", pd.Series([1]), pd.Series([1]))
+
+        def lookups():
+            for _ in range(200):
+                cache.names("customer", pd.Series([1]), pd.Series([1]))
+
+        threads = [threading.Thread(target=lookups) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(cache.stats()["lookups"], 801)
+
+
+class ResolveBookingsTest(unittest.TestCase):
+    def test_chile_override_and_raw_subsidiary_ids(self):
+        netsuite = FakeNetSuite({
+            "csr.subsidiary": {5: "IDICO USA", 3: "IDICO Peru"},
+            "t.currency": {1: "USD"},
+            "t.entity": {7: "ACME"},
+            "ea.country": {"CO": "Colombia"},
+            "t.custbody_evol_incoterms": {},
+            "t.custbody_inc": {},
+            "t.custbody_city": {},
+            "t.employee": {9: "ANA P"},
+            "t.terms": {},
+        })
+        df = pd.DataFrame({
+            "so_number": ["SO1", "SO2", "SO3"], "status": "Billed", "date": "2025-01-02", "period": "2025-01",
+            "subsidiary_override": ["IDICO Chile", "5", "3"], "subsidiary_id": [5, 5, 3],
+            "currency_id": 1, "customer_id": 7, "country_id": "CO", "address_id": 1,
+            "incoterm_id": None, "inc_id": None, "city_id": None, "employee_id": 9,
+            "gross_usd": 1.0, "net_usd": 1.0, "terms_id": None, "gross_margin": 0.1,
+            "gross_margin_pct": 0.1, "tran_id": [100, 101, 102],
+        })
+        resolved = RESOLVERS["get_bookings_data"](DimensionCache(netsuite), df)
+        self.assertEqual(resolved["subsidiary"].tolist(), ["IDICO Chile", "IDICO USA", "IDICO Peru"])
+
+
+if __name__ == "__main__":
+    unittest.main()
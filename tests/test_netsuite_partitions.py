@@ -0,0 +1,78 @@
+import threading
+import unittest
+from unittest import mock
+
+import pandas as pd
+
+from connections import netsuite
+from connections.executors import BackendExecutor
+
+
+def get_ordered(initial_date, final_date, subsidiary=None):
+    return "SELECT x FROM t WHERE d BETWEEN ? AND ? ORDER BY period;", [initial_date, final_date, subsidiary]
+
+
+def get_unordered(initial_date, final_date):
+    return "SELECT x FROM t WHERE d BETWEEN ? AND ?;", [initial_date, final_date]
+
+
+class FetchPartitionedTest(unittest.TestCase):
+    def setUp(self):
+        self.executor = BackendExecutor("netsuite", max_workers=2, max_queue=8)
+        self.threads = []
+        patchers = [
+            mock.patch.object(netsuite, "get_executor", lambda backend: self.executor),
+            mock.patch.object(netsuite, "query_frame", self.query_frame),
+            mock.patch.dict(netsuite.PARTITION_ORDER, {"get_ordered": ("period",)}),
+        ]
+        for patcher in patchers:
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def query_frame(self, sql, params, use_cache=True):
+        self.threads.append(threading.current_thread().name)
+        subsidiary = params[2] if len(params) > 2 else None
+        # Every partition is sorted on its own, but spans the same periods
+        return pd.DataFrame({"period": ["2025-01", "2025-03"], "subsidiary": [subsidiary, subsidiary]})
+
+    def test_merged_partitions_keep_the_global_order(self):
+        df = netsuite.fetch_partitioned(get_ordered, "2025-01-10", "2025-03-05", subsidiaries=(3, 4), max_workers=2)
+        self.assertEqual(df["period"].tolist(), ["2025-01"] * 6 + ["2025-03"] * 6)
+        # Stable: within a period rows keep month, then subsidiary, order
+        self.assertEqual(df["subsidiary"].tolist()[:6], [3, 4, 3, 4, 3, 4])
+
+    def test_unlisted_builder_with_order_by_is_refused(self):
+        with mock.patch.dict(netsuite.PARTITION_ORDER, clear=True):
+            with self.assertRaises(ValueError):
+                netsuite.fetch_partitioned(get_ordered, "2025-01-01", "2025-02-28")
+        # A single partition needs no re-sort
+        df = netsuite.fetch_partitioned(get_unordered, "2025-01-01", "2025-01-31")
+        self.assertEqual(len(df), 2)
+
+    def test_runs_on_the_executor_without_waiting_for_busy_workers(self):
+        # Both workers are tool calls partitioning their own query: without the
+        # callers taking part, the helpers they queue would never start
+        barrier = threading.Barrier(2)
+
+        def tool():
+            barrier.wait(1)
+            return netsuite.fetch_partitioned(get_unordered, "2025-01-01", "2025-06-30", max_workers=4)
+
+        calls = [self.executor.submit(tool) for _ in range(2)]
+        for call in calls:
+            self.assertEqual(len(call.result(5)), 12)
+        self.assertTrue(all(name.startswith("netsuite-io") for name in self.threads))
+
+    def test_partition_errors_are_raised(self):
+        def failing(sql, params, use_cache=True):
+            if params[0].startswith("2025-02"):
+                raise RuntimeError("boom")
+            return pd.DataFrame({"x": [1]})
+
+        with mock.patch.object(netsuite, "query_frame", failing):
+            with self.assertRaises(RuntimeError):
+                netsuite.fetch_partitioned(get_unordered, "2025-01-01", "2025-04-30", max_workers=3)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,90 @@
+import unittest
+from unittest import mock
+
+from connections import netsuite
+from connections.netsuite import NetSuiteConnectionPool
+
+
+class FakeConnection:
+    """Stands in for NetSuiteConnection: no JVM, validity set by the test."""
+
+    def __init__(self):
+        self._conn = None
+        self.created_at = self.last_used_at = None
+        self.valid = True
+        self.closed = False
+
+    def connect(self):
+        self._conn = object()
+        self.created_at = self.last_used_at = netsuite.time.monotonic()
+        return True
+
+    def is_valid(self, timeout=5):
+        return self.valid
+
+    def close(self):
+        self.closed = True
+        self._conn = None
+
+
+class NetSuiteConnectionPoolTest(unittest.TestCase):
+    def setUp(self):
+        patcher = mock.patch.object(netsuite, "NetSuiteConnection", FakeConnection)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.pool = NetSuiteConnectionPool(min_size=0, max_size=1, acquire_timeout=0.2)
+
+    def test_connection_is_reused(self):
+        with self.pool.connection() as first:
+            pass
+        with self.pool.connection() as second:
+            pass
+        self.assertIs(first, second)
+        self.assertEqual(self.pool.stats()["connections_created"], 1)
+        self.assertEqual(self.pool.stats()["borrows"], 2)
+
+    def test_generator_closed_early_returns_the_connection(self):
+        def stream():
+            with self.pool.connection() as conn:
+                yield conn
+                yield conn
+
+        frames = stream()
+        borrowed = next(frames)
+        self.assertEqual(self.pool.stats()["in_use"], 1)
+        frames.close()
+        self.assertEqual(self.pool.stats()["in_use"], 0)
+        with self.pool.connection() as conn:
+            self.assertIs(conn, borrowed)
+
+    def test_keyboard_interrupt_returns_the_connection(self):
+        with self.assertRaises(KeyboardInterrupt):
+            with self.pool.connection():
+                raise KeyboardInterrupt
+        self.assertEqual(self.pool.stats()["idle"], 1)
+
+    def test_invalid_connection_is_discarded_after_an_error(self):
+        with self.assertRaises(ValueError):
+            with self.pool.connection() as conn:
+                conn.valid = False
+                raise ValueError("query failed")
+        self.assertTrue(conn.closed)
+        stats = self.pool.stats()
+        self.assertEqual((stats["size"], stats["connections_discarded"]), (0, 1))
+
+    def test_acquire_times_out_when_the_pool_is_exhausted(self):
+        with self.pool.connection():
+            with self.assertRaises(TimeoutError):
+                self.pool.acquire()
+        self.assertEqual(self.pool.stats()["waits"], 1)
+
+    def test_release_after_close_discards(self):
+        conn = self.pool.acquire()
+        self.pool.close()
+        self.pool.release(conn)
+        self.assertTrue(conn.closed)
+        self.assertEqual(self.pool.stats()["size"], 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
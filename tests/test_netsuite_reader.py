@@ -0,0 +1,137 @@
+import unittest
+from datetime import date, datetime, timedelta
+from unittest import mock
+
+import jaydebeapi as jd
+import numpy as np
+
+from connections import netsuite
+from connections.netsuite import _read_frame
+
+EPOCH = date(1970, 1, 1)
+
+
+class _Value:
+    """Minimal java.sql.Date / java.sql.Timestamp (and their java.time views)."""
+
+    def __init__(self, moment, nanos=0):
+        self.moment, self.nanos = moment, nanos
+
+    # java.sql.Date / java.sql.Timestamp
+    def toLocalDate(self):
+        return self
+
+    def toLocalDateTime(self):
+        return self
+
+    def getNanos(self):
+        return self.nanos
+
+    # java.time.LocalDate / java.time.LocalDateTime
+    def toEpochDay(self):
+        return (self.moment - EPOCH).days
+
+    def toEpochSecond(self, offset):
+        return int((self.moment - datetime(1970, 1, 1)).total_seconds())
+
+    def __str__(self):
+        if isinstance(self.moment, datetime):
+            fraction = f"{self.nanos:09d}".rstrip("0") or "0"
+            return f"{self.moment:%Y-%m-%d %H:%M:%S}.{fraction}"
+        return self.moment.isoformat()
+
+
+class FakeResultSet:
+    """Row cursor over Python rows, with JDBC getters and wasNull()."""
+
+    def __init__(self, rows):
+        self.rows, self.pos, self.last = rows, -1, None
+
+    def next(self):
+        self.pos += 1
+        return self.pos < len(self.rows)
+
+    def _get(self, idx, null):
+        self.last = self.rows[self.pos][idx - 1]
+        return null if self.last is None else self.last
+
+    def getDouble(self, idx):
+        return self._get(idx, 0.0)
+
+    def getLong(self, idx):
+        return self._get(idx, 0)
+
+    def getDate(self, idx):
+        return self._get(idx, None)
+
+    def getTimestamp(self, idx):
+        return self._get(idx, None)
+
+    def getString(self, idx):
+        return self._get(idx, None)
+
+    def wasNull(self):
+        return self.last is None
+
+
+class FakeMeta:
+    def __init__(self, columns):
+        self.columns = columns
+
+    def getColumnCount(self):
+        return len(self.columns)
+
+    def getColumnName(self, idx):
+        return self.columns[idx - 1][0]
+
+    def getColumnType(self, idx):
+        return self.columns[idx - 1][1]
+
+
+COLUMNS = [("amount", 3), ("qty", 4), ("count", -5), ("day", 91), ("created", 93), ("name", 12)]
+ROWS = [
+    (1.5, 2, 7, _Value(date(2025, 3, 1)), _Value(datetime(2025, 3, 1, 10, 20, 30)), "a"),
+    (None, 3, None, None, _Value(datetime(1999, 12, 31, 23, 59, 59), 500_000_000), None),
+    (-2.25, 4, 9, _Value(date(1960, 7, 4)), None, "c"),
+]
+
+
+class ReadFrameTest(unittest.TestCase):
+    def setUp(self):
+        patcher = mock.patch.object(netsuite, "jpype")
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_typed_columns(self):
+        df, n = _read_frame(FakeResultSet(ROWS), FakeMeta(COLUMNS))
+        self.assertEqual(n, 3)
+        self.assertEqual(list(df.columns), [name for name, _ in COLUMNS])
+        self.assertEqual(df["amount"].dtype, np.float64)
+        self.assertTrue(np.isnan(df["amount"][1]))
+        self.assertEqual(df["qty"].dtype, np.int64)
+        self.assertEqual(df["count"].tolist()[::2], [7.0, 9.0])
+        self.assertTrue(np.isnan(df["count"][1]))
+        self.assertEqual(df["name"].tolist(), ["a", None, "c"])
+
+    def test_dates_keep_jaydebeapi_strings(self):
+        df, _ = _read_frame(FakeResultSet(ROWS), FakeMeta(COLUMNS))
+        for row, (day, created) in enumerate(zip(df["day"], df["created"])):
+            rs = FakeResultSet(ROWS)
+            rs.pos = row
+            self.assertEqual(day, jd._to_date(rs, 4))
+            self.assertEqual(created, jd._to_datetime(rs, 5))
+        self.assertEqual(df["created"].tolist(), ["2025-03-01 10:20:30", "1999-12-31 23:59:59.500000", None])
+
+    def test_batches(self):
+        rs, meta = FakeResultSet(ROWS), FakeMeta(COLUMNS)
+        first, n1 = _read_frame(rs, meta, 2)
+        second, n2 = _read_frame(rs, meta, 2)
+        third, n3 = _read_frame(rs, meta, 2)
+        self.assertEqual((n1, n2, n3), (2, 1, 0))
+        self.assertEqual(second["day"].tolist(), ["1960-07-04"])
+        self.assertEqual(len(third), 0)
+        self.assertEqual(list(third.columns), [name for name, _ in COLUMNS])
+
+
+if __name__ == "__main__":
+    unittest.main()
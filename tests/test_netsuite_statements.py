@@ -0,0 +1,152 @@
+import unittest
+from unittest import mock
+
+import jaydebeapi as jd
+
+from connections import netsuite, netsuite_querys
+from connections.netsuite import NetSuiteConnection
+from tests.test_netsuite_reader import FakeResultSet
+
+
+class FakeRows(FakeResultSet):
+    def __init__(self, rows):
+        super().__init__(rows)
+        self.closed = False
+
+    def setFetchSize(self, size):
+        self.fetch_size = size
+
+    def getMetaData(self):
+        return self
+
+    # ResultSetMetaData
+    def getColumnCount(self):
+        return 1
+
+    def getColumnName(self, idx):
+        return "value"
+
+    def getColumnType(self, idx):
+        return 4
+
+    def close(self):
+        self.closed = True
+
+
+class FakeStatement:
+    def __init__(self, sql, fail=False):
+        self.sql, self.fail = sql, fail
+        self.params, self.cleared, self.closed = {}, 0, False
+        self.results = []
+
+    def clearParameters(self):
+        self.cleared += 1
+        self.params = {}
+
+    def setObject(self, idx, value):
+        self.params[idx] = value
+
+    def execute(self):
+        if self.fail:
+            raise RuntimeError("SQL error")
+        self.results.append(FakeRows([(value,) for _, value in sorted(self.params.items())]))
+        return True
+
+    def getResultSet(self):
+        return self.results[-1]
+
+    def close(self):
+        self.closed = True
+
+
+class FakeJdbcConnection:
+    def __init__(self):
+        self.prepared = []
+        self.fail = False
+
+    def prepareStatement(self, sql):
+        stmt = FakeStatement(sql, self.fail)
+        self.prepared.append(stmt)
+        return stmt
+
+
+def connection(cache_size=2):
+    conn = NetSuiteConnection()
+    conn.statement_cache_size = cache_size
+    conn._conn = mock.Mock(jconn=FakeJdbcConnection())
+    return conn, conn._conn.jconn
+
+
+class PreparedStatementCacheTest(unittest.TestCase):
+    def setUp(self):
+        patcher = mock.patch.object(netsuite, "jpype")
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_statement_is_reused_and_rebound(self):
+        conn, jconn = connection()
+        first = conn.execute_query_frame("SELECT ?", [1])
+        second = conn.execute_query_frame("SELECT ?", [2])
+        self.assertEqual((first["value"].tolist(), second["value"].tolist()), ([1], [2]))
+        self.assertEqual(len(jconn.prepared), 1)
+        stmt = jconn.prepared[0]
+        self.assertEqual(stmt.cleared, 1)
+        self.assertFalse(stmt.closed)
+        self.assertTrue(all(rs.closed for rs in stmt.results))
+
+    def test_least_recently_used_statement_is_evicted(self):
+        conn, jconn = connection(cache_size=2)
+        for sql in ("SELECT 1", "SELECT 2", "SELECT 1", "SELECT 3"):
+            conn.execute_query_frame(sql)
+        self.assertEqual(list(conn._statements), ["SELECT 1", "SELECT 3"])
+        self.assertTrue(jconn.prepared[1].closed)
+
+    def test_failed_statement_is_dropped(self):
+        conn, jconn = connection()
+        jconn.fail = True
+        with self.assertRaises(jd.DatabaseError):
+            conn.execute_query_frame("SELECT ?", [1])
+        self.assertEqual(conn._statements, {})
+        self.assertTrue(jconn.prepared[0].closed)
+
+    def test_cache_disabled_closes_every_statement(self):
+        conn, jconn = connection(cache_size=0)
+        conn.execute_query_frame("SELECT 1")
+        conn.execute_query_frame("SELECT 1")
+        self.assertEqual(len(jconn.prepared), 2)
+        self.assertTrue(all(stmt.closed for stmt in jconn.prepared))
+
+    def test_close_releases_cached_statements(self):
+        conn, jconn = connection()
+        conn.execute_query_frame("SELECT 1")
+        conn.close()
+        self.assertTrue(jconn.prepared[0].closed)
+
+
+class BuilderTest(unittest.TestCase):
+    def test_in_lists_are_padded_to_stable_sizes(self):
+        params = []
+        self.assertEqual(netsuite_querys._in("t.entity", None, params), "")
+        sql = netsuite_querys._in("t.entity", [10, 11, 12], params)
+        self.assertEqual(sql, "AND t.entity IN (" + ", ".join("?" * 8) + ")")
+        self.assertEqual(params, [10, 11, 12] + [12] * 5)
+
+    def test_long_in_lists_are_split_below_the_oracle_limit(self):
+        params = []
+        sql = netsuite_querys._in("t.entity", list(range(600)), params)
+        self.assertEqual(sql.count(" IN ("), 2)
+        self.assertTrue(sql.startswith("AND (t.entity IN (") and " OR t.entity IN (" in sql)
+        self.assertEqual(len(params), 512 + 512)
+        self.assertEqual(params[:600], list(range(600)))
+
+    def test_sql_text_only_depends_on_present_filters(self):
+        sql_a, params_a = netsuite_querys.get_quotes_by_inside("2025-01-01", "2025-01-31", [1], [2, 3])
+        sql_b, params_b = netsuite_querys.get_quotes_by_inside("2025-02-01", "2025-02-28", [4], [5, 6, 7])
+        self.assertEqual(sql_a, sql_b)
+        self.assertEqual(sql_a.count("?"), len(params_a))
+        self.assertNotIn("2025", sql_a)
+        self.assertIn("2025-02-01", params_b)
+
+
+if __name__ == "__main__":
+    unittest.main()
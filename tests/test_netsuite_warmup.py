@@ -0,0 +1,60 @@
+import unittest
+from unittest import mock
+
+from connections import netsuite
+from connections.netsuite import NetSuiteConnectionPool
+
+
+class FakeConnection:
+    """Stands in for NetSuiteConnection: no JVM, validity set by the test."""
+
+    def __init__(self):
+        self._conn = None
+        self.created_at = self.last_used_at = None
+        self.valid = True
+        self.closed = False
+
+    def connect(self):
+        self._conn = object()
+        self.created_at = self.last_used_at = netsuite.time.monotonic()
+        return True
+
+    def is_valid(self, timeout=5):
+        return self.valid
+
+    def close(self):
+        self.closed = True
+        self._conn = None
+
+
+class WarmUpTest(unittest.TestCase):
+    def setUp(self):
+        for name, value in (("NetSuiteConnection", FakeConnection), ("start_jvm", mock.Mock()), ("load_driver", mock.Mock())):
+            patcher = mock.patch.object(netsuite, name, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self.pool = NetSuiteConnectionPool(min_size=1, max_size=3)
+        patcher = mock.patch.object(netsuite, "get_netsuite_pool", lambda: self.pool)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_prewarms_pooled_connections(self):
+        with mock.patch.dict("os.environ", {"NETSUITE_POOL_PREWARM": "2", "NETSUITE_DIMENSION_PRELOAD": "0"}):
+            self.assertTrue(netsuite.warm_up_netsuite())
+        netsuite.start_jvm.assert_called_once()
+        netsuite.load_driver.assert_called_once()
+        self.assertEqual((self.pool.stats()["idle"], self.pool.stats()["connections_created"]), (2, 2))
+
+    def test_prewarm_is_capped_by_the_pool_size(self):
+        with mock.patch.dict("os.environ", {"NETSUITE_DIMENSION_PRELOAD": "0"}):
+            self.assertTrue(netsuite.warm_up_netsuite(prewarm_connections=10))
+        self.assertEqual(self.pool.stats()["idle"], 3)
+
+    def test_failure_is_reported_not_raised(self):
+        netsuite.load_driver.side_effect = ValueError("Missing DRIVER_NETSUITE environment variable")
+        self.assertFalse(netsuite.warm_up_netsuite())
+        self.assertEqual(self.pool.stats()["size"], 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,89 @@
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from analitycs.sales import opportunity_summary
+
+
+def opportunities_frame(dates, seed: int = 5) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    n = len(dates)
+    return pd.DataFrame({
+        "id": range(n),
+        "op_number": [f"OP{i}" for i in range(n)],
+        "tran_date": dates,
+        "expected_close_date": dates,
+        "customer": rng.choice([f"C{i}" for i in range(12)], n),
+        "subsidiary": rng.choice(["IDICO USA", "IDICO Peru"], n),
+        "status": rng.choice(["In Progress", "Closed Won", "Closed Lost"], n),
+        "inside_sales": rng.choice(["ANA", "JOHN", "LUZ"], n),
+    })
+
+
+def low_counts(df: pd.DataFrame, column: str, freq, threshold: int):
+    """The per-granularity block as the summary computed it before (every granularity, then pick one)."""
+    valid = df.assign(tran_date=pd.to_datetime(df["tran_date"], errors="coerce")).dropna(subset=["tran_date"])
+    key = valid["tran_date"].dt.date if freq is None else valid["tran_date"].dt.to_period(freq)
+    counts = valid.groupby(["inside_sales", key]).size().reset_index(name="count")
+    counts.columns = ["inside_sales", column, "count"]
+    counts[column] = counts[column].astype(str)
+    return counts[counts["count"] < threshold].to_dict(orient="records")
+
+
+class OpportunitySummaryTest(unittest.TestCase):
+    def test_multi_month_window_is_monthly(self):
+        rng = np.random.default_rng(1)
+        dates = [f"2025-{m:02d}-{d:02d}" for m, d in zip(rng.integers(1, 5, 300), rng.integers(1, 28, 300))]
+        df = opportunities_frame(dates + [None])
+        summary = opportunity_summary(df.copy())
+        self.assertEqual(summary["period"], {"start_date": min(dates), "end_date": max(dates)})
+        self.assertEqual(summary["low_performance_indicators"], {
+            "daily": [], "weekly": [], "monthly": low_counts(df, "month", "M", 50),
+        })
+
+    def test_same_week_window_is_weekly(self):
+        # Monday to Thursday of one ISO week
+        df = opportunities_frame(["2025-03-03", "2025-03-04", "2025-03-06"] * 10)
+        summary = opportunity_summary(df.copy())
+        self.assertEqual(summary["low_performance_indicators"], {
+            "daily": [], "weekly": low_counts(df, "week", "W", 15), "monthly": [],
+        })
+
+    def test_today_is_daily(self):
+        today = pd.Timestamp.today().date().isoformat()
+        df = opportunities_frame([today] * 6)
+        summary = opportunity_summary(df.copy())
+        self.assertEqual(summary["low_performance_indicators"], {
+            "daily": low_counts(df, "date", None, 4), "weekly": [], "monthly": [],
+        })
+        self.assertEqual(summary["overdue_in_progress"], [])
+
+    def test_distributions_and_overdue(self):
+        dates = [f"2025-01-{d:02d}" for d in range(1, 28)] * 2
+        df = opportunities_frame(dates)
+        summary = opportunity_summary(df.copy())
+        self.assertEqual(summary["summary"]["total_opportunities"], len(df))
+        self.assertEqual(summary["summary"]["total_unique_customers"], df["customer"].nunique())
+        shares = df["customer"].value_counts()
+        self.assertEqual(
+            [row["count"] for row in summary["summary"]["customer_participation"]],
+            shares.head(10).tolist(),
+        )
+        self.assertEqual(
+            {row["inside_sales"]: row["count"] for row in summary["distribution"]["inside_sales"]},
+            df["inside_sales"].value_counts().to_dict(),
+        )
+        in_progress = df[df["status"] == "In Progress"].head(10)
+        overdue = summary["overdue_in_progress"]
+        self.assertEqual([row["op_number"] for row in overdue], in_progress["op_number"].tolist())
+        self.assertEqual([row["tran_date"] for row in overdue], in_progress["tran_date"].tolist())
+        today = pd.Timestamp.today().normalize()
+        self.assertEqual(
+            [row["days_open"] for row in overdue],
+            [(today - pd.Timestamp(day)).days for day in in_progress["tran_date"]],
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,89 @@
+import unittest
+from contextlib import contextmanager
+from types import SimpleNamespace
+from unittest import mock
+
+import numpy as np
+import pandas as pd
+
+from connections import postgresql
+from connections.postgresql import NumericLoader
+
+
+class FakeCursor:
+    def __init__(self, conn):
+        self.conn = conn
+        self.description = None
+        self.closed = False
+
+    def execute(self, sql, params=None):
+        self.conn.log.append(("execute", sql, params, self.conn.in_pipeline))
+        self.description = [SimpleNamespace(name="n")]
+        self._rows = [(sql.count("x"),)]
+
+    def fetchall(self):
+        return self._rows
+
+    def close(self):
+        self.closed = True
+
+
+class FakeConnection:
+    def __init__(self):
+        self.log = []
+        self.in_pipeline = False
+        self.cursors = []
+
+    @contextmanager
+    def pipeline(self):
+        self.in_pipeline = True
+        try:
+            yield
+        finally:
+            self.in_pipeline = False
+            self.log.append(("sync",))
+
+    def cursor(self):
+        cursor = FakeCursor(self)
+        self.cursors.append(cursor)
+        return cursor
+
+
+class FakePool:
+    def __init__(self):
+        self.conn = FakeConnection()
+        self.borrowed = 0
+
+    @contextmanager
+    def connection(self):
+        self.borrowed += 1
+        yield self.conn
+
+
+class ExecutePgBatchTest(unittest.TestCase):
+    def test_one_pipelined_round_trip_on_one_connection(self):
+        pool = FakePool()
+        with mock.patch.object(postgresql, "get_pg_pool", lambda target: pool):
+            results = postgresql.execute_pg_batch({"a": ("SELECT x", None), "b": ("SELECT xx", [1])})
+        self.assertEqual(results, {"a": (["n"], [(1,)]), "b": (["n"], [(2,)])})
+        self.assertEqual(pool.borrowed, 1)
+        # Both statements go out inside one pipeline, then a single sync
+        self.assertEqual([entry[0] for entry in pool.conn.log], ["execute", "execute", "sync"])
+        self.assertTrue(all(entry[3] for entry in pool.conn.log[:2]))
+        self.assertTrue(all(cursor.closed for cursor in pool.conn.cursors))
+
+
+class NumericLoaderTest(unittest.TestCase):
+    def test_always_float(self):
+        loader = NumericLoader(1700)
+        values = [loader.load(memoryview(text)) for text in (b"100", b"-3", b"2.50", b"NaN")]
+        self.assertEqual([type(v) for v in values], [float] * 4)
+        self.assertEqual(values[:3], [100.0, -3.0, 2.5])
+        self.assertTrue(np.isnan(values[3]))
+        # A SUM() column mixing whole and fractional values keeps one dtype
+        frame = pd.DataFrame({"total": [loader.load(b"100"), loader.load(b"100.5")]})
+        self.assertEqual(frame["total"].dtype, np.float64)
+
+
+if __name__ == "__main__":
+    unittest.main()
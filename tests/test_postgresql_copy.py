@@ -0,0 +1,101 @@
+import unittest
+from contextlib import contextmanager
+from types import SimpleNamespace
+from unittest import mock
+
+import numpy as np
+import pandas as pd
+
+from connections import postgresql
+class CopyCursor:
+    def __init__(self, conn):
+        self.conn = conn
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def execute(self, sql, params=None):
+        self.conn.statements.append(sql)
+        self.description = self.conn.description
+
+    @contextmanager
+    def copy(self, sql, params=None):
+        self.conn.statements.append(sql)
+        # Split the body so the readers have to join blocks
+        data = self.conn.body
+        yield [data[i:i + 7] for i in range(0, len(data), 7)]
+
+
+class CopyPool:
+    def __init__(self, description, body):
+        self.description = description
+        self.body = body
+        self.statements = []
+        self.info = SimpleNamespace(encoding="utf-8")
+
+    @contextmanager
+    def connection(self):
+        yield self
+
+    def cursor(self):
+        return CopyCursor(self)
+
+
+def column(name, type_code, precision=None, scale=None):
+    return SimpleNamespace(name=name, type_code=type_code, precision=precision, scale=scale)
+
+
+class CopyPgFrameTest(unittest.TestCase):
+    def copy(self, description, body):
+        pool = CopyPool(description, body)
+        with mock.patch.object(postgresql, "get_pg_pool", lambda target: pool):
+            return pool, postgresql.copy_pg_frame("SELECT * FROM t;")
+
+    def test_fixed_width_columns_use_csv_copy(self):
+        description = [column("units", 20), column("amount", 1700, 12, 2), column("at", 1184)]
+        body = b"3,1.25,2025-03-01 12:30:05.00025+00\n4,\\N,\\N\n"
+        pool, df = self.copy(description, body)
+        self.assertIn("FORMAT csv", pool.statements[1])
+        self.assertEqual(df["units"].dtype, np.int64)
+        self.assertEqual(df["units"].tolist(), [3, 4])
+        self.assertEqual(df["amount"].tolist()[0], 1.25)
+        self.assertTrue(np.isnan(df["amount"][1]))
+        self.assertEqual(df["at"][0], pd.Timestamp("2025-03-01 12:30:05.00025", tz="UTC"))
+        self.assertTrue(pd.isna(df["at"][1]))
+
+    def test_whole_numerics_load_as_int64(self):
+        # numeric(12,0) fits int8 and arrives as int64; numeric(30,0) does not and stays float64
+        description = [column("units", 1700, 12, 0), column("big", 1700, 30, 0)]
+        pool, df = self.copy(description, b"3,1\n4,2\n")
+        self.assertIn('q."units", q."big"::float8', pool.statements[1])
+        self.assertEqual(df["units"].dtype, np.int64)
+        self.assertEqual(df["big"].dtype, np.float64)
+
+    def test_text_columns_use_csv_copy(self):
+        description = [column("name", 25), column("qty", 23), column("amount", 1700, 12, 2),
+                       column("ok", 16), column("day", 1082)]
+        body = b'ACME,1,2.5,t,2025-03-01\n"B, Inc",\\N,\\N,f,\\N\n'
+        pool, df = self.copy(description, body)
+        self.assertIn("FORMAT csv", pool.statements[1])
+        self.assertIn('q."amount"::float8', pool.statements[1])
+        self.assertEqual(df["name"].tolist(), ["ACME", "B, Inc"])
+        self.assertEqual(df["qty"].dtype, np.float64)
+        self.assertTrue(np.isnan(df["qty"][1]))
+        self.assertEqual(df["amount"].dtype, np.float64)
+        self.assertEqual(df["ok"].tolist(), [True, False])
+        self.assertEqual(df["day"][0], pd.Timestamp("2025-03-01"))
+        self.assertTrue(pd.isna(df["day"][1]))
+
+    def test_load_pg_frames_picks_the_loader(self):
+        with mock.patch.object(postgresql, "copy_pg_frame", return_value="copy"), \
+                mock.patch.object(postgresql, "iter_pg_frames", return_value=iter(["a", "b"])):
+            self.assertEqual(list(postgresql.load_pg_frames("SELECT 1")), ["copy"])
+            with mock.patch.dict("os.environ", {"PG_BULK_LOADER": "cursor"}):
+                self.assertEqual(list(postgresql.load_pg_frames("SELECT 1")), ["a", "b"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,71 @@
+import unittest
+from types import SimpleNamespace
+from unittest import mock
+
+from connections import postgresql
+from connections.postgresql import NumericLoader
+
+
+class RecordingPool:
+    created = []
+    check_connection = staticmethod(lambda conn: None)
+
+    def __init__(self, **kwargs):
+        self.kwargs = kwargs
+        self.closed = False
+        RecordingPool.created.append(self)
+
+    def close(self):
+        self.closed = True
+
+    def get_stats(self):
+        return {"pool_size": self.kwargs["min_size"]}
+
+
+class PgPoolTest(unittest.TestCase):
+    def setUp(self):
+        RecordingPool.created = []
+        patcher = mock.patch.object(postgresql, "ConnectionPool", RecordingPool)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        pools = mock.patch.dict(postgresql._pools, clear=True)
+        pools.start()
+        self.addCleanup(pools.stop)
+
+    def test_one_pool_per_target(self):
+        env = {"PGHOST": "prod-db", "PGHOST_DEV": "dev-db", "PG_POOL_MIN_SIZE": "1", "PG_POOL_MAX_SIZE": "6"}
+        with mock.patch.dict("os.environ", env):
+            prod = postgresql.get_pg_pool("prod")
+            self.assertIs(postgresql.get_pg_pool("prod"), prod)
+            dev = postgresql.get_pg_pool("dev")
+        self.assertEqual(len(RecordingPool.created), 2)
+        self.assertEqual(prod.kwargs["kwargs"]["host"], "prod-db")
+        self.assertEqual(dev.kwargs["kwargs"]["host"], "dev-db")
+        self.assertEqual((prod.kwargs["min_size"], prod.kwargs["max_size"]), (1, 6))
+        self.assertIs(prod.kwargs["configure"], postgresql._configure_connection)
+        self.assertIs(prod.kwargs["check"], RecordingPool.check_connection)
+        self.assertEqual(postgresql.pg_pool_stats(), {"prod": {"pool_size": 1}, "dev": {"pool_size": 1}})
+
+    def test_max_size_is_at_least_min_size(self):
+        with mock.patch.dict("os.environ", {"PG_POOL_MIN_SIZE": "5", "PG_POOL_MAX_SIZE": "2"}):
+            pool = postgresql.get_pg_pool("dev")
+        self.assertEqual(pool.kwargs["max_size"], 5)
+
+    def test_close_pg_pools(self):
+        pool = postgresql.get_pg_pool("dev")
+        postgresql.close_pg_pools()
+        self.assertTrue(pool.closed)
+        self.assertIsNot(postgresql.get_pg_pool("dev"), pool)
+
+    def test_numeric_loader_is_opt_out(self):
+        conn = SimpleNamespace(adapters=mock.Mock())
+        with mock.patch.dict("os.environ", {"PG_NUMERIC": "decimal"}):
+            postgresql._configure_connection(conn)
+        conn.adapters.register_loader.assert_not_called()
+        with mock.patch.dict("os.environ", {"PG_NUMERIC": "float"}):
+            postgresql._configure_connection(conn)
+        conn.adapters.register_loader.assert_called_once_with("numeric", NumericLoader)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,86 @@
+import json
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from analitycs.operations import IMPORTS_COLUMNS, OTD_COLUMNS, build_imports_summary, on_time_delivery_summary
+from connections.postgresql_querys import (
+    get_customer_imports_data,
+    get_on_time_delivery,
+    get_scorecard_by_is_month,
+    get_vendors_customer_brand,
+)
+
+
+def select_list(sql: str) -> str:
+    return " ".join(sql.split()).split("SELECT ", 1)[1].split(" FROM ", 1)[0]
+
+
+class ColumnProjectionTest(unittest.TestCase):
+    def test_default_selects_every_column(self):
+        self.assertEqual(select_list(get_on_time_delivery("2025-01-01", "2025-01-31")), "*")
+        self.assertEqual(select_list(get_scorecard_by_is_month("ANA")), "*")
+        sql, params = get_vendors_customer_brand(["ACME"], "3M")
+        self.assertEqual(select_list(sql), "*")
+        self.assertEqual(params, [["ACME"], "3M"])
+
+    def test_columns_are_projected(self):
+        sql = get_on_time_delivery("2025-01-01", "2025-01-31", columns=OTD_COLUMNS)
+        self.assertEqual(select_list(sql), ", ".join(OTD_COLUMNS))
+        self.assertIn("BETWEEN DATE '2025-01-01' AND DATE '2025-01-31'", sql)
+        sql = get_on_time_delivery(None, None, "SO123", columns=["so_doc_number"])
+        self.assertEqual(select_list(sql), "so_doc_number")
+        self.assertIn("so_doc_number = 'SO123'", sql)
+
+    def test_imports_filter(self):
+        sql, params = get_customer_imports_data(["ACME SAC"], columns=IMPORTS_COLUMNS)
+        self.assertEqual(select_list(sql), ", ".join(IMPORTS_COLUMNS))
+        self.assertIn("importador = ANY(%s)", sql)
+        self.assertEqual(params, [["ACME SAC"]])
+        sql, params = get_customer_imports_data([], columns=IMPORTS_COLUMNS)
+        self.assertNotIn("WHERE", sql)
+        self.assertEqual(params, [])
+
+
+class ProjectedSummaryTest(unittest.TestCase):
+    """The summaries only read the projected columns, so a narrow SELECT gives the same output."""
+
+    def test_otd_summary(self):
+        rng = np.random.default_rng(3)
+        n = 200
+        df = pd.DataFrame({
+            "item_name_so": rng.choice([f"I{i}" for i in range(40)] + [""], n),
+            "if_create_date": [f"2025/{m:02d}/{d:02d}" for m, d in zip(rng.integers(1, 4, n), rng.integers(1, 28, n))],
+            "delivery_status": rng.choice(["On Time", "Late"], n),
+            "so_doc_number": rng.choice([f"SO{i}" for i in range(30)], n),
+            "po_doc_number": rng.choice([f"PO{i}" for i in range(30)], n),
+            "po_status": rng.choice(["Open", "Closed", None], n),
+            "vendor": rng.choice(["V1", "V2"], n),
+            "notes": "x",
+        })
+        full = on_time_delivery_summary(df.copy())
+        projected = on_time_delivery_summary(iter([df[OTD_COLUMNS]]))
+        self.assertEqual(json.dumps(projected, sort_keys=True, default=str), json.dumps(full, sort_keys=True, default=str))
+
+    def test_imports_summary(self):
+        rng = np.random.default_rng(4)
+        n = 200
+        df = pd.DataFrame({
+            "ano": rng.choice([2023, 2024, 2025], n),
+            "marca": rng.choice(["3M", "ABB", None], n),
+            "proveedor": rng.choice(["P1", "P2", "P3"], n),
+            "descripcion_arancelaria": rng.choice(["D1", "D2"], n),
+            "incoterm": rng.choice(["FOB", "CIF"], n),
+            "amount_us_fob": rng.random(n) * 1000,
+            "amount_us_cif": rng.random(n) * 1100,
+            "importador": "ACME SAC",
+            "pais_de_origen": rng.choice(["US", "CN"], n),
+        })
+        full = build_imports_summary(df.copy())
+        projected = build_imports_summary(iter([df[IMPORTS_COLUMNS]]))
+        self.assertEqual(json.dumps(projected, sort_keys=True, default=str), json.dumps(full, sort_keys=True, default=str))
+
+
+if __name__ == "__main__":
+    unittest.main()
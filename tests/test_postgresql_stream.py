@@ -0,0 +1,84 @@
+import unittest
+from contextlib import contextmanager
+from types import SimpleNamespace
+from unittest import mock
+
+import pandas as pd
+
+from connections import postgresql
+
+
+class NamedCursor:
+    def __init__(self, rows, name):
+        self.rows = rows
+        self.name = name
+        self.fetches = []
+        self.description = [SimpleNamespace(name="id"), SimpleNamespace(name="total")]
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def execute(self, sql, params=None):
+        self.params = params
+
+    def fetchmany(self, size):
+        self.fetches.append(size)
+        batch, self.rows = self.rows[:size], self.rows[size:]
+        return batch
+
+
+class StreamPool:
+    def __init__(self, rows):
+        self.rows = rows
+        self.cursors = []
+
+    @contextmanager
+    def connection(self):
+        yield self
+
+    def cursor(self, name=None):
+        cursor = NamedCursor(list(self.rows), name)
+        self.cursors.append(cursor)
+        return cursor
+
+
+class IterPgQueryTest(unittest.TestCase):
+    def stream(self, rows, **kwargs):
+        pool = StreamPool(rows)
+        with mock.patch.object(postgresql, "get_pg_pool", lambda target: pool):
+            batches = list(postgresql.iter_pg_query("SELECT id, total FROM t WHERE x = %s", [1], **kwargs))
+        return pool, batches
+
+    def test_batches_of_itersize_rows(self):
+        rows = [(i, float(i)) for i in range(7)]
+        pool, batches = self.stream(rows, itersize=3)
+        self.assertEqual([len(batch) for _, batch in batches], [3, 3, 1])
+        self.assertEqual([row for _, batch in batches for row in batch], rows)
+        self.assertEqual(batches[0][0], ["id", "total"])
+        # Named (server-side) cursor with the caller's parameters
+        cursor = pool.cursors[0]
+        self.assertTrue(cursor.name.startswith("mcp_"))
+        self.assertEqual(cursor.params, [1])
+
+    def test_empty_result_yields_the_columns(self):
+        _, batches = self.stream([], itersize=3)
+        self.assertEqual(batches, [(["id", "total"], [])])
+
+    def test_itersize_from_the_environment(self):
+        with mock.patch.dict("os.environ", {"PG_ITERSIZE": "2"}):
+            pool, batches = self.stream([(1, 1.0), (2, 2.0), (3, 3.0)])
+        self.assertEqual(pool.cursors[0].fetches[0], 2)
+        self.assertEqual(len(batches), 2)
+
+    def test_frames(self):
+        pool = StreamPool([(1, 1.5), (2, 2.5)])
+        with mock.patch.object(postgresql, "get_pg_pool", lambda target: pool):
+            frames = list(postgresql.iter_pg_frames("SELECT id, total FROM t", itersize=1))
+        pd.testing.assert_frame_equal(pd.concat(frames, ignore_index=True), pd.DataFrame({"id": [1, 2], "total": [1.5, 2.5]}))
+
+
+if __name__ == "__main__":
+    unittest.main()
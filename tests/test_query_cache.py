@@ -0,0 +1,82 @@
+import unittest
+from datetime import date, timedelta
+from unittest import mock
+
+import pandas as pd
+
+from connections.query_cache import QueryResultCache, normalize_query, ttl_for_day, ttl_for_query
+
+
+def frame(rows: int) -> pd.DataFrame:
+    return pd.DataFrame({"x": range(rows)})
+
+
+class QueryResultCacheTest(unittest.TestCase):
+    def test_hit_returns_a_copy(self):
+        cache = QueryResultCache(max_bytes=10_000)
+        cache.put("k", frame(3), ttl=60)
+        cached = cache.get("k")
+        cached["y"] = 1
+        self.assertEqual(list(cache.get("k").columns), ["x"])
+        self.assertIsNone(cache.get("other"))
+        stats = cache.stats()
+        self.assertEqual((stats["hits"], stats["misses"], stats["entries"]), (2, 1, 1))
+
+    def test_expired_entries_are_dropped(self):
+        cache = QueryResultCache(max_bytes=10_000)
+        with mock.patch("connections.query_cache.time.monotonic", return_value=100.0):
+            cache.put("k", frame(3), ttl=5)
+        with mock.patch("connections.query_cache.time.monotonic", return_value=105.0):
+            self.assertIsNone(cache.get("k"))
+        stats = cache.stats()
+        self.assertEqual((stats["expired"], stats["entries"], stats["bytes"]), (1, 0, 0))
+
+    def test_lru_eviction_under_the_byte_budget(self):
+        size = int(frame(10).memory_usage(index=True, deep=True).sum())
+        cache = QueryResultCache(max_bytes=2 * size)
+        cache.put("a", frame(10), ttl=60)
+        cache.put("b", frame(10), ttl=60)
+        cache.get("a")  # b is now the least recently used
+        cache.put("c", frame(10), ttl=60)
+        self.assertIsNotNone(cache.get("a"))
+        self.assertIsNone(cache.get("b"))
+        self.assertIsNotNone(cache.get("c"))
+        self.assertEqual(cache.stats()["evictions"], 1)
+        self.assertLessEqual(cache.stats()["bytes"], 2 * size)
+
+    def test_too_large_and_zero_ttl_are_not_stored(self):
+        cache = QueryResultCache(max_bytes=10)
+        self.assertFalse(cache.put("big", frame(100), ttl=60))
+        self.assertFalse(QueryResultCache(max_bytes=10_000).put("k", frame(1), ttl=0))
+        self.assertEqual(cache.stats()["too_large"], 1)
+
+    def test_replacing_a_key_keeps_the_byte_count(self):
+        cache = QueryResultCache(max_bytes=100_000)
+        cache.put("k", frame(100), ttl=60)
+        cache.put("k", frame(1), ttl=60)
+        self.assertEqual(cache.stats()["bytes"], int(frame(1).memory_usage(index=True, deep=True).sum()))
+
+
+class CacheKeyTest(unittest.TestCase):
+    def test_whitespace_does_not_change_the_key(self):
+        a = normalize_query("\n  SELECT a\n\n     FROM t  \n", ["2025-01-01"])
+        b = normalize_query("SELECT a\nFROM t", ("2025-01-01",))
+        self.assertEqual(a, b)
+        self.assertNotEqual(a, normalize_query("SELECT a\nFROM t", ["2025-01-02"]))
+
+    def test_ttl_tiers(self):
+        env = {"NETSUITE_CACHE_TTL_TODAY": "1", "NETSUITE_CACHE_TTL_OPEN_MONTH": "2", "NETSUITE_CACHE_TTL_CLOSED_MONTH": "3"}
+        today = date.today()
+        with mock.patch.dict("os.environ", env):
+            self.assertEqual(ttl_for_day(today), 1)
+            self.assertEqual(ttl_for_day(today.replace(day=1) - timedelta(days=1)), 3)
+            if today.day > 1:
+                self.assertEqual(ttl_for_day(today - timedelta(days=1)), 2)
+            # The most recent date, from the SQL text or the parameters, decides
+            self.assertEqual(ttl_for_query("SELECT 1 WHERE d >= '2020-01-01'", [today.isoformat()]), 1)
+            self.assertEqual(ttl_for_query("SELECT 1", ["2020-01-01", "2020-01-31"]), 3)
+            self.assertEqual(ttl_for_query("SELECT 1"), 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
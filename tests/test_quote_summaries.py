@@ -0,0 +1,153 @@
+import json
+import os
+import tempfile
+import threading
+import unittest
+from unittest import mock
+
+import numpy as np
+import pandas as pd
+from jaydebeapi import DatabaseError
+
+import tools.sales as sales_tools
+from analitycs.sales import summarize_is_quote_rollups, summarize_is_quotes
+from connections.netsuite_querys import QUOTE_ROLLUPS
+from utils import json_df
+
+
+def quotes_frame(n: int = 300, seed: int = 1) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        "CreateDate": [f"2025-{m:02d}-{d:02d}" for m, d in zip(rng.integers(1, 4, n), rng.integers(1, 28, n))],
+        "Status": rng.choice(["Open", "Closed", "Expired"], n),
+        "InsideSale": rng.choice(["ANA P", "JOHN D", "LUZ M"], n),
+        "QuoteNumber": [f"Q{i}" for i in range(n)],
+        "Customer": rng.choice([f"C{i}" for i in range(20)], n),
+        "Subsidiary": rng.choice(["IDICO USA", "IDICO Peru", None], n, p=[.5, .45, .05]),
+        "IncoTerms": rng.choice(["FOB Miami", "CIF Lima", None], n),
+        "Amount": np.where(rng.random(n) < .05, np.nan, (rng.random(n) * 40000).round(2)),
+        "GrossMargin": rng.random(n) * 1000,
+        "GrossMarginPct": np.where(rng.random(n) < .1, np.nan, rng.random(n) * .5),
+    })
+
+
+def suiteql_rollups(df: pd.DataFrame) -> pd.DataFrame:
+    """What get_quotes_rollups returns: one row per group of every grouping set."""
+    df = df.assign(period=df["CreateDate"].str[:7])
+    frames = []
+    for name, dims in QUOTE_ROLLUPS.items():
+        grouped = df.groupby(list(dims), dropna=False) if dims else df.groupby(lambda _: 0)
+        frame = grouped.agg(
+            total_amount=("Amount", "sum"),
+            num_quotes=("QuoteNumber", "nunique"),
+            num_customers=("Customer", "nunique"),
+            first_date=("CreateDate", "min"),
+            last_date=("CreateDate", "max"),
+        ).reset_index(drop=not dims)
+        frame["rollup_name"] = name
+        frames.append(frame)
+    # The driver hands back COUNT() as float
+    rollups = pd.concat(frames, ignore_index=True).sample(frac=1, random_state=0)
+    return rollups.astype({"num_quotes": float, "num_customers": float})
+
+
+class QuoteRollupSummaryTest(unittest.TestCase):
+    def test_matches_the_row_level_summary(self):
+        df = quotes_frame()
+        quotes = df[["InsideSale", "Status", "QuoteNumber", "Customer", "Amount", "GrossMargin", "GrossMarginPct"]]
+        expected = summarize_is_quotes(df.copy())
+        actual = summarize_is_quote_rollups(suiteql_rollups(df), quotes)
+        self.assertEqual(json.dumps(actual, sort_keys=True), json.dumps(expected, sort_keys=True))
+
+    def test_row_level_summary_matches_plain_pandas(self):
+        df = quotes_frame(50)
+        summary = summarize_is_quotes(df.copy())
+        totals = df.groupby("InsideSale")["Amount"].sum()
+        by_rank = sorted(totals.items(), key=lambda item: -item[1])
+        self.assertEqual([row["InsideSale"] for row in summary["kpi_by_inside"]], [name for name, _ in by_rank])
+        low = df[df["GrossMarginPct"] < 0.20]
+        self.assertEqual([row["quote_number"] for row in summary["quotes_under_20pct_margin"]], low["QuoteNumber"].tolist())
+        status = {entry["inside_sale"]: entry["status_summary"] for entry in summary["status_summary_by_inside"]}
+        for (inside, state), group in df.groupby(["InsideSale", "Status"]):
+            self.assertEqual(status[inside][state]["quote_list"], group["QuoteNumber"].tolist())
+
+    def test_rejected_rollup_query_falls_back_to_rows(self):
+        calls = []
+
+        def query_frame(sql, params):
+            calls.append(sql)
+            raise DatabaseError("Invalid search query")
+
+        with mock.patch.object(sales_tools, "query_frame", query_frame), \
+                mock.patch.object(sales_tools, "_rollups_supported", True):
+            args = ("2025-01-01", "2025-01-31", None, None)
+            self.assertIsNone(sales_tools._aggregate_quotes("quotes", args))
+            self.assertFalse(sales_tools._rollups_supported)
+            # Not retried once SuiteQL rejected it
+            self.assertIsNone(sales_tools._aggregate_quotes("quotes", args))
+        self.assertEqual(len(calls), 1)
+
+
+class DeferredDatasetTest(unittest.TestCase):
+    def setUp(self):
+        self.cwd = os.getcwd()
+        self.tmp = tempfile.TemporaryDirectory()
+        os.chdir(self.tmp.name)
+        os.mkdir("data")
+        # The Excel file is written before the JSON; only the JSON is under test
+        patcher = mock.patch.object(json_df, "save_df_to_excel")
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def tearDown(self):
+        os.chdir(self.cwd)
+        self.tmp.cleanup()
+
+    def test_materializes_in_place(self):
+        json_df.register_deferred_source("test_rows", lambda n: pd.DataFrame({"a": list(range(n))}))
+        reference = json_df.save_deferred_dataset("rows", "rows", "test_rows", [3])
+        self.assertTrue(json_df.materialize_deferred_dataset(reference["filename"]))
+        data = json_df.load_dataset_from_json(reference["filename"])
+        self.assertEqual(data["rows"], [[0], [1], [2]])
+        self.assertEqual(os.listdir("data"), [reference["filename"]])
+        self.assertFalse(json_df.materialize_deferred_dataset(reference["filename"]))
+
+    def test_failed_write_keeps_the_reference(self):
+        json_df.register_deferred_source("test_rows", lambda n: pd.DataFrame({"a": list(range(n))}))
+        reference = json_df.save_deferred_dataset("rows", "rows", "test_rows", [3])
+        with mock.patch.object(json_df.JsonDatasetWriter, "write_frame", side_effect=ValueError("boom")):
+            with self.assertRaises(ValueError):
+                json_df.materialize_deferred_dataset(reference["filename"])
+        data = json_df.load_dataset_from_json(reference["filename"])
+        self.assertEqual(data["deferred"], {"source": "test_rows", "args": [3]})
+        self.assertFalse(any(name.endswith(".partial") for name in os.listdir("data")))
+
+    def test_only_the_same_file_waits(self):
+        started, release, calls = threading.Event(), threading.Event(), []
+
+        def slow(n):
+            calls.append(n)
+            started.set()
+            release.wait(5)
+            return pd.DataFrame({"a": list(range(n))})
+
+        json_df.register_deferred_source("slow_rows", slow)
+        json_df.register_deferred_source("test_rows", lambda n: pd.DataFrame({"a": list(range(n))}))
+        slow_ref = json_df.save_deferred_dataset("slow", "slow", "slow_rows", [2])
+        other_ref = json_df.save_deferred_dataset("rows", "rows", "test_rows", [3])
+
+        same_file = [threading.Thread(target=json_df.materialize_deferred_dataset, args=(slow_ref["filename"],)) for _ in range(2)]
+        same_file[0].start()
+        self.assertTrue(started.wait(5))
+        same_file[1].start()
+        # Another file is not held up by the running materialization
+        self.assertTrue(json_df.materialize_deferred_dataset(other_ref["filename"]))
+        release.set()
+        for thread in same_file:
+            thread.join(5)
+        self.assertEqual(calls, [2])
+        self.assertEqual(json_df._materialize_locks, {})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,92 @@
+import unittest
+from datetime import date, datetime
+
+import pandas as pd
+
+from connections.range_cache import DayPartitionStore
+
+
+class RecordingLoader:
+    """Returns one row per day of the requested window, skipping the given days."""
+
+    def __init__(self, skip=(), as_datetime: bool = False):
+        self.calls = []
+        self.skip = set(skip)
+        self.as_datetime = as_datetime
+
+    def __call__(self, start: str, end: str) -> pd.DataFrame:
+        self.calls.append((start, end))
+        days = [d.strftime("%Y-%m-%d") for d in pd.date_range(start, end) if d.strftime("%Y-%m-%d") not in self.skip]
+        stamps = pd.to_datetime(days) if self.as_datetime else [f"{d} 10:00:00" for d in days]
+        return pd.DataFrame({"trandate": stamps, "amount": [float(i) for i in range(len(days))]})
+
+
+def collect(store, loader, start, end, filters=None):
+    return list(store.iter_partitions("sales", filters, start, end, "trandate", loader))
+
+
+class DayPartitionStoreTest(unittest.TestCase):
+    def test_cached_days_are_not_refetched(self):
+        store, loader = DayPartitionStore(max_bytes=10_000_000), RecordingLoader()
+        first = collect(store, loader, date(2025, 1, 1), date(2025, 1, 3))
+        self.assertEqual(len(first), 3)
+        second = collect(store, loader, date(2025, 1, 1), date(2025, 1, 3))
+        self.assertEqual(loader.calls, [("2025-01-01", "2025-01-03")])
+        pd.testing.assert_frame_equal(pd.concat(first), pd.concat(second))
+
+    def test_only_missing_gaps_are_fetched(self):
+        store, loader = DayPartitionStore(max_bytes=10_000_000), RecordingLoader()
+        collect(store, loader, date(2025, 1, 3), date(2025, 1, 4))
+        collect(store, loader, date(2025, 1, 7), date(2025, 1, 7))
+        parts = collect(store, loader, date(2025, 1, 1), date(2025, 1, 9))
+        self.assertEqual(loader.calls[2:], [
+            ("2025-01-01", "2025-01-02"),
+            ("2025-01-05", "2025-01-06"),
+            ("2025-01-08", "2025-01-09"),
+        ])
+        self.assertEqual([p["trandate"].iloc[0][:10] for p in parts], [f"2025-01-0{d}" for d in range(1, 10)])
+
+    def test_filters_key_separate_partitions(self):
+        store, loader = DayPartitionStore(max_bytes=10_000_000), RecordingLoader()
+        collect(store, loader, date(2025, 1, 1), date(2025, 1, 1), filters=("A",))
+        collect(store, loader, date(2025, 1, 1), date(2025, 1, 1), filters=("B",))
+        self.assertEqual(len(loader.calls), 2)
+
+    def test_empty_days_are_stored(self):
+        store = DayPartitionStore(max_bytes=10_000_000)
+        loader = RecordingLoader(skip={"2025-01-02"})
+        parts = collect(store, loader, date(2025, 1, 1), date(2025, 1, 3))
+        self.assertEqual(len(parts), 2)
+        collect(store, loader, date(2025, 1, 2), date(2025, 1, 2))
+        self.assertEqual(len(loader.calls), 1)
+
+    def test_empty_window_yields_one_empty_frame(self):
+        store = DayPartitionStore(max_bytes=10_000_000)
+        loader = RecordingLoader(skip={"2025-01-01", "2025-01-02"})
+        parts = collect(store, loader, date(2025, 1, 1), date(2025, 1, 2))
+        self.assertEqual(len(parts), 1)
+        self.assertEqual(list(parts[0].columns), ["trandate", "amount"])
+        self.assertEqual(len(parts[0]), 0)
+
+    def test_inverted_window_goes_to_the_loader(self):
+        store, loader = DayPartitionStore(max_bytes=10_000_000), RecordingLoader()
+        parts = collect(store, loader, date(2025, 1, 5), date(2025, 1, 1))
+        self.assertEqual(loader.calls, [("2025-01-05", "2025-01-01")])
+        self.assertEqual(len(parts), 1)
+
+    def test_datetime_date_column(self):
+        store = DayPartitionStore(max_bytes=10_000_000)
+        loader = RecordingLoader(as_datetime=True)
+        parts = collect(store, loader, date(2025, 1, 1), date(2025, 1, 2))
+        self.assertEqual([p["trandate"].iloc[0] for p in parts], [datetime(2025, 1, 1), datetime(2025, 1, 2)])
+
+    def test_yielded_frames_do_not_alter_the_store(self):
+        store, loader = DayPartitionStore(max_bytes=10_000_000), RecordingLoader()
+        part = collect(store, loader, date(2025, 1, 1), date(2025, 1, 1))[0]
+        part["amount"] = -1.0
+        again = collect(store, loader, date(2025, 1, 1), date(2025, 1, 1))[0]
+        self.assertEqual(again["amount"].tolist(), [0.0])
+
+
+if __name__ == "__main__":
+    unittest.main()
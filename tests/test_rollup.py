@@ -0,0 +1,130 @@
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from analitycs.rollup import Dimension, bin_labels, rollup
+from analitycs.sales import finance_summary
+
+
+def bookings_frame(n: int = 400, seed: int = 7) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    gross = np.where(rng.random(n) < .1, 0.0, (rng.random(n) * 5000).round(2))
+    margin = (gross * rng.uniform(-.05, .4, n)).round(2)
+    return pd.DataFrame({
+        "so_number": [f"SO{i % 150}" for i in range(n)],
+        "date": [f"2025-{m:02d}-{d:02d}" for m, d in zip(rng.integers(1, 4, n), rng.integers(1, 28, n))],
+        "customer": rng.choice([f"C{i}" for i in range(25)] + [None], n),
+        "customer_country": rng.choice(["US", "PE", "CL"], n),
+        "sales_rep": rng.choice(["ANA", "JOHN", "LUZ"], n),
+        "gross_usd": gross,
+        "net_usd": (gross * .95).round(2),
+        "terms": rng.choice(["Net 30", "Net 60", None], n),
+        "gross_margin": margin,
+        "gross_margin_pct": np.where(gross > 0, margin / np.where(gross > 0, gross, 1), np.nan),
+        "subsidiary": rng.choice(["IDICO USA", "IDICO Peru"], n),
+        "period": [f"2025-{m:02d}" for m in rng.integers(1, 4, n)],
+        "incoterms": rng.choice(["FOB", "CIF", None], n),
+    })
+
+
+class RollupTest(unittest.TestCase):
+    def test_matches_groupby(self):
+        df = bookings_frame()
+        result = rollup(df, {
+            "rep": Dimension(("sales_rep", "subsidiary"), {
+                "net": ("net_usd", "sum"),
+                "orders": ("so_number", "nunique"),
+                "rows": (None, "size"),
+            }),
+        })["rep"]
+        grouped = df.groupby(["sales_rep", "subsidiary"])
+        expected = grouped.agg(net=("net_usd", "sum"), orders=("so_number", "nunique"))
+        expected["rows"] = grouped.size()
+        pd.testing.assert_frame_equal(result, expected)
+
+    def test_series_keys_where_and_dropna(self):
+        df = bookings_frame()
+        terms = df["terms"].fillna("None")
+        result = rollup(df, {
+            "terms": Dimension((terms,), {"net": ("net_usd", "sum")}, where=df["gross_usd"] > 0),
+            "customer": Dimension(("customer",), {"rows": (None, "size")}, dropna=False),
+        })
+        positive = df[df["gross_usd"] > 0]
+        pd.testing.assert_series_equal(
+            result["terms"]["net"],
+            positive.groupby(terms[df["gross_usd"] > 0])["net_usd"].sum().rename("net"),
+        )
+        self.assertEqual(int(result["customer"]["rows"].sum()), len(df))
+        self.assertTrue(result["customer"].index.isna().any())
+
+    def test_missing_columns_are_skipped(self):
+        df = bookings_frame(20)
+        result = rollup(df, {"rep": Dimension(("sales_rep",), {"net": ("net_usd", "sum"), "x": ("missing", "sum")})})
+        self.assertEqual(list(result["rep"].columns), ["net"])
+
+    def test_bin_labels(self):
+        labels = bin_labels(pd.Series([-0.5, 0.05, 0.10, 0.15, 0.20, 0.9, np.nan]), [0.10, 0.20], ["low", "mid", "high"])
+        self.assertEqual(labels.tolist(), ["low", "low", "mid", "mid", "high", "high", "high"])
+
+
+class FinanceSummaryTest(unittest.TestCase):
+    """finance_summary against the plain pandas computations it replaced."""
+
+    def setUp(self):
+        self.df = bookings_frame()
+        self.summary = finance_summary(self.df.copy())["finance_summary"]
+
+    def test_bookings_and_terms(self):
+        df = self.df
+        bookings = self.summary["bookings"]
+        self.assertEqual(bookings["bookings_by_country"], df.groupby("customer_country")["net_usd"].sum().to_dict())
+        self.assertEqual(bookings["bookings_by_sales_rep"], df.groupby("sales_rep")["net_usd"].sum().to_dict())
+        self.assertEqual(
+            self.summary["terms"]["bookings_by_terms"],
+            df.assign(terms=df["terms"].fillna("None")).groupby("terms")["net_usd"].sum().to_dict(),
+        )
+        top = df.groupby("customer")["net_usd"].sum().sort_values(ascending=False).head(10)
+        self.assertEqual([row["client"] for row in self.summary["top_clients"]], top.index.tolist())
+
+    def test_margin_buckets(self):
+        df = self.df
+        cust = df[df["gross_usd"] > 0].groupby("customer").agg(
+            gross_usd_sum=("gross_usd", "sum"), gross_margin_sum=("gross_margin", "sum"))
+        pct = cust["gross_margin_sum"] / cust["gross_usd_sum"]
+        cust["margin_bucket"] = pct.apply(lambda p: "0-10%" if p < 0.10 else "10-20%" if p < 0.20 else "20%+")
+        expected = cust.groupby("margin_bucket").agg(
+            num_customers=("gross_usd_sum", "size"), gross_usd_sum=("gross_usd_sum", "sum")).reset_index()
+        self.assertEqual(self.summary["gross_margin"]["margin_buckets"], expected.to_dict(orient="records"))
+
+    def test_kpi_by_subsidiary(self):
+        df = self.df
+        rows = self.summary["kpi_by_subsidiary"]
+        groups = list(df.groupby(["period", "subsidiary"]))
+        self.assertEqual([(row["period"], row["subsidiary"]) for row in rows], [key for key, _ in groups])
+        for row, (_, group) in zip(rows, groups):
+            self.assertAlmostEqual(row["net_usd"], group["net_usd"].sum(), places=6)
+            self.assertAlmostEqual(row["gm_pct_prom"], group["gross_margin_pct"].mean(), places=9)
+            self.assertEqual(row["customers"], group["customer"].nunique())
+            self.assertEqual(row["transactions"], len(group))
+            self.assertAlmostEqual(row["gross_margin_pct_weighted"], group["gross_margin"].sum() / group["gross_usd"].sum(), places=9)
+
+    def test_incoterms_by_customer(self):
+        df = self.df.assign(incoterms=self.df["incoterms"].fillna("None"))
+        blocks = self.summary["incoterms"]["by_customer"]
+        self.assertEqual([block["customer"] for block in blocks], sorted(df["customer"].dropna().unique()))
+        for block in blocks:
+            group = df[df["customer"] == block["customer"]].groupby("incoterms")
+            self.assertEqual([d["incoterm"] for d in block["incoterms_detail"]], list(group.groups))
+            self.assertEqual([d["order_count"] for d in block["incoterms_detail"]], group["so_number"].nunique().tolist())
+            self.assertEqual(block["incoterms_count"], len(block["incoterms_detail"]))
+
+    def test_empty_frame(self):
+        summary = finance_summary(bookings_frame().iloc[0:0].copy())
+        self.assertEqual(summary["finance_summary"]["bookings"]["order_count"], 0)
+        self.assertEqual(summary["finance_summary"]["kpi_by_subsidiary"], [])
+        self.assertEqual(summary["data_sample"], [])
+
+
+if __name__ == "__main__":
+    unittest.main()
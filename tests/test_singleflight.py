@@ -0,0 +1,86 @@
+import unittest
+from concurrent.futures import Future
+
+from utils.date import get_month_start_and_today
+from utils.singleflight import SingleFlight, call_key, single_flight
+
+
+@single_flight(dates={"start_date": "month_start", "end_date": "today"}, upper=("customer",))
+def sales_report(start_date: str = None, end_date: str = None, customer: str = None, limit: int = 10):
+    return None
+
+
+class SingleFlightTest(unittest.TestCase):
+    def test_concurrent_calls_share_one_future(self):
+        flight, started = SingleFlight(), []
+
+        def start():
+            started.append(1)
+            return Future()
+
+        first = flight.submit("k", start)
+        second = flight.submit("k", start)
+        self.assertIs(first, second)
+        self.assertEqual(len(started), 1)
+        self.assertEqual(flight.stats(), {"in_flight": 1, "executed": 1, "coalesced": 1})
+
+        first.set_result(42)
+        self.assertEqual(second.result(), 42)
+        self.assertEqual(flight.stats()["in_flight"], 0)
+
+    def test_finished_key_runs_again(self):
+        flight = SingleFlight()
+        first = flight.submit("k", Future)
+        first.set_result(1)
+        second = flight.submit("k", Future)
+        self.assertIsNot(first, second)
+        self.assertEqual(flight.stats()["executed"], 2)
+
+    def test_exception_reaches_every_caller(self):
+        flight = SingleFlight()
+        first = flight.submit("k", Future)
+        second = flight.submit("k", Future)
+        first.set_exception(RuntimeError("boom"))
+        with self.assertRaises(RuntimeError):
+            second.result()
+        self.assertEqual(flight.stats()["in_flight"], 0)
+
+    def test_different_keys_do_not_coalesce(self):
+        flight = SingleFlight()
+        self.assertIsNot(flight.submit("a", Future), flight.submit("b", Future))
+        self.assertEqual(flight.stats()["coalesced"], 0)
+
+
+class CallKeyTest(unittest.TestCase):
+    def test_omitted_dates_match_the_explicit_defaults(self):
+        month_start, today = get_month_start_and_today()
+        self.assertEqual(
+            call_key(sales_report, (), {}),
+            call_key(sales_report, (month_start, today), {}),
+        )
+
+    def test_positional_and_keyword_arguments_match(self):
+        self.assertEqual(
+            call_key(sales_report, ("2025-01-01",), {"limit": 5}),
+            call_key(sales_report, (), {"start_date": "2025-01-01", "limit": 5}),
+        )
+
+    def test_upper_arguments_ignore_case(self):
+        self.assertEqual(
+            call_key(sales_report, (), {"customer": "acme"}),
+            call_key(sales_report, (), {"customer": "ACME"}),
+        )
+
+    def test_other_arguments_change_the_key(self):
+        self.assertNotEqual(call_key(sales_report, (), {"limit": 5}), call_key(sales_report, (), {"limit": 6}))
+        self.assertEqual(call_key(sales_report, (), {})[0], "sales_report")
+
+    def test_unhashable_arguments(self):
+        def tool(ids=None):
+            return None
+
+        self.assertEqual(call_key(tool, ([1, 2],), {}), call_key(tool, (), {"ids": [1, 2]}))
+
+
+if __name__ == "__main__":
+    unittest.main()
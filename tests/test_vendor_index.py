@@ -0,0 +1,82 @@
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from connections.vendor_index import VendorIndex
+
+
+def tables():
+    cus_brand = pd.DataFrame({
+        "customer_name": ["ACME", "ACME", "ACME", "ACME", "ACME", "GLOBEX"],
+        "country": ["PERU"] * 5 + ["CHILE"],
+        "brand": ["SIEMENS", "SIEMENS", "SIEMENS AG", "SIEMENS", "ABB", "SIEMENS"],
+        "vendor": ["v1", "v2", "v3", "v4", "v5", "v6"],
+        "year": [2025, 2025, 2025, 2024, 2025, 2025],
+        "probabilidad": [0.5, 0.5, 0.5, 0.9, 0.7, 0.2],
+        "count_so": [1, 3, 7, 2, 1, 1],
+    })
+    country_brand = pd.DataFrame({
+        "country": ["PERU", "PERU", "CHILE"],
+        "brand": ["SIEMENS", "SIEMENS", "SIEMENS"],
+        "vendor": ["c1", "c2", "c3"],
+        "year": [2023, 2025, 2025],
+        "probabilidad": [np.nan, 0.4, 0.3],
+        "count_so": [5, 2, 1],
+    })
+    return cus_brand, country_brand
+
+
+class VendorIndexTest(unittest.TestCase):
+    def setUp(self):
+        self.index = VendorIndex("test", tables, ttl=3600)
+
+    def test_merged_keys_sort_by_probability_then_count(self):
+        rows = self.index.customer_brand(["ACME"], "SIEMENS")
+        # SIEMENS and SIEMENS AG tie on probabilidad: count_so breaks the tie
+        self.assertEqual([row["vendor"] for row in rows[2025]], ["v3", "v2", "v1"])
+        self.assertEqual([row["vendor"] for row in rows[2024]], ["v4"])
+
+    def test_matches_the_sql_it_replaces(self):
+        cus_brand, _ = tables()
+        expected = cus_brand[
+            cus_brand["customer_name"].isin(["ACME"]) & cus_brand["brand"].str.contains("SIEMENS")
+            & (cus_brand["probabilidad"] > 0) & (cus_brand["year"] == 2025)
+        ].sort_values(["probabilidad", "count_so"], ascending=False)
+        rows = self.index.customer_brand(["ACME"], "SIEMENS")[2025]
+        self.assertEqual(rows, expected.to_dict(orient="records"))
+
+    def test_rows_are_copies(self):
+        for rows in (self.index.customer_brand(["ACME"], "ABB"), self.index.customer_brand(["ACME"], "SIEMENS")):
+            for year_rows in rows.values():
+                year_rows[0]["vendor"] = "changed"
+                year_rows.clear()
+        self.assertEqual(self.index.customer_brand(["ACME"], "ABB")[2025][0]["vendor"], "v5")
+        self.assertEqual(len(self.index.customer_brand(["ACME"], "SIEMENS")[2025]), 3)
+
+    def test_country_lookup_and_null_probabilities_last(self):
+        country = self.index.country_of(["GLOBEX", "ACME"])
+        self.assertEqual(country, "PERU")
+        rows = self.index.country_brand("PER", "SIEM")
+        self.assertEqual(sorted(rows), [2023, 2025])
+        self.assertEqual(self.index.country_brand("", "SIEMENS")[2025][0]["vendor"], "c2")
+
+    def test_years_are_fixed(self):
+        def newer():
+            cus_brand, country_brand = tables()
+            cus_brand.loc[0, "year"] = 2026
+            return cus_brand, country_brand
+
+        index = VendorIndex("newer", newer, ttl=3600)
+        self.assertIn(2026, index.customer_brand(["ACME"], "SIEMENS"))
+        # A newer year in the tables does not move the current / old blocks
+        self.assertEqual(index.years(), (2025, 2024))
+
+    def test_stats(self):
+        self.index.customer_brand(["ACME"], "SIEMENS")
+        stats = self.index.stats()
+        self.assertEqual(stats["loads"], 1)
+        self.assertGreaterEqual(stats["lookups"], 1)
+
+if __name__ == "__main__":
+    unittest.main()
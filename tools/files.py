@@ -1,10 +1,13 @@
 from typing import Any, Dict, List
-from utils.json_df import load_dataset_from_json
+from utils.json_df import load_dataset_from_json, materialize_deferred_dataset, deferred_dataset_for_excel
 from pathlib import Path
 from fastmcp.utilities.types import File
+from connections.executors import uses_backend
 
 DATA_DIR = Path("data").resolve()
 
+# Both may run the deferred NetSuite query of an aggregate get_quotes call
+@uses_backend("netsuite")
 def get_dataset(data_set_reference: str) -> Dict[str, Any]:
     """Retrieve a dataset previously saved from an user query.
 
@@ -14,10 +17,12 @@ def get_dataset(data_set_reference: str) -> Dict[str, Any]:
         Dict[str, Any]: The dataset loaded from JSON.
     """
     
-
+    # Datasets from aggregate tool calls are only queried now that someone asks for them
+    materialize_deferred_dataset(data_set_reference)
     dataset = load_dataset_from_json(data_set_reference)
     return dataset
 
+@uses_backend("netsuite")
 def get_excel_file(file_name: str) -> File:
     """
     Retrieve an Excel file previously saved from an user query.
@@ -39,6 +44,11 @@ def get_excel_file(file_name: str) -> File:
     if not path.is_relative_to(DATA_DIR):
         raise ValueError("Nombre de archivo inválido")
 
+    if not path.exists():
+        deferred = deferred_dataset_for_excel(safe_name)
+        if deferred:
+            materialize_deferred_dataset(deferred)
+
     if not path.exists():
         raise FileNotFoundError(f"No existe: {safe_name}")
 
@@ -0,0 +1,32 @@
+from typing import Any, Dict, List
+from connections.executors import executor_stats, single_flight_stats
+from connections.netsuite import get_netsuite_pool, get_result_cache, get_partition_store, get_dimension_cache, get_customer_index, get_employee_index
+from connections.postgresql import get_import_customer_index, get_hr_customer_index, get_vendor_index, pg_pool_stats
+
+
+def get_server_stats() -> Dict[str, Any]:
+    """Retrieve runtime statistics of the MCP server backends.
+
+    Use this tool when user asks for server health, load or queue status.
+
+    Returns:
+        Dict[str, Any]: Queue depth and counters per backend executor, coalesced duplicate calls, NetSuite and Postgres pool usage, hit/miss counters of the result cache and day partition store, the size of the dimension name cache and name filter indexes, and the vendor index age and size.
+    """
+    return {
+        "executors": executor_stats(),
+        "single_flight": single_flight_stats(),
+        "netsuite_pool": get_netsuite_pool().stats(),
+        "postgres_pools": pg_pool_stats(),
+        "netsuite_cache": get_result_cache().stats(),
+        "netsuite_partitions": get_partition_store().stats(),
+        "netsuite_dimensions": get_dimension_cache().stats(),
+        "name_indexes": {
+            index.name: index.stats()
+            for index in (get_customer_index(), get_employee_index(), get_import_customer_index(), get_hr_customer_index())
+        },
+        "vendor_index": get_vendor_index().stats(),
+    }
+
+MONITORING_TOOLS: List = [
+    get_server_stats
+]
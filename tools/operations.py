@@ -1,11 +1,16 @@
 from typing import Any, Dict, Optional, List
-from connections.postgresql import execute_pg_query, execute_pg_query_dev
+from connections.postgresql import execute_pg_query, load_pg_frames, get_import_customer_index
+from connections.name_index import resolve_filter
 from connections.postgresql_querys import get_helga_guides_query, get_on_time_delivery, get_customer_imports_data
-from utils.json_df import save_result_to_json
+from utils.json_df import save_result_to_json, JsonDatasetWriter
 from utils.date import get_month_start_and_today
-from analitycs.operations import on_time_delivery_summary, build_imports_summary
-from analitycs.data_transformations import tuple_to_dataframe
+from analitycs.operations import on_time_delivery_summary, build_imports_summary, OTD_COLUMNS, IMPORTS_COLUMNS
+from analitycs.data_transformations import tuple_to_dataframe, iter_frames, concat_frames
+from connections.executors import uses_backend
+from utils.singleflight import single_flight
 
+@uses_backend("postgres")
+@single_flight()
 def get_helga_guides(po: Optional[str] = None, status: Optional[str] = None, service: Optional[str] = None) -> Dict[str, Any]:
     """Retrieve helga guides based on po, status and service filters.
     
@@ -32,7 +37,9 @@ def get_helga_guides(po: Optional[str] = None, status: Optional[str] = None, ser
         "full_data_reference": dataset_reference
     }
     
-def get_otd_indicators(initial_date: Optional[str] = None, final_date: Optional[str] = None, so_number: Optional[str] = None) -> Dict[str, Any]:
+@uses_backend("postgres_dev")
+@single_flight(dates={"initial_date": "month_start", "final_date": "today"})
+def get_otd_indicators(initial_date: Optional[str] = None, final_date: Optional[str] = None, so_number: Optional[str] = None, full_dataset: bool = False) -> Dict[str, Any]:
     """Retrieve the on time delivery indicators by period.
     
     Use this tool when user asks for on time delivery indicators by period or sales order number.
@@ -41,6 +48,7 @@ def get_otd_indicators(initial_date: Optional[str] = None, final_date: Optional[
         initial_date (str): Initial date in format 'YYYY-MM-DD'.
         final_date (str): Final date in format 'YYYY-MM-DD'.
         so_number (str, optional): Sales order number to filter. Defaults to None.
+        full_dataset (bool, optional): Export every OTD column to the dataset instead of only the indicator columns. Defaults to False.
     Returns:
         Dict[str, Any]: On time delivery indicators.
     """
@@ -48,22 +56,29 @@ def get_otd_indicators(initial_date: Optional[str] = None, final_date: Optional[
     start_q_date = initial_date or start_of_month
     final_q_date = final_date or today_date
     
-    sql = get_on_time_delivery(start_q_date, final_q_date, so_number)
-    columns, rows = execute_pg_query_dev(sql)
+    # Only the indicator columns travel unless the full rows are needed (so_details or a full export)
+    columns = None if so_number or full_dataset else OTD_COLUMNS
+    sql = get_on_time_delivery(start_q_date, final_q_date, so_number, columns=columns)
+    
+    # Columnar COPY load (or cursor batches, see PG_BULK_LOADER) into the JSON dataset and the summary
+    with JsonDatasetWriter("The full items delivery by period", name="otd_data") as dataset:
+        frames = iter_frames(load_pg_frames(sql, target="dev"), on_frame=dataset.write_frame)
+        if so_number:
+            # A single sales order is small: keep its rows for so_details
+            df = concat_frames(frames)
+            results = on_time_delivery_summary(df)
+            results["so_details"] = df.to_dict(orient="records")
+        else:
+            results = on_time_delivery_summary(frames)
+    dataset_reference = dataset.preview
     
-    dataset_reference = save_result_to_json(columns, rows, "The full items delivery by period", name="otd_data")
-    
-    df = tuple_to_dataframe(columns, rows)
-    
-    results = on_time_delivery_summary(df)
     results["full_data_reference"] = dataset_reference
-    if so_number:
-        so_details = df.to_dict(orient="records")
-        results["so_details"] = so_details
     
     return results
 
     
+@uses_backend("postgres_dev")
+@single_flight()
 def get_customer_imports(customer_name: str) -> Dict[str, Any]:
     """Retrieve the imports summary for a given customer.
     
@@ -74,12 +89,13 @@ def get_customer_imports(customer_name: str) -> Dict[str, Any]:
     Returns:
         Dict[str, Any]: Imports summary.
     """
-    sql = get_customer_imports_data(customer_name)
-    columns, rows = execute_pg_query_dev(sql)
-    
-    df = tuple_to_dataframe(columns, rows)
+    importers, reply = resolve_filter(get_import_customer_index(), customer_name, "importer")
+    if reply:
+        return reply
+    sql, params = get_customer_imports_data(importers, columns=IMPORTS_COLUMNS)
     
-    summary = build_imports_summary(df)
+    # Big importers span hundreds of thousands of rows: load them columnar via COPY
+    summary = build_imports_summary(load_pg_frames(sql, params, target="dev"))
     
     return summary
 
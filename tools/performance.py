@@ -3,11 +3,15 @@ from analitycs.performance import analyze_inside_sales
 from connections.netsuite_querys import get_op_so_data
 from connections.postgresql_querys import get_scorecard_by_is_daily, get_scorecard_by_is_month, get_scorecard_by_is_year
 from utils.date import get_month_start_and_today
-from utils.json_df import save_result_to_json
-from connections.netsuite import NetSuiteConnection
+from utils.json_df import save_df_to_json
+from connections.netsuite import fetch_partitioned
 from analitycs.data_transformations import tuple_to_dataframe
-from connections.postgresql import execute_pg_query_dev
+from connections.postgresql import execute_pg_batch
+from connections.executors import uses_backend
+from utils.singleflight import single_flight
 
+@uses_backend("netsuite")
+@single_flight(dates={"initial_date": "today", "final_date": "today"})
 def get_inside_sales_performance_report(initial_date: Optional[str] = None, final_date: Optional[str] = None) -> Dict[str, Any]:
     """Analyze Inside Sales performance for the selected period (Response time, hitrate).
     If no dates are provided, defaults to today's date.
@@ -26,20 +30,18 @@ def get_inside_sales_performance_report(initial_date: Optional[str] = None, fina
     final_q_date = final_date or today_date
 
     
-    sql = get_op_so_data(start_q_date, final_q_date)
-    print("sql", sql)
-    conn = NetSuiteConnection()
-    with conn.managed() as ns:
-        columns, rows = ns.execute_query(sql)
+    # Long ranges run as concurrent monthly queries over pooled connections
+    df = fetch_partitioned(get_op_so_data, start_q_date, final_q_date)
     
-    dataset_reference = save_result_to_json(columns, rows, f"Inside Sales Performance dataset between {initial_date} and {final_date}", name="op_to_so")
+    dataset_reference = save_df_to_json(df, f"Inside Sales Performance dataset between {initial_date} and {final_date}", name="op_to_so")
 
-    df = tuple_to_dataframe(columns, rows)
     results = analyze_inside_sales(df)
     results["full_data_reference"] = dataset_reference
 
     return results
 
+@uses_backend("postgres_dev")
+@single_flight()
 def get_scorecard_by_is(inside_sales: Optional[str] = None) -> Dict[str, Any]:
     """Retrieve the scorecard metrics by Inside Sales Daily, Monthly and Yearly.
     
@@ -50,20 +52,15 @@ def get_scorecard_by_is(inside_sales: Optional[str] = None) -> Dict[str, Any]:
     Returns:
         Dict[str, Any]: Scorecard by IS.
     """
-    sql_monthly = get_scorecard_by_is_month(inside_sales=inside_sales)
-    columns_monthly, rows_monthly = execute_pg_query_dev(sql_monthly)
-    df_monthly = tuple_to_dataframe(columns_monthly, rows_monthly)
-    monthly_data = df_monthly.to_dict(orient="records")
-    
-    sql_daily = get_scorecard_by_is_daily(inside_sales=inside_sales)
-    columns_daily, rows_daily = execute_pg_query_dev(sql_daily)
-    df_daily = tuple_to_dataframe(columns_daily, rows_daily)
-    daily_data = df_daily.to_dict(orient="records")
-    
-    sql_yearly = get_scorecard_by_is_year(inside_sales=inside_sales)
-    columns_yearly, rows_yearly = execute_pg_query_dev(sql_yearly)
-    df_yearly = tuple_to_dataframe(columns_yearly, rows_yearly)
-    yearly_data = df_yearly.to_dict(orient="records")
+    # The three scorecards are independent: one pipelined round trip on a pooled connection
+    results = execute_pg_batch({
+        "monthly": (get_scorecard_by_is_month(inside_sales=inside_sales), None),
+        "daily": (get_scorecard_by_is_daily(inside_sales=inside_sales), None),
+        "yearly": (get_scorecard_by_is_year(inside_sales=inside_sales), None),
+    })
+    monthly_data = tuple_to_dataframe(*results["monthly"]).to_dict(orient="records")
+    daily_data = tuple_to_dataframe(*results["daily"]).to_dict(orient="records")
+    yearly_data = tuple_to_dataframe(*results["yearly"]).to_dict(orient="records")
     
     return {
         "monthly_scorecard": monthly_data,
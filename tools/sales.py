@@ -1,15 +1,71 @@
+import threading
 from typing import Dict, List, Optional, Any
+from jaydebeapi import DatabaseError
 from utils.date import get_month_start_and_today
-from utils.json_df import save_result_to_json, save_df_to_excel
-from connections.netsuite import NetSuiteConnection
-from connections.netsuite_querys import get_quotes_by_inside, get_bookings_data, get_items_quoted_by_customer, get_opportunities_data, get_sold_items_by_period
-from analitycs.data_transformations import tuple_to_dataframe
-from analitycs.sales import finance_summary, opportunity_summary, summarize_sold_items, summarize_is_quotes, summarize_items_quoted, analize_hr_desviado
-from connections.postgresql_querys import get_vendors_customer_brand, get_customer_country, get_vendors_country_brand
-from connections.postgresql import execute_pg_query_dev
+from utils.json_df import save_df_to_json, save_df_to_excel, save_deferred_dataset, register_deferred_source, JsonDatasetWriter
+from connections.netsuite import query_frame, query_date_range, iter_date_range, get_customer_index, get_employee_index
+from connections.name_index import resolve_filter
+from connections.netsuite_querys import BOOKINGS_SUBSIDIARIES, get_quotes_by_inside, get_quotes_rollups, get_quotes_status_lists, get_bookings_data, get_items_quoted_by_customer, get_opportunities_data, get_sold_items_by_period
+from analitycs.data_transformations import concat_frames
+from analitycs.sales import finance_summary, opportunity_summary, summarize_sold_items, summarize_is_quotes, summarize_is_quote_rollups, summarize_items_quoted, build_hr_desviado
+from connections.postgresql import get_hr_customer_index, get_vendor_index
+from connections.executors import uses_backend
+from utils.singleflight import single_flight
+
+
+def _resolve_filters(customer_name: Optional[str], inside_sales: Optional[str]):
+    """Resolve customer / Inside Sales text to entity / employee ids.
+
+    Returns (customer_ids, employee_ids, reply); reply is set when a filter
+    matches nothing or is too ambiguous, and the tool returns it as is.
+    """
+    employee_ids, reply = resolve_filter(get_employee_index(), inside_sales, "Inside Sales")
+    if reply:
+        return None, None, reply
+    customer_ids, reply = resolve_filter(get_customer_index(), customer_name, "customer")
+    return customer_ids, employee_ids, reply
+
+
+def _load_quotes(initial_date: str, final_date: str, employee_ids, customer_ids):
+    # ids come back as JSON lists when a deferred dataset is materialized
+    employee_ids = tuple(employee_ids) if employee_ids else None
+    customer_ids = tuple(customer_ids) if customer_ids else None
+    return query_date_range(get_quotes_by_inside, initial_date, final_date, employee_ids, customer_ids, date_column="CreateDate")
+
+# Row-level quotes dataset of get_quotes(aggregate=True), built when requested
+register_deferred_source("quotes_by_inside", _load_quotes)
+
+# Cleared the first time SuiteQL rejects the GROUPING SETS rollup query, so
+# later aggregate calls go straight to the row-level path
+_rollups_supported = True
+_rollups_lock = threading.Lock()
+
+
+def _aggregate_quotes(description: str, args: tuple) -> Optional[Dict[str, Any]]:
+    """Quote summary from the SuiteQL rollups, or None if SuiteQL rejects the query."""
+    global _rollups_supported
+    with _rollups_lock:
+        if not _rollups_supported:
+            return None
+    try:
+        rollups = query_frame(*get_quotes_rollups(*args))
+    except DatabaseError as e:
+        # Tools run on executor threads
+        with _rollups_lock:
+            _rollups_supported = False
+        print(f"[QUOTES] Rollup query rejected, using the row-level path: {e}")
+        return None
+    quotes = query_frame(*get_quotes_status_lists(*args))
+    dataset_reference = save_deferred_dataset(description, "get_quotes", "quotes_by_inside", list(args))
+    results = summarize_is_quote_rollups(rollups, quotes)
+    results["full_data_reference"] = dataset_reference
+    results["excel_file"] = dataset_reference["excel_file"]
+    return results
 
 
-def get_quotes(initial_date: Optional[str] = None, final_date: Optional[str] = None, inside_sales: Optional[str] = None, customer_name: Optional[str] = "") -> Dict[str, Any]:
+@uses_backend("netsuite")
+@single_flight(dates={"initial_date": "today", "final_date": "today"}, upper=("inside_sales", "customer_name"))
+def get_quotes(initial_date: Optional[str] = None, final_date: Optional[str] = None, inside_sales: Optional[str] = None, customer_name: Optional[str] = "", aggregate: Optional[bool] = False) -> Dict[str, Any]:
     """Retrieve summarized KPIs for quotes for the provided period.
     
     Use this tool when user asks for quotes, quotes by customer or quotes by Inside Sales.
@@ -19,6 +75,7 @@ def get_quotes(initial_date: Optional[str] = None, final_date: Optional[str] = N
         final_date: End date; defaults to today.
         inside_sales: Inside Sales rep to filter; optional.
         customer_name: Customer name to filter; optional.
+        aggregate: When true NetSuite computes the rollups and the quote-level dataset/Excel file are only built when requested via get_dataset/get_excel_file (full_data_reference then has no data_preview); false (default) fetches every quote upfront.
 
     Returns:
         Dict[str, Any]: KPIs per Inside Sales, status mix, win rate, incoterms, totals, period/timeline summaries plus dataset reference.
@@ -30,17 +87,19 @@ def get_quotes(initial_date: Optional[str] = None, final_date: Optional[str] = N
     
     inside_sales = "" if not inside_sales else inside_sales.upper()
     customer_name = customer_name.upper() if customer_name else ""
+    customer_ids, employee_ids, reply = _resolve_filters(customer_name, inside_sales)
+    if reply:
+        return reply
 
-    sql = get_quotes_by_inside(f"{start_q_date}", f"{final_q_date}", inside_sales, customer_name)
-    print("sql", sql)
-    # Use the connection as a context manager for safe cleanup
-    conn = NetSuiteConnection()
-    with conn.managed() as ns:
-        columns, rows = ns.execute_query(sql)
+    description = f"Quotes by Inside Sales dataset between {initial_date} and {final_date}"
+    if aggregate:
+        results = _aggregate_quotes(description, (start_q_date, final_q_date, employee_ids, customer_ids))
+        if results is not None:
+            return results
 
-    dataset_reference = save_result_to_json(columns, rows, f"Quotes by Inside Sales dataset between {initial_date} and {final_date}", name="get_quotes")
+    df = _load_quotes(start_q_date, final_q_date, employee_ids, customer_ids)
 
-    df = tuple_to_dataframe(columns, rows)
+    dataset_reference = save_df_to_json(df, description, name="get_quotes")
     excel_file = save_df_to_excel(df, name="get_quotes")
     results = summarize_is_quotes(df)
     results["full_data_reference"] = dataset_reference
@@ -49,6 +108,8 @@ def get_quotes(initial_date: Optional[str] = None, final_date: Optional[str] = N
     return results
 
 
+@uses_backend("netsuite")
+@single_flight(dates={"initial_date": "month_start", "final_date": "today"}, upper=("customer_name", "inside_sales"))
 def get_bookings(initial_date: Optional[str] = None, final_date: Optional[str] = None, customer_name: Optional[str] = "", inside_sales: Optional[str] = "") -> Dict[str, Any]:
     """Retrieve summarized KPIs for bookings for the provided period, inside sales or customer.
     
@@ -71,21 +132,20 @@ def get_bookings(initial_date: Optional[str] = None, final_date: Optional[str] =
         customer_name = customer_name.upper()
     if inside_sales:
         inside_sales = inside_sales.upper()
+    customer_ids, employee_ids, reply = _resolve_filters(customer_name, inside_sales)
+    if reply:
+        return reply
 
-    sql = get_bookings_data(start_q_date, final_q_date, customer_name, inside_sales)
-    print("sql", sql)
-    conn = NetSuiteConnection()
-    with conn.managed() as ns:
-        columns, rows = ns.execute_query(sql)
+    df = query_date_range(get_bookings_data, start_q_date, final_q_date, customer_ids, employee_ids, date_column="date", subsidiaries=BOOKINGS_SUBSIDIARIES)
     
-    dataset_reference = save_result_to_json(columns, rows, f"Bookings dataset between {initial_date} and {final_date}", name="bookings_data")
-
-    df = tuple_to_dataframe(columns, rows)
+    dataset_reference = save_df_to_json(df, f"Bookings dataset between {initial_date} and {final_date}", name="bookings_data")
     summary = finance_summary(df)
     summary["full_data_reference"] = dataset_reference
 
     return summary
 
+@uses_backend("netsuite")
+@single_flight(dates={"initial_date": "month_start", "final_date": "today"}, upper=("customer_name", "inside_sales"))
 def get_quoted_items(initial_date: Optional[str] = None, final_date: Optional[str] = None, customer_name: Optional[str] = "", inside_sales: Optional[str] = "") -> Dict[str, Any]:
     """Retrieve summarized KPIs for quoted items for the provided period.
     
@@ -110,19 +170,22 @@ def get_quoted_items(initial_date: Optional[str] = None, final_date: Optional[st
         
     if inside_sales:
         inside_sales = inside_sales.upper()
-    sql = get_items_quoted_by_customer(start_q_date, final_q_date, customer_name, inside_sales)
-    print("sql", sql)
-    conn = NetSuiteConnection()
-    with conn.managed() as ns:
-        columns, rows = ns.execute_query(sql)
-
-    dataset_reference = save_result_to_json(columns, rows, f"List of quoted items dataset between {initial_date} and {final_date}", name="quoted_items")
-    df = tuple_to_dataframe(columns, rows)
+    customer_ids, employee_ids, reply = _resolve_filters(customer_name, inside_sales)
+    if reply:
+        return reply
+    # Day partitions go to the JSON dataset and into one DataFrame for the summary; only uncached days hit NetSuite
+    with JsonDatasetWriter(f"List of quoted items dataset between {initial_date} and {final_date}", name="quoted_items") as dataset:
+        frames = iter_date_range(get_items_quoted_by_customer, start_q_date, final_q_date, customer_ids, employee_ids, date_column="date")
+        df = concat_frames(frames, on_frame=dataset.write_frame)
+
+    dataset_reference = dataset.preview
     results = summarize_items_quoted(df)
     results["full_data_reference"] = dataset_reference
 
     return results
 
+@uses_backend("netsuite")
+@single_flight(dates={"initial_date": "month_start", "final_date": "today"}, upper=("customer_name", "inside_sales"))
 def get_sold_items(initial_date: Optional[str] = None, final_date: Optional[str] = None, customer_name: Optional[str] = "", inside_sales: Optional[str] = "") -> Dict[str, Any]:
     """Retrieve summarized KPIs for sold items for the provided period.
     
@@ -145,20 +208,22 @@ def get_sold_items(initial_date: Optional[str] = None, final_date: Optional[str]
         customer_name = customer_name.upper()
     if inside_sales:
         inside_sales = inside_sales.upper()
+    customer_ids, employee_ids, reply = _resolve_filters(customer_name, inside_sales)
+    if reply:
+        return reply
 
-    sql = get_sold_items_by_period(start_q_date, final_q_date, customer_name, inside_sales)
-    print("sql", sql)
-    conn = NetSuiteConnection()
-    with conn.managed() as ns:
-        columns, rows = ns.execute_query(sql)
+    with JsonDatasetWriter(f"Sold items dataset between {initial_date} and {final_date}", name="sold_items_by_period") as dataset:
+        frames = iter_date_range(get_sold_items_by_period, start_q_date, final_q_date, customer_ids, employee_ids, date_column="date")
+        df = concat_frames(frames, on_frame=dataset.write_frame)
 
-    dataset_reference = save_result_to_json(columns, rows, f"Sold items dataset between {initial_date} and {final_date}", name="sold_items_by_period")
-    df = tuple_to_dataframe(columns, rows)
+    dataset_reference = dataset.preview
     summary = summarize_sold_items(df)
     summary["full_data_reference"] = dataset_reference
 
     return summary
 
+@uses_backend("netsuite")
+@single_flight(dates={"initial_date": "today", "final_date": "today"}, upper=("inside_sales",))
 def get_opportunities(initial_date: Optional[str] = None, final_date: Optional[str] = None, inside_sales: Optional[str] = "") -> Dict[str, Any]:
     """Retrieve summarized KPIs for opportunities for the provided period and Inside Sales.
     
@@ -179,21 +244,20 @@ def get_opportunities(initial_date: Optional[str] = None, final_date: Optional[s
     final_q_date = final_date or today_date
 
     inside_sales = "" if not inside_sales else inside_sales.upper()
+    employee_ids, reply = resolve_filter(get_employee_index(), inside_sales, "Inside Sales")
+    if reply:
+        return reply
     
-    sql = get_opportunities_data(start_q_date, final_q_date, inside_sales)
-    print("sql", sql)
-    conn = NetSuiteConnection()
-    with conn.managed() as ns:
-        columns, rows = ns.execute_query(sql)
+    df = query_date_range(get_opportunities_data, start_q_date, final_q_date, employee_ids, date_column="tran_date")
     
-    dataset_reference = save_result_to_json(columns, rows, f"Opportunities by Inside Sales dataset between {initial_date} and {final_date}", name="opportunity_by_is")
-
-    df = tuple_to_dataframe(columns, rows)
+    dataset_reference = save_df_to_json(df, f"Opportunities by Inside Sales dataset between {initial_date} and {final_date}", name="opportunity_by_is")
     results = opportunity_summary(df)
     results["full_data_reference"] = dataset_reference
 
     return results
 
+@uses_backend("postgres_dev")
+@single_flight(upper=("customer_name", "brand"))
 def get_vendors_to_quote(customer_name: str, brand: str) -> Dict[str, Any]:
     """Retrieve a list of vendors to quote for a given customer and brand.
     
@@ -209,26 +273,23 @@ def get_vendors_to_quote(customer_name: str, brand: str) -> Dict[str, Any]:
         raise ValueError("Both customer_name and brand must be provided.")
     customer_name = customer_name.upper()
     brand = brand.upper()
+    customer_names, reply = resolve_filter(get_hr_customer_index(), customer_name, "customer")
+    if reply:
+        return reply
+    
+    # Served from the in-memory vendor index (refreshed in the background)
+    index = get_vendor_index()
+    by_customer = index.customer_brand(customer_names, brand)
+    by_country = index.country_brand(index.country_of(customer_names), brand)
+    current_year, previous_year = index.years()
     
-    # Define the SQL for data with customer and brand
-    sql_cus_brand = get_vendors_customer_brand(customer_name, brand)
-    print("sql", sql_cus_brand)
-    columns_cus_brand, rows_cus_brand = execute_pg_query_dev(sql_cus_brand)
-    df_cus_brand = tuple_to_dataframe(columns_cus_brand, rows_cus_brand)
-    
-    # Get the customer's country to further filter vendors by brand and country
-    sql_country = get_customer_country(customer_name)
-    print("sql_country", sql_country)
-    columns_country, rows_country = execute_pg_query_dev(sql_country)
-    country = rows_country[0][0] if rows_country else ''
-    
-    # Define the SQL for data with country and brand
-    sql_country_brand = get_vendors_country_brand(country, brand)
-    print("sql_country_brand", sql_country_brand)
-    columns_country_brand, rows_country_brand = execute_pg_query_dev(sql_country_brand)
-    df_country_brand = tuple_to_dataframe(columns_country_brand, rows_country_brand)
-    
-    return analize_hr_desviado(df_cus_brand, df_country_brand)
+    return build_hr_desviado(
+        by_customer.get(current_year, []),
+        by_customer.get(previous_year, []),
+        by_country.get(current_year, []),
+        by_country.get(previous_year, []),
+        current_year=current_year,
+    )
     
     
 
@@ -1,9 +1,121 @@
+import os
 import json
-from typing import List, Tuple, Any, Optional
+import threading
+from contextlib import contextmanager
+from typing import Callable, Dict, List, Tuple, Any, Optional
 import datetime
 import pandas as pd
 
 
+class DateEncoder(json.JSONEncoder):
+    def default(self, obj):
+        if isinstance(obj, (datetime.date, datetime.datetime)):
+            return obj.isoformat()
+        return json.JSONEncoder.default(self, obj)
+
+
+class JsonDatasetWriter:
+    """
+    Escribe un dataset JSON por lotes, sin necesidad de tener todas las filas en memoria.
+
+    Produce la misma estructura que `save_result_to_json`:
+    {
+      "data_set_description": "",
+      "columns": [],
+      "rows": [
+        []
+      ]
+    }
+
+    Uso:
+        with JsonDatasetWriter("descripción", name="quoted_items") as writer:
+            for columns, rows in batches:
+                writer.write_rows(columns, rows)
+        dataset_reference = writer.preview
+    """
+
+    def __init__(self, description: str, name: str = "sales_dataset.json", selected_columns: Optional[List[str]] = None, filename: Optional[str] = None):
+        self.description = description
+        self.selected_columns = selected_columns
+        timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
+        self.filename = filename or f"{timestamp}_{name}.json"
+        self.columns: Optional[List[str]] = None
+        self.preview_rows: List[List[Any]] = []
+        self.preview: Optional[Dict[str, Any]] = None
+        self._col_idx: Optional[List[int]] = None
+        self._file = None
+        self._first_row = True
+
+    def __enter__(self) -> "JsonDatasetWriter":
+        self._file = open("data/" + self.filename, "w", encoding="utf-8")
+        self._file.write("{\n  \"data_set_description\": " + json.dumps(self.description, ensure_ascii=False) + ",\n")
+        return self
+
+    def _set_columns(self, columns: List[str]) -> None:
+        # Si no se especifican columnas, usamos todas
+        if self.selected_columns is None:
+            self.columns = list(columns)
+            return
+        # Mapear nombre de columna -> índice en la fila original
+        col_index = {name: i for i, name in enumerate(columns)}
+
+        # Validar que todas las columnas seleccionadas existen
+        missing = [c for c in self.selected_columns if c not in col_index]
+        if missing:
+            raise ValueError(f"Estas columnas no existen en el resultado: {missing}")
+
+        self.columns = list(self.selected_columns)
+        self._col_idx = [col_index[c] for c in self.selected_columns]
+
+    def write_rows(self, columns: List[str], rows: List[Tuple[Any, ...]]) -> None:
+        """Agrega un lote de filas (tuplas en el orden de `columns`)."""
+        if self.columns is None:
+            self._set_columns(columns)
+            self._file.write("  \"columns\": " + json.dumps(self.columns, ensure_ascii=False) + ",\n  \"rows\": [")
+        for row in rows:
+            if self._col_idx is None:
+                values = list(row)
+            else:
+                values = [row[i] for i in self._col_idx]
+            if len(self.preview_rows) < 5:  # Solo las primeras 5 filas
+                self.preview_rows.append(values)
+            self._file.write(("\n    " if self._first_row else ",\n    ") + json.dumps(values, cls=DateEncoder, ensure_ascii=False))
+            self._first_row = False
+
+    def write_frame(self, df: pd.DataFrame) -> None:
+        """Agrega un lote en forma de DataFrame (NaN/NaT se guardan como null)."""
+        out = df.astype(object)
+        for col in df.columns:
+            if pd.api.types.is_datetime64_any_dtype(df[col]):
+                values = df[col].dropna()
+                # Columnas DATE se guardan como 'YYYY-MM-DD', igual que el driver JDBC
+                fmt = "%Y-%m-%d" if (values == values.dt.normalize()).all() else "%Y-%m-%d %H:%M:%S"
+                out[col] = df[col].dt.strftime(fmt)
+        out = out.where(df.notna(), None)
+        self.write_rows(list(df.columns), out.itertuples(index=False, name=None))
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        if self.columns is None:
+            self._set_columns([] if self.selected_columns is None else list(self.selected_columns))
+            self._file.write("  \"columns\": " + json.dumps(self.columns, ensure_ascii=False) + ",\n  \"rows\": [")
+        self._file.write("\n  ]\n}" if not self._first_row else "]\n}")
+        self._file.close()
+        if exc_type is not None:
+            # No dejar un dataset a medio escribir
+            os.remove("data/" + self.filename)
+            return
+
+        self.preview = {
+            "description": self.description,
+            "data_preview": {
+                "columns": self.columns,
+                "rows": self.preview_rows,
+            },
+            "filename": self.filename,
+        }
+        print("Dataset preview saved to JSON:", json.dumps(self.preview, indent=2, ensure_ascii=False, cls=DateEncoder))
+
+
 def save_result_to_json(
     columns: List[str],
     rows: List[Tuple[Any, ...]],
@@ -27,56 +139,24 @@ def save_result_to_json(
     - selected_columns: columnas que quieres incluir (en el orden que las pongas).
       Si es None, se usan todas las columnas.
     """
+    with JsonDatasetWriter(description, name=name, selected_columns=selected_columns) as writer:
+        writer.write_rows(columns, rows)
+    return writer.preview
 
-    # Si no se especifican columnas, usamos todas
-    if selected_columns is None:
-        filtered_columns = list(columns)
-        filtered_rows = [list(row) for row in rows]
-    else:
-        # Mapear nombre de columna -> índice en la fila original
-        col_index = {name: i for i, name in enumerate(columns)}
-
-        # Validar que todas las columnas seleccionadas existen
-        missing = [c for c in selected_columns if c not in col_index]
-        if missing:
-            raise ValueError(f"Estas columnas no existen en el resultado: {missing}")
-
-        filtered_columns = list(selected_columns)
 
-        # Re-construir cada fila solo con las columnas seleccionadas
-        filtered_rows = [
-            [row[col_index[col_name]] for col_name in selected_columns]
-            for row in rows
-        ]
-
-    timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
-    filename = f"{timestamp}_{name}.json"
-    data = {
-        "data_set_description": description,
-        "columns": filtered_columns,
-        "rows": filtered_rows,
-    }
-    
-    dataset_preview = {
-        "description": description,
-        "data_preview": {
-            "columns": filtered_columns,
-            "rows": filtered_rows[:5],  # Solo las primeras 5 filas
-        }
-    }
-
-    with open("data/"+filename, "w", encoding="utf-8") as f:
-        class DateEncoder(json.JSONEncoder):
-            def default(self, obj):
-                if isinstance(obj, (datetime.date, datetime.datetime)):
-                    return obj.isoformat()
-                return json.JSONEncoder.default(self, obj)
-        json.dump(data, f, cls=DateEncoder, ensure_ascii=False, indent=2)
-    
-    dataset_preview["filename"] = filename
-    print("Dataset preview saved to JSON:", json.dumps(dataset_preview, indent=2, ensure_ascii=False))
-    return dataset_preview
 
+def save_df_to_json(
+    df: pd.DataFrame,
+    description: str,
+    name: str = "sales_dataset.json",
+    selected_columns: Optional[List[str]] = None,
+) -> Dict[str, Any]:
+    """
+    Igual que `save_result_to_json`, pero a partir de un DataFrame.
+    """
+    with JsonDatasetWriter(description, name=name, selected_columns=selected_columns) as writer:
+        writer.write_frame(df)
+    return writer.preview
 
 
 def load_dataset_from_json(filename: str) -> Tuple[pd.DataFrame, str]:
@@ -104,13 +184,111 @@ def load_dataset_from_json(filename: str) -> Tuple[pd.DataFrame, str]:
     
     return data
   
-def save_df_to_excel(df: pd.DataFrame, name: str = "dataset") -> str:
+def save_df_to_excel(df: pd.DataFrame, name: str = "dataset", filename: Optional[str] = None) -> str:
     """
     Guarda un DataFrame de pandas en un archivo Excel y devuelve el nombre del archivo.
     """
-    timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
-    filename = f"{timestamp}_{name}.xlsx"
+    if filename is None:
+        timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
+        filename = f"{timestamp}_{name}.xlsx"
     filepath = "data/" + filename
     df.to_excel(filepath, index=False)
     print(f"DataFrame saved to Excel: {filepath}")
     return filename
+
+
+# Datasets diferidos: en lugar de las filas se guarda cómo obtenerlas
+# (fuente registrada + argumentos) y se materializan solo cuando alguien pide
+# el dataset o el Excel.
+_DEFERRED_SOURCES: Dict[str, Callable[..., pd.DataFrame]] = {}
+# Un lock por archivo (con su cantidad de usuarios): materializar un dataset
+# no bloquea las lecturas de los demás
+_materialize_guard = threading.Lock()
+_materialize_locks: Dict[str, List[Any]] = {}
+
+
+@contextmanager
+def _materializing(filename: str):
+    """Serializa la materialización de un mismo archivo; el lock se descarta al quedar sin uso."""
+    with _materialize_guard:
+        entry = _materialize_locks.setdefault(filename, [threading.Lock(), 0])
+        entry[1] += 1
+    try:
+        with entry[0]:
+            yield
+    finally:
+        with _materialize_guard:
+            entry[1] -= 1
+            if entry[1] == 0:
+                del _materialize_locks[filename]
+
+
+def register_deferred_source(source: str, loader: Callable[..., pd.DataFrame]) -> None:
+    """Registra la función que devuelve el DataFrame completo de una fuente diferida."""
+    _DEFERRED_SOURCES[source] = loader
+
+
+def save_deferred_dataset(description: str, name: str, source: str, args: List[Any]) -> Dict[str, Any]:
+    """
+    Guarda la referencia a un dataset que todavía no se ha consultado:
+    {
+      "data_set_description": "",
+      "deferred": {"source": "", "args": []},
+      "excel_file": ""
+    }
+
+    Devuelve la misma estructura que `save_df_to_json` (sin filas de preview)
+    más el nombre del Excel que se generará bajo demanda.
+    """
+    timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
+    filename = f"{timestamp}_{name}.json"
+    excel_file = f"{timestamp}_{name}.xlsx"
+    with open("data/" + filename, "w", encoding="utf-8") as f:
+        json.dump({
+            "data_set_description": description,
+            "deferred": {"source": source, "args": list(args)},
+            "excel_file": excel_file,
+        }, f, ensure_ascii=False, indent=2)
+    return {
+        "description": description,
+        "data_preview": None,
+        "filename": filename,
+        "excel_file": excel_file,
+        "deferred": True,
+    }
+
+
+def materialize_deferred_dataset(filename: str) -> bool:
+    """
+    Si `filename` es un dataset diferido, ejecuta su fuente y reemplaza el archivo
+    por el dataset completo (mismo nombre) y genera su Excel. Devuelve True si
+    materializó algo, False si el archivo ya tenía las filas.
+    """
+    with _materializing(filename):
+        with open("data/" + filename, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        deferred = data.get("deferred")
+        if not deferred:
+            return False
+
+        print(f"[DATASET] Materializando {filename} desde {deferred['source']}")
+        df = _DEFERRED_SOURCES[deferred["source"]](*deferred["args"])
+        # Primero el Excel: si falla, el archivo diferido sigue siendo válido
+        save_df_to_excel(df, filename=data["excel_file"])
+        # Se escribe aparte y se reemplaza al final: si falla, el writer borra
+        # el temporal y no la referencia diferida
+        partial = filename + ".partial"
+        with JsonDatasetWriter(data["data_set_description"], filename=partial) as writer:
+            writer.write_frame(df)
+        os.replace("data/" + partial, "data/" + filename)
+        return True
+
+
+def deferred_dataset_for_excel(excel_file: str) -> Optional[str]:
+    """Nombre del dataset diferido que genera `excel_file`, si existe."""
+    filename = excel_file[: -len(".xlsx")] + ".json" if excel_file.endswith(".xlsx") else None
+    if filename is None or not os.path.exists("data/" + filename):
+        return None
+    with open("data/" + filename, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    return filename if data.get("deferred") else None
@@ -0,0 +1,88 @@
+import inspect
+import threading
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, Hashable, Optional, Sequence, Tuple
+from utils.date import get_month_start_and_today
+
+
+class SingleFlight:
+    """Coalesce concurrent calls with the same key onto a single execution.
+
+    The first caller for a key starts the work; callers arriving while it is
+    still running get the same Future and therefore the same result (or
+    exception). Once it finishes the key is forgotten, so later calls run again.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._in_flight: Dict[Hashable, Future] = {}
+        self._executed = 0
+        self._coalesced = 0
+
+    def submit(self, key: Hashable, start: Callable[[], Future]) -> Future:
+        with self._lock:
+            future = self._in_flight.get(key)
+            if future is not None:
+                self._coalesced += 1
+                return future
+            future = start()
+            self._in_flight[key] = future
+            self._executed += 1
+        future.add_done_callback(lambda done: self._forget(key, done))
+        return future
+
+    def _forget(self, key: Hashable, future: Future) -> None:
+        with self._lock:
+            if self._in_flight.get(key) is future:
+                del self._in_flight[key]
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "in_flight": len(self._in_flight),
+                "executed": self._executed,
+                "coalesced": self._coalesced,
+            }
+
+
+def single_flight(dates: Optional[Dict[str, str]] = None, upper: Sequence[str] = ()):
+    """Mark a tool whose concurrent identical calls should share one execution.
+
+    dates maps date arguments to the default the tool resolves them to
+    ("month_start" or "today", as in get_month_start_and_today) so an omitted
+    date and the explicit default produce the same key. upper lists arguments
+    the tool upper-cases anyway (customer / Inside Sales filters).
+    """
+    def decorator(fn):
+        fn.__single_flight__ = (dict(dates or {}), tuple(upper))
+        return fn
+    return decorator
+
+
+def _normalize(value: Any) -> Hashable:
+    if value is None:
+        return ""
+    try:
+        hash(value)
+        return value
+    except TypeError:
+        return repr(value)
+
+
+def call_key(fn: Callable[..., Any], args: Tuple[Any, ...], kwargs: Dict[str, Any]) -> Hashable:
+    """Key of a tool call: tool name plus its bound, normalized arguments."""
+    dates, upper = getattr(fn, "__single_flight__", ({}, ()))
+    bound = inspect.signature(fn).bind(*args, **kwargs)
+    bound.apply_defaults()
+    values = {name: _normalize(value) for name, value in bound.arguments.items()}
+
+    if dates:
+        month_start, today = get_month_start_and_today()
+        resolved = {"month_start": month_start, "today": today}
+        for name, default in dates.items():
+            values[name] = values.get(name) or resolved[default]
+    for name in upper:
+        if isinstance(values.get(name), str):
+            values[name] = values[name].upper()
+
+    return fn.__name__, tuple(sorted(values.items()))